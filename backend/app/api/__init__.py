@@ -0,0 +1 @@
+"""API route handlers"""
@@ -0,0 +1,55 @@
+"""Analytics endpoints, answered from the columnar snapshot (see app.services.analytics)"""
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.schemas.analytics import AnalyticsSnapshotStatus, ViralityBreakdown
+from app.schemas.search import PatternDiscoveryRequest, PatternDiscoveryResponse
+from app.services.analytics import AnalyticsUnavailableError, analytics_snapshot
+
+router = APIRouter()
+
+
+@router.get("/status", response_model=AnalyticsSnapshotStatus)
+async def snapshot_status() -> AnalyticsSnapshotStatus:
+    """Freshness and size of the analytics snapshot"""
+    return analytics_snapshot.status()
+
+
+@router.post("/refresh", response_model=AnalyticsSnapshotStatus)
+async def refresh_snapshot(
+    full: bool = Query(False, description="Re-export every moment (picks up tag edits)"),
+    db: AsyncSession = Depends(get_db),
+) -> AnalyticsSnapshotStatus:
+    """Export moments changed since the last refresh"""
+    try:
+        return await analytics_snapshot.refresh(db, full=full)
+    except AnalyticsUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+@router.post("/patterns", response_model=PatternDiscoveryResponse)
+async def snapshot_patterns(request: PatternDiscoveryRequest) -> PatternDiscoveryResponse:
+    """Tag pairs that co-occur on moments, ranked by average virality"""
+    try:
+        return await analytics_snapshot.patterns(request)
+    except AnalyticsUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+@router.get("/virality", response_model=ViralityBreakdown)
+async def virality_breakdown(
+    by: Literal["tag", "creator", "platform"] = "tag",
+    metric: Literal["overall", "tiktok", "youtube_shorts", "instagram_reels", "twitter"] = (
+        "overall"
+    ),
+    min_moments: int = Query(10, ge=1),
+    limit: int = Query(50, ge=1, le=500),
+) -> ViralityBreakdown:
+    """Moment count, average and p90 score per tag, creator or source platform"""
+    try:
+        return await analytics_snapshot.virality_breakdown(by, metric, min_moments, limit)
+    except AnalyticsUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
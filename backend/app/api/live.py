@@ -0,0 +1,100 @@
+"""Live transcript endpoints
+
+A live stream's lines, finish call and subscribers must reach the same API
+process (e.g. route on the transcript id); see app.services.live.
+"""
+import asyncio
+from uuid import UUID
+
+from fastapi import APIRouter, HTTPException, Request, WebSocket, WebSocketDisconnect
+
+from app.config import settings
+from app.schemas.live import LiveAppendResult, LiveStream, LiveStreamCreate
+from app.services.ingest import RecordTooLargeError
+from app.services.live import LiveStreamNotFoundError, iter_line_batches, live_ingestor
+
+router = APIRouter()
+
+
+@router.post("", response_model=LiveStream, status_code=201)
+async def create_live_stream(request: LiveStreamCreate) -> LiveStream:
+    """Create a video with an empty transcript that lines are appended to"""
+    return await live_ingestor.create(request)
+
+
+@router.get("/{transcript_id}", response_model=LiveStream)
+async def get_live_stream(transcript_id: UUID) -> LiveStream:
+    """Windows closed and moments emitted so far"""
+    try:
+        return await live_ingestor.status(transcript_id)
+    except LiveStreamNotFoundError:
+        raise HTTPException(status_code=404, detail="Live transcript not found")
+
+
+@router.post("/{transcript_id}/lines", response_model=LiveAppendResult)
+async def append_lines(transcript_id: UUID, request: Request) -> LiveAppendResult:
+    """
+    Append timestamped transcript lines (plain text, one per line)
+
+    The body may be sent with chunked transfer encoding and kept open: lines
+    are appended, and the windows they close analyzed, as each chunk arrives.
+    """
+    result = LiveAppendResult(lines=0, windows_closed=0)
+    try:
+        async for lines in iter_line_batches(request.stream(), settings.ingest_max_record_bytes):
+            appended = await live_ingestor.append(transcript_id, lines)
+            result.lines += appended.lines
+            result.windows_closed += appended.windows_closed
+    except LiveStreamNotFoundError:
+        raise HTTPException(status_code=404, detail="Live transcript not found")
+    except RecordTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    return result
+
+
+@router.post("/{transcript_id}/finish", response_model=LiveStream)
+async def finish_live_stream(transcript_id: UUID) -> LiveStream:
+    """Analyze the remaining windows and mark the transcript completed"""
+    try:
+        return await live_ingestor.finish(transcript_id)
+    except LiveStreamNotFoundError:
+        raise HTTPException(status_code=404, detail="Live transcript not found")
+
+
+async def _forward(websocket: WebSocket, moments: asyncio.Queue) -> None:
+    """Send moments until the stream ends"""
+    while (moment := await moments.get()) is not None:
+        await websocket.send_text(moment.model_dump_json())
+
+
+async def _until_disconnect(websocket: WebSocket) -> None:
+    """Read (and ignore) client messages until the client goes away"""
+    while (await websocket.receive())["type"] != "websocket.disconnect":
+        pass
+
+
+@router.websocket("/{transcript_id}/moments")
+async def live_moments(websocket: WebSocket, transcript_id: UUID) -> None:
+    """Push each newly found ``LiveMoment`` as JSON; closes when the stream finishes"""
+    await websocket.accept()
+    try:
+        async with live_ingestor.subscribe(transcript_id) as moments:
+            # A quiet stream sends nothing for a long time; reading is what notices a
+            # client that left, so its queue doesn't outlive it
+            forwarding = asyncio.create_task(_forward(websocket, moments))
+            disconnect = asyncio.create_task(_until_disconnect(websocket))
+            try:
+                await asyncio.wait({forwarding, disconnect}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                disconnect.cancel()
+                forwarding.cancel()
+                await asyncio.wait({disconnect, forwarding})
+            if forwarding.cancelled():
+                return  # the client left first
+            forwarding.result()  # the stream finished, or sending failed
+    except LiveStreamNotFoundError:
+        await websocket.close(code=4404, reason="Live transcript not found")
+        return
+    except WebSocketDisconnect:
+        return
+    await websocket.close()
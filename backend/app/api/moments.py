@@ -0,0 +1,61 @@
+"""Moment endpoints"""
+from collections.abc import AsyncIterator
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import AsyncSessionLocal, get_db
+from app.schemas.moment import Leaderboard
+from app.schemas.search import MomentExportRequest
+from app.services.export import MEDIA_TYPES, parquet_available, stream_moments
+from app.services.leaderboards import LEADERBOARD_SIZE, UnknownTagError, top_moments
+from app.services.taxonomy import get_taxonomy
+
+router = APIRouter()
+
+
+@router.post("/export")
+async def export_moments(request: MomentExportRequest) -> StreamingResponse:
+    """
+    Stream every matching moment with its tags as NDJSON, CSV or Parquet
+
+    Uses a server-side cursor, so memory use is independent of result size.
+    """
+    if request.format == "parquet" and not parquet_available():
+        raise HTTPException(
+            status_code=400,
+            detail="Parquet export requires the 'export' extra (pyarrow)",
+        )
+
+    async def body() -> AsyncIterator[bytes]:
+        # The session must outlive the endpoint: it is read while streaming
+        async with AsyncSessionLocal() as session:
+            async for chunk in stream_moments(session, request):
+                yield chunk
+
+    return StreamingResponse(
+        body(),
+        media_type=MEDIA_TYPES[request.format],
+        headers={"Content-Disposition": f'attachment; filename="moments.{request.format}"'},
+    )
+
+
+@router.get("/top", response_model=Leaderboard)
+async def top_moments_leaderboard(
+    metric: Literal["overall", "tiktok", "youtube_shorts", "instagram_reels", "twitter"] = (
+        "overall"
+    ),
+    creator: str | None = None,
+    tag: str | None = Query(default=None, description="Tag slug; takes precedence over creator"),
+    limit: int = Query(default=50, ge=1, le=LEADERBOARD_SIZE),
+    db: AsyncSession = Depends(get_db),
+) -> Leaderboard:
+    """Top moments by virality or platform fit, from the precomputed leaderboards"""
+    try:
+        return await top_moments(
+            db, await get_taxonomy(db), metric=metric, creator=creator, tag=tag, limit=limit
+        )
+    except UnknownTagError:
+        raise HTTPException(status_code=404, detail=f"Unknown tag: {tag}")
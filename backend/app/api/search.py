@@ -0,0 +1,32 @@
+"""Search endpoints"""
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.schemas.search import (
+    PatternDiscoveryRequest,
+    PatternDiscoveryResponse,
+    TagSearchRequest,
+    TagSearchResponse,
+)
+from app.services.search import discover_patterns, tag_search
+
+router = APIRouter()
+
+
+@router.post("/tags", response_model=TagSearchResponse)
+async def search_by_tags(
+    request: TagSearchRequest,
+    db: AsyncSession = Depends(get_db),
+) -> TagSearchResponse:
+    """Tag-based search (AND/OR over tag slugs)"""
+    return await tag_search(db, request)
+
+
+@router.post("/patterns", response_model=PatternDiscoveryResponse)
+async def search_patterns(
+    request: PatternDiscoveryRequest,
+    db: AsyncSession = Depends(get_db),
+) -> PatternDiscoveryResponse:
+    """Tag pairs that co-occur on moments, ranked by average virality"""
+    return await discover_patterns(db, request)
@@ -0,0 +1,25 @@
+"""Tag endpoints"""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.schemas.tag import TagAutocomplete
+from app.services.tag_autocomplete import get_tag_autocomplete
+
+router = APIRouter()
+
+
+@router.get("/autocomplete", response_model=list[TagAutocomplete])
+async def autocomplete_tags(
+    q: str = Query(default="", max_length=100),
+    limit: int = Query(default=10, ge=1, le=50),
+    dimension: str | None = None,
+    db: AsyncSession = Depends(get_db),
+) -> list[TagAutocomplete]:
+    """Tag suggestions for a partial query, served from memory (no query per keystroke)"""
+    index = await get_tag_autocomplete(db)
+    dimensions = index.taxonomy.dimensions
+    return [
+        TagAutocomplete(slug=tag.slug, name=tag.name, dimension=dimensions[tag.id])
+        for tag in index.search(q, limit=limit, dimension=dimension)
+    ]
@@ -0,0 +1,63 @@
+"""Video endpoints"""
+import json
+from collections.abc import AsyncIterator
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import AsyncSessionLocal, get_db
+from app.schemas.transcript import NearDuplicateReport, PrefilterReport
+from app.services.analysis_queue import analysis_queue
+from app.services.ingest import BulkIngestor, RecordTooLargeError, iter_ndjson_lines
+from app.services.near_duplicates import near_duplicate_report
+from app.services.prefilter import prefilter_report
+from app.services.taxonomy import get_taxonomy
+
+router = APIRouter()
+
+
+@router.post("/bulk")
+async def bulk_ingest(
+    request: Request,
+    batch_size: int = Query(default=settings.ingest_batch_size, ge=1, le=10_000),
+) -> StreamingResponse:
+    """
+    Stream NDJSON video + transcript records in, stream per-record results out
+
+    Each request line is a ``VideoIngest`` record; each response line is an
+    ``IngestResult``. Records are written in COPY batches of ``batch_size``.
+    """
+
+    async def results() -> AsyncIterator[bytes]:
+        async with AsyncSessionLocal() as session:
+            ingestor = BulkIngestor(session, batch_size=batch_size)
+            lines = iter_ndjson_lines(request.stream(), settings.ingest_max_record_bytes)
+            try:
+                async for result in ingestor.ingest(lines):
+                    if ingestor.queued_for_analysis:
+                        analysis_queue.notify()
+                    yield result.model_dump_json().encode() + b"\n"
+            except RecordTooLargeError as e:
+                yield json.dumps({"status": "error", "error": str(e)}).encode() + b"\n"
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+
+@router.get("/near-duplicates", response_model=NearDuplicateReport)
+async def near_duplicates(
+    limit: int = Query(default=20, ge=1, le=200),
+    db: AsyncSession = Depends(get_db),
+) -> NearDuplicateReport:
+    """Agent calls saved by reusing moments of near-duplicate transcripts"""
+    return await near_duplicate_report(db, limit=limit)
+
+
+@router.get("/prefilter-report", response_model=PrefilterReport)
+async def prefilter_evaluation(
+    sample: int = Query(default=50, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+) -> PrefilterReport:
+    """Agent calls the pre-filter avoids and its recall, on fully analyzed transcripts"""
+    return await prefilter_report(db, await get_taxonomy(db), sample_size=sample)
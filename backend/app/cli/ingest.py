@@ -0,0 +1,98 @@
+"""Bulk-ingest an NDJSON file of videos + transcripts through the API
+
+Usage:
+    python -m app.cli.ingest videos.ndjson --api http://localhost:8000
+
+The file is streamed in parts of ``--request-size`` records. Each part is one
+streaming POST to ``/api/videos/bulk``; per-record results are printed as
+NDJSON on stdout and a summary on stderr. Parts keep the request and response
+streams bounded so neither side has to buffer the whole backfill.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from collections.abc import AsyncIterator, Iterator
+from pathlib import Path
+
+import httpx
+
+
+def read_parts(path: Path, request_size: int) -> Iterator[list[bytes]]:
+    """Yield lists of up to ``request_size`` raw lines"""
+    part: list[bytes] = []
+    with path.open("rb") as f:
+        for line in f:
+            part.append(line if line.endswith(b"\n") else line + b"\n")
+            if len(part) >= request_size:
+                yield part
+                part = []
+    if part:
+        yield part
+
+
+async def _body(lines: list[bytes]) -> AsyncIterator[bytes]:
+    for line in lines:
+        yield line
+
+
+async def ingest_file(
+    path: Path,
+    api_url: str,
+    request_size: int = 1000,
+    batch_size: int = 500,
+) -> tuple[int, int]:
+    """
+    Upload ``path`` and print per-record results
+
+    Returns:
+        Tuple of (ok, failed) record counts
+    """
+    ok = failed = 0
+    line_offset = 0
+    url = f"{api_url.rstrip('/')}/api/videos/bulk"
+
+    async with httpx.AsyncClient(timeout=None) as client:
+        for part in read_parts(path, request_size):
+            async with client.stream(
+                "POST",
+                url,
+                params={"batch_size": batch_size},
+                content=_body(part),
+                headers={"Content-Type": "application/x-ndjson"},
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    result = json.loads(line)
+                    # Report line numbers relative to the whole file
+                    if "line" in result:
+                        result["line"] += line_offset
+                    if result.get("status") == "ok":
+                        ok += 1
+                    else:
+                        failed += 1
+                    print(json.dumps(result))
+            line_offset += len(part)
+
+    return ok, failed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", type=Path, help="NDJSON file of VideoIngest records")
+    parser.add_argument("--api", default="http://localhost:8000", help="API base URL")
+    parser.add_argument("--request-size", type=int, default=1000, help="Records per request")
+    parser.add_argument("--batch-size", type=int, default=500, help="Records per COPY batch")
+    args = parser.parse_args()
+
+    ok, failed = asyncio.run(
+        ingest_file(args.path, args.api, args.request_size, args.batch_size)
+    )
+    print(f"Ingested {ok} records, {failed} failed", file=sys.stderr)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,14 @@ class Settings(BaseSettings):
 
     # Database
     database_url: str = "postgresql://localhost/viral_clip_finder"
+    database_listen_url: str | None = None  # direct to Postgres for LISTEN; poolers can't relay it
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_warmup_connections: int = 5  # opened at startup, capped at db_pool_size
+    db_pooler: str = "none"  # none, pgbouncer (>= 1.21), pgbouncer_unprepared (see app.database)
+    db_statement_cache_size: int = 256  # prepared statements kept per connection
+    db_plan_cache_mode: str = "force_custom_plan"  # "" keeps the server default
+    db_echo: bool = False  # log every statement (development only; slows the hot path)
 
     # API
     api_host: str = "0.0.0.0"
@@ -29,11 +37,61 @@ class Settings(BaseSettings):
     vault_addr: str = "http://127.0.0.1:8200"
     vault_token: str | None = None
     vault_enabled: bool = False
+    vault_timeout: float = 5.0  # seconds
+    vault_cache_ttl: float = 300.0  # seconds, for secrets without a lease
+    vault_max_stale: float = 3600.0  # serve cached secrets this long past expiry if Vault is down
 
     # Processing
     max_concurrent_chunks: int = 5
     transcript_chunk_size: int = 180  # seconds (~3 minutes)
     transcript_chunk_overlap: int = 30  # seconds
+    near_duplicate_threshold: float = 0.7  # window similarity at which moments are reused
+    prefilter_mode: str = "defer"  # off, defer (analyze low-signal windows last), skip
+    prefilter_threshold: float = 0.15  # window signal score in [0, 1]
+    cpu_workers: int = 2  # processes for CPU-bound stages (0 = run on the event loop)
+    cpu_offload_min_size: int = 65_536  # smaller payloads (bytes/chars) run inline
+
+    # Analysis queue (0 workers = API-only process)
+    analysis_workers: int = 4  # transcripts in flight; agent calls stay max_concurrent_chunks
+    analysis_interactive_reserved_workers: int = 1  # never taken by backfill transcripts
+    analysis_poll_interval: float = 5.0  # seconds
+    analysis_claim_lease: float = 600.0  # seconds; unrenewed 'processing' claims are retaken
+    analysis_priority_weights: dict[str, float] = {
+        "live": 8.0,  # windows of in-progress transcripts (see app.services.live)
+        "interactive": 4.0,
+        "backfill": 1.0,
+        "deferred": 0.25,  # low-signal windows (see prefilter_mode)
+    }
+    analysis_deadlines: dict[str, float] = {  # seconds after submission
+        "live": 30.0,
+        "interactive": 120.0,
+    }
+    analysis_backfill_min_duration: float = 7200.0  # seconds; longer ones default to backfill
+
+    # Live ingestion (windows are analyzed as soon as they close)
+    live_window_size: float = 60.0  # seconds
+    live_window_overlap: float = 15.0  # seconds
+
+    # Bulk ingestion
+    ingest_batch_size: int = 500
+    ingest_max_record_bytes: int = 50_000_000
+
+    # Tags
+    tag_autocomplete_refresh_interval: float = 300.0  # seconds; picks up usage_count ranking
+
+    # Leaderboards
+    leaderboard_apply_interval: float = 1.0  # seconds; overall boards lag writes by about this
+
+    # Analytics snapshot (needs the 'analytics' extra: pyarrow + duckdb)
+    analytics_snapshot_dir: str = "data/analytics"
+    analytics_refresh_interval: float = 300.0  # seconds (0 = refresh only via the API)
+    analytics_refresh_overlap: float = 300.0  # seconds re-read before the watermark
+    analytics_threads: int = 4  # DuckDB worker threads
+
+    # Health probes
+    health_check_interval: float = 10.0  # seconds
+    health_check_timeout: float = 2.0  # seconds
+    readiness_max_pool_saturation: float = 0.95  # checked out / (pool_size + max_overflow)
 
 
 settings = Settings()
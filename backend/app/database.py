@@ -1,21 +1,97 @@
-"""Database connection and session management"""
+"""Database connection and session management
+
+Every statement runs as a prepared statement. How they are kept depends on
+what sits between the app and Postgres (``settings.db_pooler``):
+
+- ``none``: named statements, cached per pooled connection, so a repeated
+  query skips parse and analysis.
+- ``pgbouncer``: PgBouncer >= 1.21 in transaction mode with
+  ``max_prepared_statements`` > 0. PgBouncer tracks each client's named
+  statements and prepares them on whichever server connection the
+  transaction lands on, so the same cache stays valid. The pool skips its
+  pre-ping, as PgBouncer checks server connections itself.
+- ``pgbouncer_unprepared``: older PgBouncer (or ``max_prepared_statements =
+  0``) in transaction mode. A cached statement would be missing, or clash
+  with another client's, on the next transaction's server connection. All
+  statements are unnamed and never cached, at the cost of a parse and plan
+  per query.
+
+Postgres switches a statement to a generic plan after five executions. For
+the search queries that plan is much worse (``slug = ANY($1)`` is estimated
+to match a fixed share of tags, whatever the array holds), so connections
+set ``plan_cache_mode`` from ``settings.db_plan_cache_mode``, which defaults
+to planning each execution with its parameters. PgBouncer doesn't relay
+startup parameters; behind it, use ``ALTER ROLE ... SET plan_cache_mode``.
+
+LISTEN needs a session of its own; behind PgBouncer, set
+``database_listen_url`` to Postgres directly.
+"""
+import time
 from collections.abc import AsyncGenerator
+from typing import Any
 
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.config import settings
+from app.metrics import (
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_CHECKOUT_WAIT_SECONDS,
+    DB_POOL_OVERFLOW,
+    DB_POOL_SIZE,
+)
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts wait for a connection"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT_SECONDS.observe(time.perf_counter() - started)
+
 
 # Convert postgres:// to postgresql+asyncpg://
 database_url = settings.database_url.replace("postgresql://", "postgresql+asyncpg://")
 
+
+def driver_connect_args(pooler: str | None = None) -> dict[str, Any]:
+    """Arguments for connections opened with ``asyncpg.connect`` directly"""
+    pooler = pooler or settings.db_pooler
+    if pooler == "pgbouncer_unprepared":
+        return {"statement_cache_size": 0}
+    if pooler == "none" and settings.db_plan_cache_mode:
+        return {"server_settings": {"plan_cache_mode": settings.db_plan_cache_mode}}
+    return {}
+
+
+def engine_connect_args(pooler: str | None = None) -> dict[str, Any]:
+    """``connect_args`` for an engine behind ``pooler`` (default: settings.db_pooler)"""
+    unprepared = (pooler or settings.db_pooler) == "pgbouncer_unprepared"
+    return {
+        **driver_connect_args(pooler),
+        # SQLAlchemy's own cache of prepared statements, per connection
+        "prepared_statement_cache_size": 0 if unprepared else settings.db_statement_cache_size,
+    }
+
+
 engine = create_async_engine(
     database_url,
-    echo=True,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
+    echo=settings.db_echo,
+    pool_pre_ping=settings.db_pooler == "none",
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    poolclass=InstrumentedPool,
+    connect_args=engine_connect_args(),
 )
 
+# Sampled at scrape time; no per-checkout cost
+DB_POOL_SIZE.set_function(lambda: engine.pool.size())
+DB_POOL_CHECKED_OUT.set_function(lambda: engine.pool.checkedout())
+DB_POOL_OVERFLOW.set_function(lambda: max(engine.pool.overflow(), 0))
+
 AsyncSessionLocal = async_sessionmaker(
     engine,
     class_=AsyncSession,
@@ -1,10 +1,24 @@
 """FastAPI application entry point"""
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
+from app.api import analytics, live, moments, search, tags, videos
 from app.config import settings
+from app.metrics import MetricsMiddleware, loop_lag_monitor
+from app.services.analysis_queue import analysis_queue
+from app.services.analytics import snapshot_refresher
+from app.services.executor import cpu_executor
+from app.services.health import health_monitor
+from app.services.leaderboards import leaderboard_queue_applier
+from app.services.live import live_ingestor
+from app.services.taxonomy import taxonomy_listener
+from app.services.vault_client import close_vault
+from app.services.warmup import warm_up
 
 
 @asynccontextmanager
@@ -14,11 +28,35 @@ async def lifespan(app: FastAPI):
     print("🚀 Viral Clip Finder API starting...")
     print(f"📊 Database: {settings.database_url}")
     print(f"🤖 Claude Agent SDK: Using Claude Max authentication")
+    timings = await warm_up()
+    print(
+        "🔥 Warm-up: "
+        + ", ".join(
+            f"{phase} {value:.0f}ms" if isinstance(value, float) else f"{phase} failed ({value})"
+            for phase, value in timings.items()
+        )
+    )
+    await loop_lag_monitor.start()
+    await taxonomy_listener.start()
+    cpu_executor.start()
+    await analysis_queue.start()
+    await health_monitor.start()
+    await snapshot_refresher.start()
+    await leaderboard_queue_applier.start()
 
     yield
 
     # Shutdown
     print("👋 Shutting down...")
+    await leaderboard_queue_applier.stop()
+    await snapshot_refresher.stop()
+    await health_monitor.stop()
+    await live_ingestor.stop()
+    await analysis_queue.stop()
+    await cpu_executor.stop()
+    await close_vault()
+    await taxonomy_listener.stop()
+    await loop_lag_monitor.stop()
 
 
 app = FastAPI(
@@ -36,6 +74,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
 
 
 @app.get("/")
@@ -50,17 +89,33 @@ async def root():
 
 @app.get("/health")
 async def health():
-    """Detailed health check"""
-    return {
-        "status": "healthy",
-        "database": "connected",
-        "agent_sdk": "ready",
-    }
+    """Detailed health check (cached dependency results)"""
+    ready, details = health_monitor.readiness()
+    return {**details, "status": "healthy" if ready else "unhealthy"}
+
+
+@app.get("/health/live")
+async def liveness():
+    """Liveness probe: the process and its event loop are responsive"""
+    return health_monitor.liveness()
+
+
+@app.get("/health/ready")
+async def readiness():
+    """Readiness probe: 503 when the database is down or the pool is saturated"""
+    ready, details = health_monitor.readiness()
+    return JSONResponse(jsonable_encoder(details), status_code=200 if ready else 503)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """Prometheus metrics"""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
 
-# Import and include routers here (after they're created)
-# from app.api import videos, moments, tags, search
-# app.include_router(videos.router, prefix="/api/videos", tags=["videos"])
-# app.include_router(moments.router, prefix="/api/moments", tags=["moments"])
-# app.include_router(tags.router, prefix="/api/tags", tags=["tags"])
-# app.include_router(search.router, prefix="/api/search", tags=["search"])
+app.include_router(videos.router, prefix="/api/videos", tags=["videos"])
+app.include_router(live.router, prefix="/api/live", tags=["live"])
+app.include_router(moments.router, prefix="/api/moments", tags=["moments"])
+app.include_router(search.router, prefix="/api/search", tags=["search"])
+app.include_router(tags.router, prefix="/api/tags", tags=["tags"])
+app.include_router(analytics.router, prefix="/api/analytics", tags=["analytics"])
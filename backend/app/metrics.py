@@ -0,0 +1,176 @@
+"""Prometheus metrics and request instrumentation
+
+Metrics are process-local and scraped from ``/metrics``. Pool gauges are
+computed at scrape time, so only histograms/counters touch the hot paths.
+"""
+import asyncio
+import contextlib
+import time
+
+from prometheus_client import Counter, Gauge, Histogram
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Analyzer
+ANALYZER_CHUNKS_IN_FLIGHT = Gauge(
+    "analyzer_chunks_in_flight",
+    "Transcript chunks currently being analyzed by the agent",
+)
+ANALYZER_CHUNKS_QUEUED = Gauge(
+    "analyzer_chunks_queued",
+    "Transcript chunks waiting for an agent slot",
+    ["priority"],  # interactive, backfill
+)
+ANALYZER_CHUNK_WAIT_SECONDS = Histogram(
+    "analyzer_chunk_wait_seconds",
+    "Time a chunk waited for an agent slot",
+    ["priority"],
+    buckets=(0, 0.1, 0.5, 1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600),
+)
+ANALYZER_CHUNKS = Counter(
+    "analyzer_chunks",
+    "Transcript chunks analyzed",
+    ["outcome"],  # ok, error
+)
+ANALYZER_AGENT_CALL_SECONDS = Histogram(
+    "analyzer_agent_call_seconds",
+    "Wall time of one agent call for a chunk",
+    buckets=(0.5, 1, 2, 5, 10, 20, 30, 60, 120, 300),
+)
+ANALYZER_MOMENTS_PER_CHUNK = Histogram(
+    "analyzer_moments_per_chunk",
+    "Moments extracted from one chunk",
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34),
+)
+ANALYZER_WINDOWS_REUSED = Counter(
+    "analyzer_windows_reused",
+    "Transcript windows whose moments were copied from a near-duplicate (agent calls saved)",
+)
+ANALYZER_WINDOWS_PREFILTERED = Counter(
+    "analyzer_windows_prefiltered",
+    "Transcript windows by pre-filter decision",
+    ["decision"],  # analyzed, deferred, skipped (agent calls avoided)
+)
+ANALYZER_JSON_EXTRACTION_FAILURES = Counter(
+    "analyzer_json_extraction_failures",
+    "Agent text blocks whose JSON could not be parsed",
+)
+
+# Live ingestion
+LIVE_STREAMS_ACTIVE = Gauge(
+    "live_streams_active",
+    "Live transcripts receiving lines in this process",
+)
+LIVE_WINDOWS = Counter(
+    "live_windows",
+    "Closed live windows",
+    ["outcome"],  # ok, error (moments of a failed window are not saved)
+)
+LIVE_MOMENT_LATENCY_SECONDS = Histogram(
+    "live_moment_latency_seconds",
+    "Time from receiving the line a moment starts at to pushing the tagged moment",
+    buckets=(1, 2.5, 5, 10, 20, 30, 45, 60, 90, 120, 180, 300),
+)
+
+# Database pool
+DB_POOL_CHECKOUT_WAIT_SECONDS = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5, 30),
+)
+DB_POOL_SIZE = Gauge("db_pool_size", "Configured pool size")
+DB_POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connections currently checked out")
+DB_POOL_OVERFLOW = Gauge("db_pool_overflow", "Connections opened beyond pool_size")
+
+# Event loop
+EVENT_LOOP_LAG_SECONDS = Histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop ran a scheduled wakeup (time blocked by CPU-bound work)",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+
+# Tags
+TAG_AUTOCOMPLETE_SECONDS = Histogram(
+    "tag_autocomplete_seconds",
+    "Time to answer one autocomplete keystroke from the in-memory index",
+    buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.01),
+)
+
+# HTTP
+HTTP_REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "HTTP requests being served")
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency until the response is complete",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.2, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request latency per route template
+
+    Pure ASGI (rather than BaseHTTPMiddleware) so streaming responses pass
+    through untouched and are timed until their last chunk is sent.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            # Label by route template, not raw path, to keep cardinality bounded
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.labels(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status),
+            ).observe(time.perf_counter() - started)
+
+
+class EventLoopLagMonitor:
+    """Samples event loop lag: the delay between a timer's due time and its run"""
+
+    def __init__(self, interval: float = 0.25):
+        self.interval = interval
+        self.last_lag = 0.0
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            due = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.last_lag = max(loop.time() - due, 0.0)
+            EVENT_LOOP_LAG_SECONDS.observe(self.last_lag)
+
+
+# Global instance
+loop_lag_monitor = EventLoopLagMonitor()
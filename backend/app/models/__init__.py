@@ -1,19 +1,26 @@
 """SQLAlchemy models"""
 from app.models.base import Base
+from app.models.live_transcript_chunk import LiveTranscriptChunk
 from app.models.moment import Moment
+from app.models.moment_leaderboard import MomentLeaderboard
 from app.models.moment_tag import MomentTag
-from app.models.tag import Tag, TagDimension
+from app.models.tag import Tag, TagClosure, TagDimension
 from app.models.tag_correlation import TagCorrelation
 from app.models.transcript import Transcript
+from app.models.transcript_window import TranscriptWindow
 from app.models.video import Video
 
 __all__ = [
     "Base",
     "Video",
     "Transcript",
+    "TranscriptWindow",
+    "LiveTranscriptChunk",
     "Moment",
+    "MomentLeaderboard",
     "Tag",
     "TagDimension",
+    "TagClosure",
     "MomentTag",
     "TagCorrelation",
 ]
@@ -0,0 +1,25 @@
+"""Live transcript chunk model"""
+from uuid import UUID
+
+from sqlalchemy import BigInteger, ForeignKey, Identity, Text
+from sqlalchemy.dialects.postgresql import UUID as PGUUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class LiveTranscriptChunk(Base):
+    """Lines appended to a live transcript, in arrival order (see app.services.live)"""
+
+    __tablename__ = "live_transcript_chunks"
+
+    transcript_id: Mapped[UUID] = mapped_column(
+        PGUUID(as_uuid=True),
+        ForeignKey("transcripts.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    seq: Mapped[int] = mapped_column(BigInteger, Identity(always=True), primary_key=True)
+    text: Mapped[str] = mapped_column(Text, nullable=False)  # newline-terminated lines
+
+    def __repr__(self) -> str:
+        return f"<LiveTranscriptChunk(transcript_id={self.transcript_id}, seq={self.seq})>"
@@ -43,7 +43,7 @@ class Moment(Base):
     # Clip metadata
     suggested_clip_start: Mapped[float | None] = mapped_column(Float)
     suggested_clip_end: Mapped[float | None] = mapped_column(Float)
-    suggested_hook_lines: Mapped[dict] = mapped_column(JSONB, default=dict)
+    suggested_hook_lines: Mapped[list] = mapped_column(JSONB, default=list)
     requires_context: Mapped[str] = mapped_column(String(20), default="none")
 
     # Embedding for semantic search (1536 dimensions for OpenAI)
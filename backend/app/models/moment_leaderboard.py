@@ -0,0 +1,32 @@
+"""Moment leaderboard model"""
+from uuid import UUID
+
+from sqlalchemy import Float, String, Text
+from sqlalchemy.dialects.postgresql import UUID as PGUUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class MomentLeaderboard(Base):
+    """Entry of a top-moments board (maintained by DB triggers, read-only here)"""
+
+    __tablename__ = "moment_leaderboards"
+
+    metric: Mapped[str] = mapped_column(String(30), primary_key=True)  # moments column
+    scope: Mapped[str] = mapped_column(String(10), primary_key=True)  # all, creator, tag
+    scope_key: Mapped[str] = mapped_column(Text, primary_key=True)  # '', creator, tag id
+    moment_id: Mapped[UUID] = mapped_column(PGUUID(as_uuid=True), primary_key=True)
+    score: Mapped[float] = mapped_column(Float, nullable=False)
+
+    # Copied from the moment
+    video_id: Mapped[UUID] = mapped_column(PGUUID(as_uuid=True), nullable=False)
+    start_time: Mapped[float] = mapped_column(Float, nullable=False)
+    end_time: Mapped[float] = mapped_column(Float, nullable=False)
+    summary: Mapped[str] = mapped_column(Text, nullable=False)
+
+    def __repr__(self) -> str:
+        return (
+            f"<MomentLeaderboard(metric={self.metric}, scope={self.scope}, "
+            f"moment_id={self.moment_id}, score={self.score:.1f})>"
+        )
@@ -62,3 +62,23 @@ class Tag(Base):
 
     def __repr__(self) -> str:
         return f"<Tag(id={self.id}, slug={self.slug})>"
+
+
+class TagClosure(Base):
+    """Ancestor/descendant pair of the tag hierarchy (maintained by DB triggers)"""
+
+    __tablename__ = "tag_closure"
+
+    ancestor_id: Mapped[UUID] = mapped_column(
+        PGUUID(as_uuid=True), ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True
+    )
+    descendant_id: Mapped[UUID] = mapped_column(
+        PGUUID(as_uuid=True), ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True
+    )
+    depth: Mapped[int] = mapped_column(Integer, nullable=False)  # 0 = the tag itself
+
+    def __repr__(self) -> str:
+        return (
+            f"<TagClosure(ancestor_id={self.ancestor_id}, "
+            f"descendant_id={self.descendant_id}, depth={self.depth})>"
+        )
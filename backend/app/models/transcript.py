@@ -2,11 +2,12 @@
 from datetime import datetime
 from uuid import UUID, uuid4
 
-from sqlalchemy import TIMESTAMP, ForeignKey, Integer, String, Text, func
+from sqlalchemy import TIMESTAMP, ForeignKey, Integer, LargeBinary, String, Text, func
 from sqlalchemy.dialects.postgresql import UUID as PGUUID
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 
 from app.models.base import Base
+from app.services.transcript_index import build_segment_index
 
 
 class Transcript(Base):
@@ -23,14 +24,29 @@ class Transcript(Base):
     word_count: Mapped[int | None] = mapped_column(Integer)
     language: Mapped[str] = mapped_column(String(10), default="en")
 
+    # Sorted timestamp -> offset index (see app.services.transcript_index)
+    segment_index: Mapped[bytes | None] = mapped_column(LargeBinary)
+
     # Processing status
     status: Mapped[str] = mapped_column(String(20), default="pending")
+    priority: Mapped[str] = mapped_column(String(20), default="interactive")
     processed_at: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=True))
+    # Analysis lease, renewed by the worker holding it (see app.services.analysis_queue)
+    claimed_at: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=True))
     error_message: Mapped[str | None] = mapped_column(Text)
 
     # Source info
     source: Mapped[str | None] = mapped_column(String(50))
 
+    # Near-duplicate reuse (agent calls saved = windows_reused)
+    windows_analyzed: Mapped[int | None] = mapped_column(Integer)
+    windows_reused: Mapped[int | None] = mapped_column(Integer)
+    near_duplicate_of: Mapped[UUID | None] = mapped_column(
+        PGUUID(as_uuid=True), ForeignKey("transcripts.id", ondelete="SET NULL")
+    )
+    # Low-signal windows not sent to the agent (see app.services.prefilter)
+    windows_skipped: Mapped[int | None] = mapped_column(Integer)
+
     created_at: Mapped[datetime] = mapped_column(
         TIMESTAMP(timezone=True), server_default=func.now()
     )
@@ -38,5 +54,19 @@ class Transcript(Base):
     # Relationships
     video: Mapped["Video"] = relationship("Video", back_populates="transcript")
 
+    @validates("raw_text")
+    def _index_raw_text(self, key: str, raw_text: str) -> str:
+        """
+        Fill the segment index and word count from the text, unless already set
+
+        Values the caller supplied win. Code that replaces the text of an
+        existing transcript sets both first (see ``LiveIngestor.finish``).
+        """
+        if self.segment_index is None:
+            self.segment_index = build_segment_index(raw_text)
+        if self.word_count is None:
+            self.word_count = len(raw_text.split())
+        return raw_text
+
     def __repr__(self) -> str:
         return f"<Transcript(id={self.id}, video_id={self.video_id}, status={self.status})>"
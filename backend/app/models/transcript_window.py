@@ -0,0 +1,34 @@
+"""Transcript window fingerprint model"""
+from uuid import UUID
+
+from sqlalchemy import BigInteger, Float, ForeignKey, Integer, LargeBinary
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import UUID as PGUUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class TranscriptWindow(Base):
+    """MinHash fingerprint of one analysis window of a transcript"""
+
+    __tablename__ = "transcript_windows"
+
+    transcript_id: Mapped[UUID] = mapped_column(
+        PGUUID(as_uuid=True),
+        ForeignKey("transcripts.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    window_index: Mapped[int] = mapped_column(Integer, primary_key=True)
+    start_time: Mapped[float] = mapped_column(Float, nullable=False)
+    end_time: Mapped[float] = mapped_column(Float, nullable=False)
+
+    # See app.services.minhash
+    minhash: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    lsh_bands: Mapped[list[int]] = mapped_column(ARRAY(BigInteger), nullable=False)
+
+    def __repr__(self) -> str:
+        return (
+            f"<TranscriptWindow(transcript_id={self.transcript_id}, "
+            f"window_index={self.window_index})>"
+        )
@@ -1,12 +1,19 @@
 """Pydantic schemas for API request/response"""
+from app.schemas.analytics import AnalyticsSnapshotStatus, ViralityBreakdown, ViralityGroup
+from app.schemas.ingest import IngestResult, VideoIngest
+from app.schemas.live import LiveAppendResult, LiveMoment, LiveStream, LiveStreamCreate
 from app.schemas.moment import (
+    Leaderboard,
+    LeaderboardEntry,
     Moment,
     MomentCreate,
     MomentDetail,
     MomentList,
+    MomentSummary,
     MomentWithTags,
 )
 from app.schemas.search import (
+    MomentExportRequest,
     PatternDiscoveryRequest,
     PatternDiscoveryResponse,
     SearchPattern,
@@ -14,8 +21,15 @@ from app.schemas.search import (
     TagSearchRequest,
     TagSearchResponse,
 )
-from app.schemas.tag import Tag, TagDimension, TagStats, TagWithDimension
-from app.schemas.transcript import Transcript, TranscriptCreate
+from app.schemas.tag import Tag, TagAutocomplete, TagDimension, TagStats, TagWithDimension
+from app.schemas.transcript import (
+    NearDuplicateReport,
+    NearDuplicateTranscript,
+    PrefilterOperatingPoint,
+    PrefilterReport,
+    Transcript,
+    TranscriptCreate,
+)
 from app.schemas.video import Video, VideoCreate, VideoDetail, VideoList, VideoUpdate
 
 __all__ = [
@@ -25,20 +39,36 @@ __all__ = [
     "VideoUpdate",
     "VideoDetail",
     "VideoList",
+    # Ingest
+    "VideoIngest",
+    "IngestResult",
     # Transcript
     "Transcript",
     "TranscriptCreate",
+    "NearDuplicateTranscript",
+    "NearDuplicateReport",
+    "PrefilterOperatingPoint",
+    "PrefilterReport",
+    # Live
+    "LiveStreamCreate",
+    "LiveStream",
+    "LiveAppendResult",
+    "LiveMoment",
     # Moment
     "Moment",
     "MomentCreate",
     "MomentDetail",
     "MomentWithTags",
+    "MomentSummary",
     "MomentList",
+    "Leaderboard",
+    "LeaderboardEntry",
     # Tag
     "Tag",
     "TagDimension",
     "TagWithDimension",
     "TagStats",
+    "TagAutocomplete",
     # Search
     "TagSearchRequest",
     "TagSearchResponse",
@@ -46,4 +76,9 @@ __all__ = [
     "PatternDiscoveryRequest",
     "PatternDiscoveryResponse",
     "SearchPattern",
+    "MomentExportRequest",
+    # Analytics
+    "AnalyticsSnapshotStatus",
+    "ViralityBreakdown",
+    "ViralityGroup",
 ]
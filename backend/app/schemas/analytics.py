@@ -0,0 +1,32 @@
+"""Analytics snapshot schemas"""
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class AnalyticsSnapshotStatus(BaseModel):
+    """State of the columnar analytics snapshot"""
+
+    available: bool  # extra installed and a snapshot written
+    refreshed_at: datetime | None = None
+    watermark: datetime | None = None  # moments updated before this are in the snapshot
+    moments: int = 0
+    partitions: int = 0  # creation months
+
+
+class ViralityGroup(BaseModel):
+    """Score distribution of one tag, creator or platform"""
+
+    key: str
+    moments: int
+    avg_score: float
+    p90_score: float
+
+
+class ViralityBreakdown(BaseModel):
+    """Score distribution per tag, creator or source platform"""
+
+    by: str  # tag, creator, platform
+    metric: str
+    groups: list[ViralityGroup]
+    query_time_ms: float
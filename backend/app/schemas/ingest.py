@@ -0,0 +1,29 @@
+"""Bulk ingestion schemas"""
+from typing import Literal
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from app.schemas.video import VideoBase
+
+
+class VideoIngest(VideoBase):
+    """One NDJSON record: video metadata plus its transcript"""
+
+    transcript: str | None = Field(None, min_length=1)
+    transcript_language: str = Field(default="en", max_length=10)
+    transcript_source: str | None = Field(None, max_length=50)
+    analyze: bool = True
+    # Analysis scheduling class; by default transcripts longer than
+    # analysis_backfill_min_duration are backfill, the rest interactive
+    priority: Literal["interactive", "backfill"] | None = None
+
+
+class IngestResult(BaseModel):
+    """Per-record ingestion result, streamed back as NDJSON"""
+
+    line: int
+    status: str  # ok, error
+    video_id: UUID | None = None
+    transcript_id: UUID | None = None
+    error: str | None = None
@@ -0,0 +1,44 @@
+"""Live transcript ingestion schemas"""
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from app.schemas.video import VideoBase
+
+
+class LiveStreamCreate(VideoBase):
+    """Start a live transcript: video metadata, lines follow"""
+
+    transcript_language: str = Field(default="en", max_length=10)
+    transcript_source: str | None = Field(None, max_length=50)
+
+
+class LiveStream(BaseModel):
+    """State of a live transcript"""
+
+    video_id: UUID
+    transcript_id: UUID
+    status: str  # live, completed
+    windows_closed: int = 0  # windows with lines, handed to analysis
+    windows_failed: int = 0  # analysis or save raised; their moments are lost
+    moments_emitted: int = 0
+
+
+class LiveAppendResult(BaseModel):
+    """Outcome of appending transcript lines"""
+
+    lines: int
+    windows_closed: int  # windows queued for analysis by this append
+
+
+class LiveMoment(BaseModel):
+    """Moment pushed to live subscribers"""
+
+    id: UUID
+    video_id: UUID
+    start_time: float
+    end_time: float
+    summary: str
+    virality_overall: float
+    tags: list[str] = Field(default_factory=list)  # slugs
+    latency_seconds: float  # from receiving the line at start_time to this push
@@ -69,7 +69,7 @@ class Moment(MomentBase):
     # Clip metadata
     suggested_clip_start: float | None
     suggested_clip_end: float | None
-    suggested_hook_lines: dict = Field(default_factory=dict)
+    suggested_hook_lines: list[str] = Field(default_factory=list)
 
     metadata: dict = Field(default_factory=dict)
     created_at: datetime
@@ -99,6 +99,36 @@ class MomentWithTags(Moment):
     tags: dict[str, list["TagWithDimension"]] = Field(default_factory=dict)
 
 
+class MomentSummary(BaseModel):
+    """Moment as listed in search results: no transcript excerpt, metadata or embedding"""
+
+    id: UUID
+    video_id: UUID
+    start_time: float
+    end_time: float
+    summary: str
+    requires_context: str
+
+    # Virality scores
+    virality_hook_strength: float
+    virality_shareability: float
+    virality_clip_independence: float
+    virality_emotional_intensity: float
+    virality_overall: float
+
+    # Platform scores
+    platform_tiktok: float
+    platform_youtube_shorts: float
+    platform_instagram_reels: float
+    platform_twitter: float
+
+    suggested_clip_start: float | None
+    suggested_clip_end: float | None
+    created_at: datetime
+
+    tags: dict[str, list[str]] = Field(default_factory=dict)  # dimension -> [tag slugs]
+
+
 class MomentDetail(MomentWithTags):
     """Moment with video details"""
 
@@ -109,13 +139,34 @@ class MomentDetail(MomentWithTags):
 class MomentList(BaseModel):
     """Paginated moment list"""
 
-    moments: list[MomentWithTags]
+    moments: list[MomentSummary]
     total: int
     page: int
     page_size: int
     total_pages: int
 
 
+class LeaderboardEntry(BaseModel):
+    """Moment on a top-moments board"""
+
+    rank: int  # 1-based
+    moment_id: UUID
+    video_id: UUID
+    start_time: float
+    end_time: float
+    summary: str
+    score: float
+
+
+class Leaderboard(BaseModel):
+    """Top moments by one score, overall or for a creator / tag"""
+
+    metric: str  # overall, tiktok, youtube_shorts, instagram_reels, twitter
+    creator: str | None = None
+    tag: str | None = None  # slug
+    entries: list[LeaderboardEntry]
+
+
 # Forward references
 from app.schemas.tag import TagWithDimension
 
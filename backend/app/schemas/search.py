@@ -3,7 +3,7 @@ from uuid import UUID
 
 from pydantic import BaseModel, Field
 
-from app.schemas.moment import MomentWithTags
+from app.schemas.moment import MomentSummary
 
 
 class TagSearchRequest(BaseModel):
@@ -20,7 +20,7 @@ class TagSearchRequest(BaseModel):
 class TagSearchResponse(BaseModel):
     """Tag-based search response"""
 
-    moments: list[MomentWithTags]
+    moments: list[MomentSummary]
     total_count: int
     query_time_ms: float
     page: int
@@ -51,7 +51,7 @@ class SearchPattern(BaseModel):
     tag_pattern: list[str]  # tag slugs
     occurrence_count: int
     avg_virality: float
-    example_moments: list[MomentWithTags] = Field(default_factory=list)
+    example_moments: list[MomentSummary] = Field(default_factory=list)
 
 
 class PatternDiscoveryResponse(BaseModel):
@@ -68,3 +68,13 @@ class FullTextSearchRequest(BaseModel):
     query: str = Field(..., min_length=1, max_length=500)
     limit: int = Field(default=50, ge=1, le=200)
     offset: int = Field(default=0, ge=0)
+
+
+class MomentExportRequest(BaseModel):
+    """Moment export request (same filters as TagSearchRequest, no paging)"""
+
+    tags: list[str] = Field(default_factory=list)  # tag slugs
+    operator: str = Field(default="AND", pattern="^(AND|OR)$")
+    min_virality: float = Field(default=0.0, ge=0.0, le=10.0)
+    video_ids: list[UUID] | None = None
+    format: str = Field(default="ndjson", pattern="^(ndjson|csv|parquet)$")
@@ -26,8 +26,49 @@ class Transcript(TranscriptBase):
     video_id: UUID
     word_count: int | None = None
     status: str = "pending"
+    priority: str = "interactive"
     processed_at: datetime | None = None
     error_message: str | None = None
     created_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+class NearDuplicateTranscript(BaseModel):
+    """Transcript whose analysis reused windows of an earlier transcript"""
+
+    transcript_id: UUID
+    video_id: UUID
+    near_duplicate_of: UUID | None
+    windows_analyzed: int
+    windows_reused: int
+    processed_at: datetime | None
+
+
+class NearDuplicateReport(BaseModel):
+    """Agent calls saved by near-duplicate reuse (one call per window)"""
+
+    transcripts_analyzed: int
+    near_duplicates: int
+    agent_calls_made: int
+    agent_calls_saved: int
+    savings_ratio: float
+    recent: list[NearDuplicateTranscript]
+
+
+class PrefilterOperatingPoint(BaseModel):
+    """Pre-filter outcome at one score threshold"""
+
+    threshold: float
+    calls_avoided_ratio: float  # windows scored below the threshold
+    recall: float  # windows with moments scored at or above it
+
+
+class PrefilterReport(BaseModel):
+    """Pre-filter scores replayed over fully analyzed transcripts"""
+
+    transcripts: int
+    windows: int
+    windows_with_moments: int
+    current: PrefilterOperatingPoint  # at prefilter_threshold
+    curve: list[PrefilterOperatingPoint]
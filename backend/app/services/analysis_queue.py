@@ -0,0 +1,304 @@
+"""Background analysis queue backed by transcript status
+
+Pending transcripts are the queue: ingestion inserts them with status
+``pending`` and calls ``notify()``. Workers claim them with
+``FOR UPDATE SKIP LOCKED`` so several API processes can share the backlog.
+
+A claim is a lease: the worker renews ``claimed_at`` while it analyzes, and a
+transcript left 'processing' longer than ``analysis_claim_lease`` (its worker
+crashed or was killed mid-analysis) is claimed again like a pending one.
+``stop()`` puts the transcripts of its own workers back to pending right away.
+A worker whose lease was taken over stops without saving.
+
+Interactive transcripts are claimed first, and backfill transcripts never
+occupy the last ``analysis_interactive_reserved_workers`` workers, so a short
+video is picked up right away even while livestreams are being analyzed.
+Their chunks then share the agent slots through the analyzer's scheduler.
+"""
+import asyncio
+import contextlib
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING
+from uuid import UUID
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import joinedload
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.metrics import ANALYZER_WINDOWS_REUSED
+from app.models import Transcript
+from app.services.moment_store import save_moments
+from app.services.near_duplicates import plan_reuse, reused_moments
+from app.services.prefilter import select_windows, taxonomy_keywords
+from app.services.taxonomy import get_taxonomy
+
+if TYPE_CHECKING:
+    from app.services.analyzer import TranscriptAnalyzer
+
+CLAIM_PENDING_SQL = text(
+    """
+    UPDATE transcripts SET status = 'processing', claimed_at = NOW()
+    WHERE id = (
+        SELECT id FROM transcripts
+        WHERE (
+            status = 'pending'
+            OR (
+                status = 'processing'
+                AND COALESCE(claimed_at, '-infinity') < NOW() - make_interval(secs => :lease)
+            )
+        )
+        AND (priority = 'interactive' OR :allow_backfill)
+        ORDER BY priority = 'interactive' DESC, created_at
+        LIMIT 1
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING id, priority, claimed_at
+    """
+)
+
+# These only match while the worker's claim (its claimed_at) is current
+HOLD_CLAIM_SQL = text(
+    "SELECT id FROM transcripts WHERE id = :id AND claimed_at = :claimed_at FOR UPDATE"
+)
+RENEW_CLAIM_SQL = text(
+    """
+    UPDATE transcripts SET claimed_at = NOW()
+    WHERE id = :id AND status = 'processing' AND claimed_at = :claimed_at
+    RETURNING claimed_at
+    """
+)
+RELEASE_CLAIM_SQL = text(
+    """
+    UPDATE transcripts SET status = 'pending', claimed_at = NULL
+    WHERE id = :id AND status = 'processing' AND claimed_at = :claimed_at
+    """
+)
+
+
+class AnalysisQueue:
+    """Pool of workers analyzing pending transcripts"""
+
+    def __init__(
+        self,
+        workers: int = 2,
+        poll_interval: float = 5.0,
+        reserved_workers: int = 1,
+        claim_lease: float = 600.0,
+    ):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.claim_lease = claim_lease
+        # Workers kept free of backfill (at least one worker may always take it)
+        self.backfill_workers = max(workers - reserved_workers, 1)
+        self.in_progress = 0
+        self.backfill_in_progress = 0
+        self.analyzer: TranscriptAnalyzer | None = None
+        self._wakeup = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+        # Transcripts held by this process's workers -> their current claimed_at
+        self._claims: dict[UUID, datetime] = {}
+
+    @property
+    def running(self) -> bool:
+        """True while every worker task is alive"""
+        return bool(self._tasks) and all(not task.done() for task in self._tasks)
+
+    def notify(self) -> None:
+        """Wake idle workers after new transcripts were queued"""
+        self._wakeup.set()
+
+    async def start(self) -> None:
+        """Start worker tasks"""
+        if self._tasks or self.workers <= 0:
+            return
+        # Deferred so processes running without workers skip the analyzer/SDK imports
+        from app.services.analyzer import TranscriptAnalyzer
+
+        self.analyzer = TranscriptAnalyzer(
+            max_concurrent_chunks=settings.max_concurrent_chunks,
+            priority_weights=settings.analysis_priority_weights,
+        )
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Cancel worker tasks and put the transcripts they held back to pending"""
+        claims = dict(self._claims)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if not claims:
+            return
+        try:
+            async with AsyncSessionLocal() as session:
+                for transcript_id, claimed_at in claims.items():
+                    await session.execute(
+                        RELEASE_CLAIM_SQL, {"id": transcript_id, "claimed_at": claimed_at}
+                    )
+                await session.commit()
+        except Exception as e:
+            # Their leases expire and another worker picks them up
+            print(f"Analysis queue release failed: {e}")
+
+    async def _claim(self) -> tuple[UUID, str, datetime] | None:
+        """Atomically move one pending (or abandoned) transcript to 'processing'"""
+        allow_backfill = self.backfill_in_progress < self.backfill_workers
+        async with AsyncSessionLocal() as session:
+            claimed = (
+                await session.execute(
+                    CLAIM_PENDING_SQL,
+                    {"allow_backfill": allow_backfill, "lease": self.claim_lease},
+                )
+            ).first()
+            await session.commit()
+            return tuple(claimed) if claimed else None
+
+    async def _hold_claim(self, transcript_id: UUID, processing: asyncio.Task) -> None:
+        """Renew the lease while ``processing`` runs; cancel it if the lease was taken over"""
+        while True:
+            await asyncio.sleep(self.claim_lease / 3)
+            try:
+                async with AsyncSessionLocal() as session:
+                    renewed = await session.scalar(
+                        RENEW_CLAIM_SQL,
+                        {"id": transcript_id, "claimed_at": self._claims[transcript_id]},
+                    )
+                    await session.commit()
+            except Exception as e:
+                # Retry on the next tick; the lease outlasts a few failures
+                print(f"Analysis claim renewal failed: {e}")
+                continue
+            if renewed is None:
+                print(f"Analysis claim on transcript {transcript_id} was taken over")
+                processing.cancel()
+                return
+            self._claims[transcript_id] = renewed
+
+    async def _worker(self) -> None:
+        while True:
+            # Clear before claiming so a notify() during the claim isn't lost
+            self._wakeup.clear()
+            try:
+                claimed = await self._claim()
+            except Exception as e:
+                # Database hiccup: keep the worker alive and retry later
+                print(f"Analysis queue claim failed: {e}")
+                claimed = None
+            if claimed is None:
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                continue
+
+            transcript_id, priority, claimed_at = claimed
+            backfill = priority == "backfill"
+            self.in_progress += 1
+            self.backfill_in_progress += backfill
+            self._claims[transcript_id] = claimed_at
+            processing = asyncio.create_task(self._process(transcript_id))
+            holding = asyncio.create_task(self._hold_claim(transcript_id, processing))
+            try:
+                # Not awaited directly: a takeover cancels it, which must not end the worker
+                await asyncio.wait([processing])
+                if not processing.cancelled() and (error := processing.exception()):
+                    print(f"Analysis of transcript {transcript_id} failed: {error}")
+            finally:
+                holding.cancel()
+                processing.cancel()
+                await asyncio.gather(holding, processing, return_exceptions=True)
+                del self._claims[transcript_id]
+                self.in_progress -= 1
+                self.backfill_in_progress -= backfill
+                if backfill:
+                    # A backfill slot opened up; idle workers may claim one now
+                    self.notify()
+
+    async def _process(self, transcript_id: UUID) -> None:
+        """Analyze one transcript and store its moments"""
+        async with AsyncSessionLocal() as session:
+            transcript = await session.scalar(
+                select(Transcript)
+                .options(joinedload(Transcript.video))
+                .where(Transcript.id == transcript_id)
+            )
+            if transcript is None:
+                return
+
+            video = transcript.video
+            video_metadata = {"title": video.title, "creator": video.creator}
+            # Chunk scheduling class and deadline (see app.services.scheduler)
+            priority = transcript.priority
+            deadline = None
+            if (target := settings.analysis_deadlines.get(priority)) is not None:
+                deadline = (transcript.created_at + timedelta(seconds=target)).timestamp()
+            try:
+                plan = await plan_reuse(session, transcript)
+                if plan.windows:
+                    # Windows matching an analyzed near-duplicate reuse its moments
+                    novel = plan.novel_windows
+                    # Low-signal windows are deferred or skipped (see app.services.prefilter)
+                    taxonomy = await get_taxonomy(session)
+                    selection = await select_windows(
+                        [window.text for window in novel], taxonomy_keywords(taxonomy)
+                    )
+                    analyses = [
+                        self.analyzer.analyze_chunks(
+                            selection.analyze, video_metadata, priority, deadline, video.id
+                        )
+                    ]
+                    if selection.deferred:
+                        analyses.append(
+                            self.analyzer.analyze_chunks(
+                                selection.deferred, video_metadata, "deferred", video_id=video.id
+                            )
+                        )
+                    moments = [m for found in await asyncio.gather(*analyses) for m in found]
+                    if plan.matches:
+                        moments += await reused_moments(session, plan)
+                        ANALYZER_WINDOWS_REUSED.inc(len(plan.matches))
+                    if len(analyses) > 1 or plan.matches:
+                        moments = await self.analyzer.deduplicate(moments)
+                    transcript.windows_analyzed = len(novel) - selection.skipped
+                    transcript.windows_skipped = selection.skipped
+                    transcript.windows_reused = len(plan.matches)
+                    transcript.near_duplicate_of = plan.near_duplicate_of
+                else:
+                    # No timestamps: nothing to fingerprint, analyze as a whole
+                    moments = await self.analyzer.analyze_transcript(
+                        transcript.raw_text, video_metadata, priority, deadline, video.id
+                    )
+                await save_moments(
+                    session,
+                    video.id,
+                    moments,
+                    raw_text=transcript.raw_text,
+                    segment_index=transcript.segment_index,
+                )
+                transcript.status = "completed"
+                transcript.error_message = None
+            except Exception as e:
+                await session.rollback()
+                transcript = await session.get(Transcript, transcript_id)
+                transcript.status = "failed"
+                transcript.error_message = str(e)
+
+            transcript.processed_at = datetime.now(UTC)
+            # Locks the row until commit, so the claim can't be taken over in between
+            held = await session.scalar(
+                HOLD_CLAIM_SQL, {"id": transcript_id, "claimed_at": self._claims[transcript_id]}
+            )
+            if held is None:
+                # Another worker owns the transcript now; its result wins
+                await session.rollback()
+                return
+            transcript.claimed_at = None
+            await session.commit()
+
+
+# Global instance
+analysis_queue = AnalysisQueue(
+    workers=settings.analysis_workers,
+    poll_interval=settings.analysis_poll_interval,
+    reserved_workers=settings.analysis_interactive_reserved_workers,
+    claim_lease=settings.analysis_claim_lease,
+)
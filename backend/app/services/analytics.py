@@ -0,0 +1,590 @@
+"""Columnar analytics snapshot, queried with an embedded engine
+
+Tag co-occurrence and virality breakdowns scan every moment and its tags.
+Run on the primary database, they compete with interactive search. Instead,
+moments (scores, creator, platform, tag slugs) are exported to Parquet, one
+partition per creation month (UTC):
+
+    <analytics_snapshot_dir>/
+        manifest.json                                   watermark, file list
+        moments/created_month=2026-10/part-<gen>.parquet
+        tags.parquet
+
+Refreshes are incremental:
+
+- Moments whose ``updated_at`` is past the watermark (the start of the last
+  refresh) minus ``analytics_refresh_overlap`` are merged into their month
+  partitions. The overlap covers transactions that were still open then.
+- Months whose row count no longer matches Postgres drop deleted moments, or
+  are re-exported whole if rows are missing.
+- Writes that don't bump ``updated_at`` (raw SQL, tag edits that don't touch
+  the moment) are only picked up by a full refresh.
+
+Each refresh writes new files and then swaps the manifest, so a query sees
+either the old or the new snapshot. Files of the previous generation are
+removed one refresh later. Rows are streamed from Postgres and existing
+partitions read in batches of ``SNAPSHOT_BATCH_SIZE``, so a refresh holds one
+batch (plus the ids of a month being merged) in memory, not a whole month.
+
+Queries run in DuckDB (the ``analytics`` extra, with pyarrow) in a worker
+thread. DuckDB parallelizes scans itself.
+"""
+import asyncio
+import contextlib
+import importlib.util
+import json
+import os
+import threading
+import time
+from collections.abc import AsyncIterator, Iterable, Sequence
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from itertools import groupby
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncResult, AsyncSession
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models import Moment, MomentTag, Tag, Video
+from app.schemas.analytics import AnalyticsSnapshotStatus, ViralityBreakdown, ViralityGroup
+from app.schemas.search import PatternDiscoveryRequest, PatternDiscoveryResponse, SearchPattern
+from app.services.leaderboards import LEADERBOARD_METRICS
+from app.services.search import VIRALITY_OVERALL
+from app.services.taxonomy import get_taxonomy
+
+SNAPSHOT_BATCH_SIZE = 5000
+UNKNOWN_MONTH = "unknown"
+# Arbitrary key so only one process refreshes a shared snapshot directory
+REFRESH_LOCK_KEY = 0x616E616C79746963
+
+SNAPSHOT_COLUMNS = [
+    ("id", Moment.id),
+    ("video_id", Moment.video_id),
+    ("creator", Video.creator),
+    ("source_platform", Video.source_platform),
+    ("duration_seconds", Moment.end_time - Moment.start_time),
+    ("virality_hook_strength", Moment.virality_hook_strength),
+    ("virality_shareability", Moment.virality_shareability),
+    ("virality_clip_independence", Moment.virality_clip_independence),
+    ("virality_emotional_intensity", Moment.virality_emotional_intensity),
+    ("virality_overall", VIRALITY_OVERALL),
+    ("platform_tiktok", Moment.platform_tiktok),
+    ("platform_youtube_shorts", Moment.platform_youtube_shorts),
+    ("platform_instagram_reels", Moment.platform_instagram_reels),
+    ("platform_twitter", Moment.platform_twitter),
+    ("created_at", Moment.created_at),
+    ("updated_at", Moment.updated_at),
+]
+COLUMN_NAMES = [name for name, _ in SNAPSHOT_COLUMNS] + ["tags"]
+CREATED_AT = COLUMN_NAMES.index("created_at")
+
+# Group keys of virality breakdowns
+BREAKDOWN_KEYS = {"tag": "tag", "creator": "creator", "platform": "source_platform"}
+
+
+class AnalyticsUnavailableError(RuntimeError):
+    """The analytics extra is not installed or no snapshot has been written yet"""
+
+
+def analytics_available() -> bool:
+    """The snapshot needs the optional ``analytics`` extra (pyarrow + duckdb)"""
+    return all(importlib.util.find_spec(name) is not None for name in ("pyarrow", "duckdb"))
+
+
+def snapshot_schema():
+    import pyarrow as pa
+
+    types = {
+        "id": pa.string(),
+        "video_id": pa.string(),
+        "creator": pa.string(),
+        "source_platform": pa.string(),
+        "created_at": pa.timestamp("us", tz="UTC"),
+        "updated_at": pa.timestamp("us", tz="UTC"),
+        "tags": pa.list_(pa.string()),
+    }
+    return pa.schema([(name, types.get(name, pa.float64())) for name in COLUMN_NAMES])
+
+
+def snapshot_statement():
+    """Moments with creator, platform and tag slugs, in snapshot column order"""
+    tag_slugs = (
+        select(func.array_agg(Tag.slug))
+        .join(MomentTag, MomentTag.tag_id == Tag.id)
+        .where(MomentTag.moment_id == Moment.id)
+        .scalar_subquery()
+    )
+    return select(
+        *(column.label(name) for name, column in SNAPSHOT_COLUMNS), tag_slugs.label("tags")
+    ).join(Video, Moment.video_id == Video.id)
+
+
+def partition_key(created_at: datetime | None) -> str:
+    return created_at.astimezone(UTC).strftime("%Y-%m") if created_at else UNKNOWN_MONTH
+
+
+def row_partition(row: Sequence[Any]) -> str:
+    return partition_key(row[CREATED_AT])
+
+
+def month_range(key: str) -> tuple[datetime, datetime]:
+    start = datetime.strptime(key, "%Y-%m").replace(tzinfo=UTC)
+    return start, (start + timedelta(days=32)).replace(day=1)
+
+
+def rows_to_table(rows: Iterable[Sequence[Any]]):
+    """Arrow table of snapshot rows (UUIDs as strings, no tags as [])"""
+    import pyarrow as pa
+
+    schema = snapshot_schema()
+    columns = list(zip(*rows, strict=True)) or [()] * len(COLUMN_NAMES)
+    arrays = []
+    for name, values in zip(COLUMN_NAMES, columns, strict=True):
+        if name in ("id", "video_id"):
+            values = [str(value) for value in values]
+        elif name == "tags":
+            values = [value or [] for value in values]
+        arrays.append(pa.array(values, type=schema.field(name).type))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def sql_string(value: Any) -> str:
+    """SQL string literal (views can't take bound parameters)"""
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def write_parquet(table, path: Path) -> None:
+    """Write atomically (readers never see a partial file)"""
+    import pyarrow.parquet as pq
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(f".{path.name}.tmp")
+    pq.write_table(table, partial, compression="zstd")
+    os.replace(partial, path)
+
+
+class PartitionWriter:
+    """Partition file written a batch at a time, moved into place on ``close``"""
+
+    def __init__(self, directory: Path, relative: str):
+        import pyarrow.parquet as pq
+
+        self.relative = relative
+        self.path = directory / relative
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.partial = self.path.with_name(f".{self.path.name}.tmp")
+        self.rows = 0
+        self._writer = pq.ParquetWriter(self.partial, snapshot_schema(), compression="zstd")
+
+    def write(self, table) -> None:
+        self._writer.write_table(table)
+        self.rows += table.num_rows
+
+    def write_rows(self, rows: Iterable[Sequence[Any]]) -> None:
+        self.write(rows_to_table(rows))
+
+    def copy(self, source: Path, ids: list[str], keep: bool) -> None:
+        """Append the rows of ``source`` whose id is in ``ids`` (``keep``) or isn't"""
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.parquet as pq
+
+        value_set = pa.array(ids, pa.string())
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=SNAPSHOT_BATCH_SIZE):
+            found = pc.is_in(batch["id"], value_set=value_set)
+            batch = batch.filter(found if keep else pc.invert(found))
+            self.write(pa.Table.from_batches([batch]).cast(snapshot_schema()))
+
+    def close(self) -> dict[str, Any]:
+        """Publish the file; returns its manifest entry"""
+        self._writer.close()
+        os.replace(self.partial, self.path)
+        return {"file": self.relative, "rows": self.rows}
+
+
+async def month_runs(result: AsyncResult) -> AsyncIterator[tuple[str, list]]:
+    """(month, rows) runs of a result ordered by ``created_at``, one batch at a time"""
+    async for batch in result.partitions():
+        for month, rows in groupby(batch, key=row_partition):
+            yield month, list(rows)
+
+
+@dataclass
+class Manifest:
+    """Current snapshot: watermark and one file per month partition"""
+
+    generation: int = 0
+    watermark: datetime | None = None
+    refreshed_at: datetime | None = None
+    partitions: dict[str, dict[str, Any]] = field(default_factory=dict)  # month -> file, rows
+    retired: list[str] = field(default_factory=list)  # files to delete next refresh
+
+    @property
+    def moments(self) -> int:
+        return sum(partition["rows"] for partition in self.partitions.values())
+
+    @classmethod
+    def load(cls, path: Path) -> "Manifest":
+        if not path.exists():
+            return cls()
+        data = json.loads(path.read_text())
+        return cls(
+            generation=data["generation"],
+            watermark=datetime.fromisoformat(data["watermark"]) if data["watermark"] else None,
+            refreshed_at=(
+                datetime.fromisoformat(data["refreshed_at"]) if data["refreshed_at"] else None
+            ),
+            partitions=data["partitions"],
+            retired=data.get("retired", []),
+        )
+
+    def save(self, path: Path) -> None:
+        data = {
+            "generation": self.generation,
+            "watermark": self.watermark.isoformat() if self.watermark else None,
+            "refreshed_at": self.refreshed_at.isoformat() if self.refreshed_at else None,
+            "partitions": self.partitions,
+            "retired": self.retired,
+        }
+        partial = path.with_name(f".{path.name}.tmp")
+        partial.write_text(json.dumps(data, indent=1))
+        os.replace(partial, path)
+
+
+class AnalyticsSnapshot:
+    """Writes the Parquet snapshot and answers analytics queries from it"""
+
+    def __init__(self, directory: str | Path, threads: int = 4):
+        self.directory = Path(directory)
+        self.threads = threads
+        self.manifest_path = self.directory / "manifest.json"
+        self._refresh_lock = asyncio.Lock()
+        self._connection = None
+        self._connection_lock = threading.Lock()
+        self._loaded_generation: int | None = None
+
+    # Writing
+
+    async def refresh(self, session: AsyncSession, full: bool = False) -> AnalyticsSnapshotStatus:
+        """
+        Bring the snapshot up to date with Postgres
+
+        Args:
+            session: Database session
+            full: Re-export every moment instead of only changed ones
+
+        Raises:
+            AnalyticsUnavailableError: The analytics extra is not installed
+        """
+        if not analytics_available():
+            raise AnalyticsUnavailableError("Analytics requires the 'analytics' extra (pyarrow, duckdb)")
+
+        async with self._refresh_lock:
+            locked = await session.scalar(
+                text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": REFRESH_LOCK_KEY}
+            )
+            if not locked:
+                return self.status()  # another process is refreshing the same directory
+
+            started = await session.scalar(select(func.now()))
+            manifest = await asyncio.to_thread(Manifest.load, self.manifest_path)
+            previous_files = [partition["file"] for partition in manifest.partitions.values()]
+            manifest.generation += 1
+            if full or manifest.watermark is None:
+                manifest.partitions = await self._export_all(session, manifest.generation)
+            else:
+                await self._export_changes(session, manifest)
+            await self._reconcile(session, manifest)
+            await self._write_tags(session)
+
+            manifest.watermark = started
+            current = {partition["file"] for partition in manifest.partitions.values()}
+            await asyncio.to_thread(self._remove_files, manifest.retired)
+            manifest.retired = [path for path in previous_files if path not in current]
+            manifest.refreshed_at = datetime.now(UTC)
+            await asyncio.to_thread(manifest.save, self.manifest_path)
+            await session.commit()
+        return self.status()
+
+    def _partition_path(self, month: str, generation: int) -> str:
+        return f"moments/created_month={month}/part-{generation:06d}.parquet"
+
+    async def _writer(self, month: str, generation: int) -> PartitionWriter:
+        return await asyncio.to_thread(
+            PartitionWriter, self.directory, self._partition_path(month, generation)
+        )
+
+    async def _export_all(self, session: AsyncSession, generation: int) -> dict[str, dict]:
+        """Stream every moment, writing each month as its rows arrive"""
+        result = await session.stream(
+            snapshot_statement()
+            .order_by(Moment.created_at, Moment.id)
+            .execution_options(yield_per=SNAPSHOT_BATCH_SIZE)
+        )
+        partitions: dict[str, dict] = {}
+        month, writer = None, None
+        async for key, rows in month_runs(result):
+            if key != month:
+                if writer is not None:
+                    partitions[month] = await asyncio.to_thread(writer.close)
+                month, writer = key, await self._writer(key, generation)
+            await asyncio.to_thread(writer.write_rows, rows)
+        if writer is not None:
+            partitions[month] = await asyncio.to_thread(writer.close)
+        return partitions
+
+    async def _export_changes(self, session: AsyncSession, manifest: Manifest) -> None:
+        """Merge moments updated since the last refresh into their partitions"""
+        since = manifest.watermark - timedelta(seconds=settings.analytics_refresh_overlap)
+        # Ordered so each month's changes arrive together and are merged in one pass
+        result = await session.stream(
+            snapshot_statement()
+            .where(Moment.updated_at > since)
+            .order_by(Moment.created_at, Moment.id)
+            .execution_options(yield_per=SNAPSHOT_BATCH_SIZE)
+        )
+        month, writer, changed = None, None, []
+
+        async def merge() -> None:
+            existing = manifest.partitions.get(month)
+            if existing is not None:
+                await asyncio.to_thread(
+                    writer.copy, self.directory / existing["file"], changed, False
+                )
+            manifest.partitions[month] = await asyncio.to_thread(writer.close)
+
+        async for key, rows in month_runs(result):
+            if key != month:
+                if writer is not None:
+                    await merge()
+                month, writer, changed = key, await self._writer(key, manifest.generation), []
+            changed.extend(str(row[0]) for row in rows)
+            await asyncio.to_thread(writer.write_rows, rows)
+        if writer is not None:
+            await merge()
+
+    async def _reconcile(self, session: AsyncSession, manifest: Manifest) -> None:
+        """Fix months whose moment count differs from Postgres (deletions)"""
+        month_column = func.to_char(func.timezone("UTC", Moment.created_at), "YYYY-MM")
+        counts = {
+            month or UNKNOWN_MONTH: count
+            for month, count in await session.execute(
+                select(month_column, func.count()).group_by(month_column)
+            )
+        }
+        for month in list(manifest.partitions):
+            if month not in counts:
+                del manifest.partitions[month]
+        for month, count in counts.items():
+            partition = manifest.partitions.get(month)
+            if partition is not None and partition["rows"] == count:
+                continue
+            if month == UNKNOWN_MONTH:
+                in_month = Moment.created_at.is_(None)
+            else:
+                start, end = month_range(month)
+                in_month = (Moment.created_at >= start) & (Moment.created_at < end)
+
+            if partition is not None:
+                # Usually only deletions: drop ids no longer in Postgres
+                ids = []
+                result = await session.stream_scalars(
+                    select(Moment.id)
+                    .where(in_month)
+                    .execution_options(yield_per=SNAPSHOT_BATCH_SIZE)
+                )
+                async for batch in result.partitions():
+                    ids.extend(str(moment_id) for moment_id in batch)
+                writer = await self._writer(month, manifest.generation)
+                await asyncio.to_thread(writer.copy, self.directory / partition["file"], ids, True)
+                manifest.partitions[month] = await asyncio.to_thread(writer.close)
+                if writer.rows == count:
+                    continue
+
+            result = await session.stream(
+                snapshot_statement()
+                .where(in_month)
+                .execution_options(yield_per=SNAPSHOT_BATCH_SIZE)
+            )
+            writer = await self._writer(month, manifest.generation)
+            async for batch in result.partitions():
+                await asyncio.to_thread(writer.write_rows, batch)
+            manifest.partitions[month] = await asyncio.to_thread(writer.close)
+
+    async def _write_tags(self, session: AsyncSession) -> None:
+        import pyarrow as pa
+
+        taxonomy = await get_taxonomy(session)
+        table = pa.table(
+            {
+                "slug": [tag.slug for tag in taxonomy.tags],
+                "name": [tag.name for tag in taxonomy.tags],
+                "dimension": [tag.dimension for tag in taxonomy.tags],
+                "parent": [
+                    taxonomy.by_id[tag.parent_id].slug if tag.parent_id in taxonomy.by_id else None
+                    for tag in taxonomy.tags
+                ],
+                "usage_count": [tag.usage_count for tag in taxonomy.tags],
+            }
+        )
+        await asyncio.to_thread(write_parquet, table, self.directory / "tags.parquet")
+
+    def _remove_files(self, relative_paths: list[str]) -> None:
+        for relative in relative_paths:
+            with contextlib.suppress(FileNotFoundError):
+                (self.directory / relative).unlink()
+
+    # Reading
+
+    def status(self) -> AnalyticsSnapshotStatus:
+        manifest = Manifest.load(self.manifest_path)
+        return AnalyticsSnapshotStatus(
+            available=analytics_available() and manifest.refreshed_at is not None,
+            refreshed_at=manifest.refreshed_at,
+            watermark=manifest.watermark,
+            moments=manifest.moments,
+            partitions=len(manifest.partitions),
+        )
+
+    def _cursor(self):
+        """DuckDB cursor whose ``moments`` / ``tags`` views match the current manifest"""
+        manifest = Manifest.load(self.manifest_path)
+        if not manifest.partitions:
+            raise AnalyticsUnavailableError("The analytics snapshot is empty (not refreshed yet?)")
+
+        with self._connection_lock:
+            if self._connection is None:
+                import duckdb
+
+                self._connection = duckdb.connect(config={"threads": self.threads})
+            if self._loaded_generation != manifest.generation:
+                files = ", ".join(
+                    sql_string(self.directory / partition["file"])
+                    for partition in manifest.partitions.values()
+                )
+                self._connection.execute(
+                    f"CREATE OR REPLACE VIEW moments AS SELECT * FROM read_parquet([{files}])"
+                )
+                self._connection.execute(
+                    "CREATE OR REPLACE VIEW tags AS SELECT * FROM "
+                    f"read_parquet({sql_string(self.directory / 'tags.parquet')})"
+                )
+                self._loaded_generation = manifest.generation
+            return self._connection.cursor()
+
+    def _query(self, sql: str, params: list[Any]) -> list[tuple]:
+        with contextlib.closing(self._cursor()) as cursor:
+            return cursor.execute(sql, params).fetchall()
+
+    async def query(self, sql: str, params: list[Any] | None = None) -> list[tuple]:
+        """Run SQL over the ``moments`` and ``tags`` views in a worker thread"""
+        if not analytics_available():
+            raise AnalyticsUnavailableError("Analytics requires the 'analytics' extra (pyarrow, duckdb)")
+        return await asyncio.to_thread(self._query, sql, params or [])
+
+    async def patterns(self, request: PatternDiscoveryRequest) -> PatternDiscoveryResponse:
+        """Tag pairs that co-occur on moments, as ``discover_patterns`` but from the snapshot"""
+        started = time.perf_counter()
+        rows = await self.query(
+            """
+            WITH tagged AS (
+                SELECT id, virality_overall, unnest(tags) AS tag
+                FROM moments
+                WHERE virality_overall >= ?
+            )
+            SELECT first.tag, second.tag, count(*) AS occurrences,
+                   avg(first.virality_overall) AS avg_virality
+            FROM tagged AS first
+            JOIN tagged AS second ON first.id = second.id AND first.tag < second.tag
+            GROUP BY first.tag, second.tag
+            HAVING count(*) >= ?
+            ORDER BY avg_virality DESC
+            LIMIT ?
+            """,
+            [request.min_virality, request.min_occurrences, request.limit],
+        )
+        patterns = [
+            SearchPattern(tag_pattern=[first, second], occurrence_count=count, avg_virality=avg)
+            for first, second, count, avg in rows
+        ]
+        return PatternDiscoveryResponse(
+            patterns=patterns,
+            total_patterns=len(patterns),
+            query_time_ms=(time.perf_counter() - started) * 1000,
+        )
+
+    async def virality_breakdown(
+        self,
+        by: str = "tag",
+        metric: str = "overall",
+        min_moments: int = 10,
+        limit: int = 50,
+    ) -> ViralityBreakdown:
+        """Moment count, mean and p90 of a score per tag, creator or source platform"""
+        started = time.perf_counter()
+        score = LEADERBOARD_METRICS[metric]
+        source = (
+            f"SELECT unnest(tags) AS key, {score} AS score FROM moments"
+            if by == "tag"
+            else f"SELECT {BREAKDOWN_KEYS[by]} AS key, {score} AS score FROM moments"
+        )
+        rows = await self.query(
+            f"""
+            SELECT key, count(*) AS moments, avg(score), quantile_cont(score, 0.9)
+            FROM ({source})
+            WHERE key IS NOT NULL
+            GROUP BY key
+            HAVING count(*) >= ?
+            ORDER BY avg(score) DESC
+            LIMIT ?
+            """,
+            [min_moments, limit],
+        )
+        return ViralityBreakdown(
+            by=by,
+            metric=metric,
+            groups=[
+                ViralityGroup(key=key, moments=count, avg_score=avg, p90_score=p90)
+                for key, count, avg, p90 in rows
+            ],
+            query_time_ms=(time.perf_counter() - started) * 1000,
+        )
+
+
+class SnapshotRefresher:
+    """Refreshes the analytics snapshot on an interval in the background"""
+
+    def __init__(self, snapshot: AnalyticsSnapshot, interval: float):
+        self.snapshot = snapshot
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        if self.interval > 0 and analytics_available():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                async with AsyncSessionLocal() as session:
+                    await self.snapshot.refresh(session)
+            except Exception as e:
+                print(f"Analytics snapshot refresh failed: {e}")
+            await asyncio.sleep(self.interval)
+
+
+# Global instances
+analytics_snapshot = AnalyticsSnapshot(
+    settings.analytics_snapshot_dir, threads=settings.analytics_threads
+)
+snapshot_refresher = SnapshotRefresher(analytics_snapshot, settings.analytics_refresh_interval)
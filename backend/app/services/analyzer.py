@@ -1,22 +1,59 @@
 """AI-powered transcript analysis using Claude Agent SDK"""
 import asyncio
-import json
+import time
+from collections.abc import AsyncIterator, Callable, Hashable
 from typing import Any
-
-from claude_agent_sdk import query
+from uuid import uuid4
+
+from app.config import settings
+from app.metrics import (
+    ANALYZER_AGENT_CALL_SECONDS,
+    ANALYZER_CHUNKS,
+    ANALYZER_CHUNKS_IN_FLIGHT,
+    ANALYZER_JSON_EXTRACTION_FAILURES,
+    ANALYZER_MOMENTS_PER_CHUNK,
+)
+from app.services.executor import CpuExecutor, cpu_executor
+from app.services.pipeline import (
+    chunk_transcript,
+    extract_moments,
+    moment_bounds,
+    select_distinct_moments,
+)
+from app.services.scheduler import ChunkScheduler, Job
+
+# Payload bytes per moment sent for deduplication (three float64 columns)
+MOMENT_BOUNDS_BYTES = 24
 
 
 class TranscriptAnalyzer:
     """Analyzes video transcripts using Claude Agent SDK"""
 
-    def __init__(self, max_concurrent_chunks: int = 5):
+    def __init__(
+        self,
+        max_concurrent_chunks: int = 5,
+        query_fn: Callable[..., AsyncIterator[Any]] | None = None,
+        executor: CpuExecutor | None = None,
+        priority_weights: dict[str, float] | None = None,
+    ):
         self.max_concurrent_chunks = max_concurrent_chunks
-        self.semaphore = asyncio.Semaphore(max_concurrent_chunks)
+        # CPU-bound stages (chunking, JSON extraction, dedup) run here
+        self.executor = executor or cpu_executor
+        # Shares the agent slots fairly between videos (see app.services.scheduler)
+        self.scheduler = ChunkScheduler(max_concurrent_chunks, priority_weights)
+        # Agent backend; defaults to the SDK, replaceable for benchmarks
+        if query_fn is None:
+            # Imported here so API-only processes never load the SDK
+            from claude_agent_sdk import query as query_fn
+        self.query = query_fn
 
     async def analyze_transcript(
         self,
         transcript: str,
         video_metadata: dict[str, Any],
+        priority: str = "interactive",
+        deadline: float | None = None,
+        video_id: Hashable | None = None,
     ) -> list[dict[str, Any]]:
         """
         Analyze full transcript and return tagged moments
@@ -24,31 +61,70 @@ class TranscriptAnalyzer:
         Args:
             transcript: Full video transcript with timestamps
             video_metadata: Video title, creator, etc.
+            priority: Scheduling class ("interactive" or "backfill")
+            deadline: Epoch seconds by which the analysis should be done
+            video_id: Calls for the same video share one scheduler job
 
         Returns:
             List of moment dictionaries with tags and scores
         """
         # Split transcript into chunks
-        chunks = self._chunk_transcript(transcript)
+        chunks = await self.executor.run(
+            chunk_transcript,
+            transcript,
+            settings.transcript_chunk_size,
+            settings.transcript_chunk_overlap,
+            size=len(transcript),
+        )
+        return await self.analyze_chunks(chunks, video_metadata, priority, deadline, video_id)
+
+    async def analyze_chunks(
+        self,
+        chunks: list[str],
+        video_metadata: dict[str, Any],
+        priority: str = "interactive",
+        deadline: float | None = None,
+        video_id: Hashable | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Analyze transcript chunks (one agent call each) and deduplicate the moments
 
-        # Process chunks in parallel with concurrency limit
-        tasks = [self._analyze_chunk(chunk, video_metadata) for chunk in chunks]
-        chunk_results = await asyncio.gather(*tasks)
+        Calls passing the same ``video_id`` (e.g. the windows of a livestream)
+        share the video's fair share of agent slots; without one, the call is
+        a video of its own.
+        """
+        # Process chunks in parallel; the scheduler decides which video gets the next slot
+        with self.scheduler.job(video_id or uuid4(), priority) as job:
+            tasks = [
+                self._analyze_chunk(chunk, video_metadata, job, deadline) for chunk in chunks
+            ]
+            chunk_results = await asyncio.gather(*tasks)
 
         # Flatten and deduplicate moments
         all_moments = []
         for moments in chunk_results:
             all_moments.extend(moments)
 
-        return self._deduplicate_moments(all_moments)
+        return await self.deduplicate(all_moments)
+
+    async def deduplicate(self, moments: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Remove overlapping moments, keeping the most viral"""
+        # Only (start, end, score) columns go to the worker; it returns indexes to keep
+        bounds = moment_bounds(moments)
+        kept = await self.executor.run(
+            select_distinct_moments, *bounds, size=len(moments) * MOMENT_BOUNDS_BYTES
+        )
+        return [moments[i] for i in kept]
 
     async def _analyze_chunk(
         self,
         chunk: str,
         video_metadata: dict[str, Any],
+        job: Job,
+        deadline: float | None,
     ) -> list[dict[str, Any]]:
         """Analyze a single chunk using moment-tagger agent"""
-        async with self.semaphore:
+        async with self.scheduler.slot(job, deadline):
             prompt = f"""Use the moment-tagger agent to analyze this transcript chunk.
 
 Video: {video_metadata.get('title', 'Unknown')}
@@ -59,97 +135,29 @@ Transcript:
 
 Return a JSON array of moments with tags and scores."""
 
-            moments = []
-            async for message in query(prompt=prompt):
-                # Parse agent response for JSON moments
-                if hasattr(message, "content"):
-                    for block in message.content:
-                        if hasattr(block, "text"):
-                            # Extract JSON from text
-                            text = block.text
-                            moments.extend(self._extract_moments_from_text(text))
-
-            return moments
-
-    def _chunk_transcript(
-        self,
-        transcript: str,
-        chunk_size: int = 180,
-        overlap: int = 30,
-    ) -> list[str]:
-        """
-        Split transcript into overlapping chunks
-
-        Args:
-            transcript: Full transcript text
-            chunk_size: Target chunk duration in seconds
-            overlap: Overlap duration in seconds
-
-        Returns:
-            List of transcript chunks
-        """
-        # TODO: Implement timestamp-aware chunking
-        # For now, split by line count as placeholder
-        lines = transcript.split("\n")
-        chunks = []
-        step_size = max(1, len(lines) // 10)  # ~10 chunks
-
-        for i in range(0, len(lines), step_size):
-            chunk = "\n".join(lines[i : i + step_size + 5])  # Add overlap
-            if chunk.strip():
-                chunks.append(chunk)
-
-        return chunks
-
-    def _extract_moments_from_text(self, text: str) -> list[dict[str, Any]]:
-        """Extract JSON moments from agent response text"""
-        moments = []
-
-        # Try to find JSON blocks in the text
-        try:
-            # Look for JSON array
-            if "[" in text and "]" in text:
-                start = text.index("[")
-                end = text.rindex("]") + 1
-                json_str = text[start:end]
-                moments = json.loads(json_str)
-        except (ValueError, json.JSONDecodeError):
-            # Try to find individual JSON objects
+            texts = []
+            ANALYZER_CHUNKS_IN_FLIGHT.inc()
+            started = time.perf_counter()
             try:
-                if "{" in text and "}" in text:
-                    start = text.index("{")
-                    end = text.rindex("}") + 1
-                    json_str = text[start:end]
-                    moment = json.loads(json_str)
-                    moments = [moment]
-            except (ValueError, json.JSONDecodeError):
-                pass
-
-        return moments if isinstance(moments, list) else []
-
-    def _deduplicate_moments(self, moments: list[dict[str, Any]]) -> list[dict[str, Any]]:
-        """Remove duplicate moments based on timestamp overlap"""
-        if not moments:
-            return []
-
-        # Sort by start time
-        sorted_moments = sorted(moments, key=lambda m: m.get("start_time", 0))
-
-        deduplicated = [sorted_moments[0]]
-
-        for moment in sorted_moments[1:]:
-            last_moment = deduplicated[-1]
-            last_end = last_moment.get("end_time", 0)
-            current_start = moment.get("start_time", 0)
-
-            # If moments don't overlap significantly, keep both
-            if current_start >= last_end - 10:  # 10 second tolerance
-                deduplicated.append(moment)
-            else:
-                # Keep the one with higher virality score
-                last_score = last_moment.get("virality_scores", {}).get("overall", 0)
-                current_score = moment.get("virality_scores", {}).get("overall", 0)
-                if current_score > last_score:
-                    deduplicated[-1] = moment
-
-        return deduplicated
+                async for message in self.query(prompt=prompt):
+                    # Collect agent text blocks; JSON is parsed off the event loop
+                    if hasattr(message, "content"):
+                        for block in message.content:
+                            if hasattr(block, "text"):
+                                texts.append(block.text)
+            except Exception:
+                ANALYZER_CHUNKS.labels("error").inc()
+                raise
+            finally:
+                ANALYZER_CHUNKS_IN_FLIGHT.dec()
+                ANALYZER_AGENT_CALL_SECONDS.observe(time.perf_counter() - started)
+
+        moments, failures = await self.executor.run(
+            extract_moments, texts, size=sum(len(text) for text in texts)
+        )
+        if failures:
+            ANALYZER_JSON_EXTRACTION_FAILURES.inc(failures)
+
+        ANALYZER_CHUNKS.labels("ok").inc()
+        ANALYZER_MOMENTS_PER_CHUNK.observe(len(moments))
+        return moments
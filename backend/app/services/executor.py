@@ -0,0 +1,85 @@
+"""Process pool for CPU-bound pipeline stages
+
+Parsing, chunking and deduplicating large transcripts holds the GIL for
+hundreds of milliseconds; run on the event loop, that stalls every concurrent
+request. ``cpu_executor.run`` ships such work to worker processes instead.
+Functions must be module-level (picklable) and exchange plain data; see
+``app.services.pipeline``.
+"""
+import asyncio
+import multiprocessing
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, TypeVar
+
+from app.config import settings
+
+T = TypeVar("T")
+
+
+def _noop() -> None:
+    pass
+
+
+class CpuExecutor:
+    """Lazily started process pool with an inline fallback for small payloads"""
+
+    def __init__(self, workers: int = 2, min_offload_size: int = 65_536):
+        self.workers = workers
+        self.min_offload_size = min_offload_size
+        self._pool: ProcessPoolExecutor | None = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn, not fork: forking a process with running threads and an
+            # event loop can deadlock the child
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+    def start(self) -> None:
+        """Spawn the workers now so the first offloaded call doesn't pay for it"""
+        if self.workers > 0:
+            pool = self._get_pool()
+            for _ in range(self.workers):
+                pool.submit(_noop)
+
+    async def stop(self) -> None:
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            await asyncio.to_thread(pool.shutdown, wait=True, cancel_futures=True)
+
+    async def run(self, fn: Callable[..., T], *args: Any, size: int | None = None) -> T:
+        """
+        Run ``fn(*args)`` in a worker process
+
+        Args:
+            fn: Module-level function taking and returning picklable data
+            args: Positional arguments for ``fn``
+            size: Payload size hint (e.g. characters); smaller payloads than
+                ``min_offload_size`` run inline, where pickling would cost
+                more than the work itself
+
+        Returns:
+            The result of ``fn``
+        """
+        if self.workers <= 0 or (size is not None and size < self.min_offload_size):
+            return fn(*args)
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._get_pool(), fn, *args)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM); start a fresh pool for later calls
+            self._pool = None
+            raise
+
+
+# Global instance
+cpu_executor = CpuExecutor(
+    workers=settings.cpu_workers,
+    min_offload_size=settings.cpu_offload_min_size,
+)
@@ -0,0 +1,200 @@
+"""Streaming moment export (NDJSON, CSV, Parquet)
+
+Rows are read through a server-side cursor in partitions of ``EXPORT_BATCH_SIZE``
+and encoded one partition at a time, so server memory stays constant no matter
+how many moments match.
+"""
+import csv
+import importlib.util
+import io
+import json
+from collections.abc import AsyncIterator, Iterable, Sequence
+from typing import Any
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Moment, MomentTag, Tag, Video
+from app.schemas.search import MomentExportRequest
+from app.services.search import VIRALITY_OVERALL, moment_filters
+
+EXPORT_BATCH_SIZE = 2000
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+EXPORT_COLUMNS = [
+    ("id", Moment.id),
+    ("video_id", Moment.video_id),
+    ("video_title", Video.title),
+    ("video_creator", Video.creator),
+    ("start_time", Moment.start_time),
+    ("end_time", Moment.end_time),
+    ("summary", Moment.summary),
+    ("transcript_excerpt", Moment.transcript_excerpt),
+    ("virality_hook_strength", Moment.virality_hook_strength),
+    ("virality_shareability", Moment.virality_shareability),
+    ("virality_clip_independence", Moment.virality_clip_independence),
+    ("virality_emotional_intensity", Moment.virality_emotional_intensity),
+    ("virality_overall", VIRALITY_OVERALL),
+    ("platform_tiktok", Moment.platform_tiktok),
+    ("platform_youtube_shorts", Moment.platform_youtube_shorts),
+    ("platform_instagram_reels", Moment.platform_instagram_reels),
+    ("platform_twitter", Moment.platform_twitter),
+    ("suggested_clip_start", Moment.suggested_clip_start),
+    ("suggested_clip_end", Moment.suggested_clip_end),
+    ("requires_context", Moment.requires_context),
+    ("created_at", Moment.created_at),
+]
+COLUMN_NAMES = [name for name, _ in EXPORT_COLUMNS] + ["tags"]
+
+
+def parquet_available() -> bool:
+    """Parquet export needs the optional ``export`` extra (pyarrow)"""
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def export_statement(request: MomentExportRequest) -> Select:
+    """Moments with video info and tag slugs, filtered like a tag search"""
+    # Correlated subquery keeps the plan streamable (no GROUP BY over all rows)
+    tag_slugs = (
+        select(func.array_agg(Tag.slug))
+        .join(MomentTag, MomentTag.tag_id == Tag.id)
+        .where(MomentTag.moment_id == Moment.id)
+        .scalar_subquery()
+    )
+    return (
+        select(*(column.label(name) for name, column in EXPORT_COLUMNS), tag_slugs.label("tags"))
+        .join(Video, Moment.video_id == Video.id)
+        .where(
+            *moment_filters(
+                request.tags, request.operator, request.min_virality, request.video_ids
+            )
+        )
+        .order_by(Moment.id)
+    )
+
+
+def _normalize(rows: Iterable[Sequence[Any]]) -> list[tuple]:
+    """array_agg over no tags yields NULL; export an empty list instead"""
+    return [(*row[:-1], row[-1] or []) for row in rows]
+
+
+def _encode_ndjson(rows: Sequence[Sequence[Any]]) -> bytes:
+    return "".join(
+        json.dumps(dict(zip(COLUMN_NAMES, row, strict=True)), default=str) + "\n"
+        for row in rows
+    ).encode()
+
+
+def _encode_csv(rows: Sequence[Sequence[Any]], header: bool) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(COLUMN_NAMES)
+    for row in rows:
+        writer.writerow([*row[:-1], "|".join(row[-1])])
+    return buffer.getvalue().encode()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object whose contents are drained after each row group"""
+
+    def __init__(self):
+        self.chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def _parquet_schema():
+    import pyarrow as pa
+
+    types = {
+        "id": pa.string(),
+        "video_id": pa.string(),
+        "video_title": pa.string(),
+        "video_creator": pa.string(),
+        "summary": pa.string(),
+        "transcript_excerpt": pa.string(),
+        "requires_context": pa.string(),
+        "created_at": pa.timestamp("us", tz="UTC"),
+        "tags": pa.list_(pa.string()),
+    }
+    return pa.schema([(name, types.get(name, pa.float64())) for name in COLUMN_NAMES])
+
+
+async def _encode_parquet(
+    partitions: AsyncIterator[Iterable[Sequence[Any]]],
+) -> AsyncIterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _parquet_schema()
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        async for rows in partitions:
+            columns = list(zip(*_normalize(rows), strict=True))
+            arrays = [
+                pa.array(
+                    [str(value) for value in values] if name in ("id", "video_id") else values,
+                    type=schema.field(name).type,
+                )
+                for name, values in zip(COLUMN_NAMES, columns, strict=True)
+            ]
+            # One row group per partition; flush it to the client right away
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+async def stream_moments(
+    session: AsyncSession,
+    request: MomentExportRequest,
+) -> AsyncIterator[bytes]:
+    """
+    Stream matching moments encoded as ``request.format``
+
+    Args:
+        session: Database session (kept open for the whole stream)
+        request: Export filters and output format
+
+    Yields:
+        Encoded chunks, one per cursor partition
+    """
+    result = await session.stream(
+        export_statement(request).execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    partitions = result.partitions()
+
+    if request.format == "parquet":
+        async for chunk in _encode_parquet(partitions):
+            yield chunk
+        return
+
+    header = True
+    async for partition in partitions:
+        rows = _normalize(partition)
+        if request.format == "csv":
+            yield _encode_csv(rows, header)
+            header = False
+        else:
+            yield _encode_ndjson(rows)
+
+    if request.format == "csv" and header:
+        yield _encode_csv([], header=True)
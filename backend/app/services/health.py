@@ -0,0 +1,171 @@
+"""Background dependency checks for liveness/readiness probes
+
+Checks run on a fixed interval in a background task and probes only read the
+cached results, so load balancer traffic adds no load to the database. The
+database check uses its own connection rather than the pool: a saturated pool
+must show up as saturation, not as "database down".
+"""
+import asyncio
+import contextlib
+import importlib.util
+import shutil
+import time
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from typing import Any
+
+import asyncpg
+
+from app.config import settings
+from app.database import driver_connect_args, engine
+from app.services.analysis_queue import analysis_queue
+
+
+@dataclass
+class CheckResult:
+    """Outcome of one dependency check"""
+
+    ok: bool
+    checked_at: datetime
+    latency_ms: float | None = None
+    error: str | None = None
+
+
+class HealthMonitor:
+    """Periodically checks the database and analyzer backend"""
+
+    def __init__(
+        self,
+        interval: float = 10.0,
+        timeout: float = 2.0,
+        max_pool_saturation: float = 0.95,
+    ):
+        self.interval = interval
+        self.timeout = timeout
+        self.max_pool_saturation = max_pool_saturation
+        self.database: CheckResult | None = None
+        self.analyzer: CheckResult | None = None
+        self.pending_transcripts: int | None = None
+        self.started_at = time.monotonic()
+        self._connection: asyncpg.Connection | None = None
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        """Run the first checks, then keep refreshing in the background"""
+        await self.check()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.check()
+
+    async def check(self) -> None:
+        """Refresh all cached check results"""
+        self.database = await self._check_database()
+        self.analyzer = self._check_analyzer()
+
+    async def _check_database(self) -> CheckResult:
+        started = time.perf_counter()
+        try:
+            async with asyncio.timeout(self.timeout):
+                if self._connection is None or self._connection.is_closed():
+                    self._connection = await asyncpg.connect(
+                        settings.database_url, **driver_connect_args()
+                    )
+                self.pending_transcripts = await self._connection.fetchval(
+                    "SELECT COUNT(*) FROM transcripts WHERE status = 'pending'"
+                )
+        except Exception as e:
+            if self._connection is not None:
+                self._connection.terminate()
+                self._connection = None
+            return CheckResult(ok=False, checked_at=datetime.now(UTC), error=str(e) or repr(e))
+
+        return CheckResult(
+            ok=True,
+            checked_at=datetime.now(UTC),
+            latency_ms=(time.perf_counter() - started) * 1000,
+        )
+
+    def _check_analyzer(self) -> CheckResult:
+        """The SDK must be installed, its CLI on PATH, and workers alive"""
+        error = None
+        if importlib.util.find_spec("claude_agent_sdk") is None:
+            error = "claude_agent_sdk not installed"
+        elif shutil.which("claude") is None:
+            error = "claude CLI not found on PATH"
+        elif analysis_queue.workers > 0 and not analysis_queue.running:
+            error = "analysis workers not running"
+        return CheckResult(ok=error is None, checked_at=datetime.now(UTC), error=error)
+
+    def _is_fresh(self, result: CheckResult | None) -> bool:
+        if result is None:
+            return False
+        age = (datetime.now(UTC) - result.checked_at).total_seconds()
+        return age <= 3 * self.interval
+
+    def pool_status(self) -> dict[str, Any]:
+        """Current pool usage (cheap attribute reads, no I/O)"""
+        capacity = settings.db_pool_size + settings.db_max_overflow
+        checked_out = engine.pool.checkedout()
+        return {
+            "size": settings.db_pool_size,
+            "max_overflow": settings.db_max_overflow,
+            "checked_out": checked_out,
+            "saturation": checked_out / capacity if capacity else 0.0,
+        }
+
+    def queue_status(self) -> dict[str, Any]:
+        return {
+            "workers": analysis_queue.workers,
+            "in_progress": analysis_queue.in_progress,
+            "pending": self.pending_transcripts,
+        }
+
+    def liveness(self) -> dict[str, Any]:
+        return {
+            "status": "alive",
+            "uptime_seconds": round(time.monotonic() - self.started_at, 1),
+        }
+
+    def readiness(self) -> tuple[bool, dict[str, Any]]:
+        """
+        Whether this process should receive traffic, with details
+
+        Not ready when the last database check failed or is stale, or when the
+        connection pool is saturated. The analyzer is reported but does not
+        gate readiness, since API requests don't depend on it.
+        """
+        pool = self.pool_status()
+        reasons = []
+        if not (self._is_fresh(self.database) and self.database.ok):
+            reasons.append("database unavailable")
+        if pool["saturation"] >= self.max_pool_saturation:
+            reasons.append("connection pool saturated")
+
+        return not reasons, {
+            "status": "ready" if not reasons else "not_ready",
+            "reasons": reasons,
+            "database": asdict(self.database) if self.database else None,
+            "analyzer": asdict(self.analyzer) if self.analyzer else None,
+            "pool": pool,
+            "analysis_queue": self.queue_status(),
+        }
+
+
+# Global instance
+health_monitor = HealthMonitor(
+    interval=settings.health_check_interval,
+    timeout=settings.health_check_timeout,
+    max_pool_saturation=settings.readiness_max_pool_saturation,
+)
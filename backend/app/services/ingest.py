@@ -0,0 +1,228 @@
+"""Streaming bulk ingestion of videos and transcripts
+
+Records arrive as NDJSON and are parsed one line at a time. Valid records are
+buffered into batches and written with COPY, so throughput is bounded by
+Postgres rather than per-request overhead. The caller pulls results lazily,
+which means the request body is only read as fast as batches are flushed.
+"""
+import json
+from collections.abc import AsyncIterable, AsyncIterator
+from uuid import UUID, uuid4
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.schemas.ingest import IngestResult, VideoIngest
+from app.services.executor import cpu_executor
+from app.services.pipeline import index_transcripts
+
+VIDEO_COLUMNS = [
+    "id",
+    "title",
+    "source_url",
+    "source_platform",
+    "creator",
+    "creator_id",
+    "duration_seconds",
+    "published_at",
+    "thumbnail_url",
+    "metadata",
+]
+
+TRANSCRIPT_COLUMNS = [
+    "id",
+    "video_id",
+    "raw_text",
+    "word_count",
+    "language",
+    "source",
+    "segment_index",
+    "status",
+    "priority",
+]
+
+WINDOW_COLUMNS = [
+    "transcript_id",
+    "window_index",
+    "start_time",
+    "end_time",
+    "minhash",
+    "lsh_bands",
+]
+
+
+class RecordTooLargeError(ValueError):
+    """An NDJSON record exceeded the configured size limit"""
+
+
+async def iter_ndjson_lines(
+    chunks: AsyncIterable[bytes],
+    max_record_bytes: int,
+) -> AsyncIterator[bytes]:
+    """Split a byte stream into NDJSON lines without buffering the whole body"""
+    buffer = bytearray()
+    async for chunk in chunks:
+        buffer.extend(chunk)
+        start = 0
+        while (newline := buffer.find(b"\n", start)) != -1:
+            yield bytes(buffer[start:newline])
+            start = newline + 1
+        del buffer[:start]
+        if len(buffer) > max_record_bytes:
+            raise RecordTooLargeError(f"Record exceeds {max_record_bytes} bytes")
+    if buffer:
+        yield bytes(buffer)
+
+
+def analysis_priority(record: VideoIngest, duration: float) -> str:
+    """Scheduling class of a record's transcript (see app.services.scheduler)"""
+    if record.priority:
+        return record.priority
+    duration = record.duration_seconds or duration
+    return "backfill" if duration > settings.analysis_backfill_min_duration else "interactive"
+
+
+class BulkIngestor:
+    """Validates NDJSON records and writes them to Postgres in COPY batches"""
+
+    def __init__(self, session: AsyncSession, batch_size: int = 500):
+        self.session = session
+        self.batch_size = batch_size
+        self.queued_for_analysis = 0
+
+    async def ingest(self, lines: AsyncIterable[bytes]) -> AsyncIterator[IngestResult]:
+        """
+        Ingest NDJSON lines, yielding one result per non-blank line
+
+        Args:
+            lines: Raw NDJSON lines (see ``iter_ndjson_lines``)
+
+        Yields:
+            IngestResult for every record; validation errors immediately,
+            valid records once their batch is flushed
+        """
+        batch: list[tuple[int, VideoIngest]] = []
+        line_number = 0
+
+        async for line in lines:
+            line_number += 1
+            if not line.strip():
+                continue
+
+            try:
+                record = VideoIngest.model_validate_json(line)
+            except ValidationError as e:
+                yield IngestResult(
+                    line=line_number,
+                    status="error",
+                    error=json.dumps(e.errors(include_url=False, include_input=False)),
+                )
+                continue
+
+            batch.append((line_number, record))
+            if len(batch) >= self.batch_size:
+                for result in await self._flush(batch):
+                    yield result
+                batch = []
+
+        if batch:
+            for result in await self._flush(batch):
+                yield result
+
+    async def _flush(self, batch: list[tuple[int, VideoIngest]]) -> list[IngestResult]:
+        """COPY one batch of videos and transcripts in a single transaction"""
+        videos = []
+        transcripts = []
+        results = []
+
+        for line_number, record in batch:
+            video_id = uuid4()
+            transcript_id: UUID | None = None
+            videos.append(
+                (
+                    video_id,
+                    record.title,
+                    record.source_url,
+                    record.source_platform,
+                    record.creator,
+                    record.creator_id,
+                    record.duration_seconds,
+                    record.published_at,
+                    record.thumbnail_url,
+                    json.dumps(record.metadata),
+                )
+            )
+            if record.transcript is not None:
+                transcript_id = uuid4()
+                transcripts.append((transcript_id, video_id, record))
+            results.append(
+                IngestResult(
+                    line=line_number,
+                    status="ok",
+                    video_id=video_id,
+                    transcript_id=transcript_id,
+                )
+            )
+
+        try:
+            # Word counts and segment indexes are CPU-bound; build them off the event loop
+            texts = [record.transcript for _, _, record in transcripts]
+            indexes = await cpu_executor.run(
+                index_transcripts,
+                texts,
+                settings.transcript_chunk_size,
+                settings.transcript_chunk_overlap,
+                size=sum(len(text) for text in texts),
+            )
+            transcript_rows = [
+                (
+                    transcript_id,
+                    video_id,
+                    record.transcript,
+                    word_count,
+                    record.transcript_language,
+                    record.transcript_source,
+                    segment_index,
+                    # 'skipped' transcripts are stored but never claimed for analysis
+                    "pending" if record.analyze else "skipped",
+                    # Last window end approximates the duration of timestamped transcripts
+                    analysis_priority(record, fingerprints[-1][2] if fingerprints else 0.0),
+                )
+                for (transcript_id, video_id, record), (
+                    word_count,
+                    segment_index,
+                    fingerprints,
+                ) in zip(transcripts, indexes, strict=True)
+            ]
+            # Near-duplicate fingerprints (see app.services.near_duplicates)
+            window_rows = [
+                (transcript_id, window_index, start, end, minhash, bands)
+                for (transcript_id, _, _), (_, _, fingerprints) in zip(
+                    transcripts, indexes, strict=True
+                )
+                for window_index, start, end, minhash, bands in fingerprints
+            ]
+
+            connection = await self.session.connection()
+            raw_connection = await connection.get_raw_connection()
+            driver = raw_connection.driver_connection
+            await driver.copy_records_to_table("videos", records=videos, columns=VIDEO_COLUMNS)
+            if transcript_rows:
+                await driver.copy_records_to_table(
+                    "transcripts", records=transcript_rows, columns=TRANSCRIPT_COLUMNS
+                )
+            if window_rows:
+                await driver.copy_records_to_table(
+                    "transcript_windows", records=window_rows, columns=WINDOW_COLUMNS
+                )
+            await self.session.commit()
+        except Exception as e:
+            await self.session.rollback()
+            return [
+                IngestResult(line=result.line, status="error", error=f"Batch failed: {e}")
+                for result in results
+            ]
+
+        self.queued_for_analysis += sum(1 for _, _, record in transcripts if record.analyze)
+        return results
@@ -0,0 +1,171 @@
+"""Top-moment leaderboards
+
+Boards live in ``moment_leaderboards`` and are maintained by triggers on
+moments, moment_tags and videos (see database/schema.sql). A board exists for
+every score column, overall and per creator and per directly applied tag. It
+keeps up to twice ``LEADERBOARD_SIZE`` entries, so reading one is an index
+range scan of at most ``limit`` rows, whatever the size of the corpus.
+
+Creator and tag boards change in the writing transaction. The overall boards
+would be touched by every write, so writers only queue the moment and
+``LeaderboardQueueApplier`` applies the queue in batches every
+``leaderboard_apply_interval`` seconds; those boards lag writes by about that.
+"""
+import asyncio
+import contextlib
+
+from sqlalchemy import Integer, bindparam, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models import MomentLeaderboard
+from app.schemas.moment import Leaderboard, LeaderboardEntry
+from app.services.taxonomy import Taxonomy
+
+# Score columns of moments by leaderboard metric name
+LEADERBOARD_METRICS = {
+    "overall": "virality_overall",
+    "tiktok": "platform_tiktok",
+    "youtube_shorts": "platform_youtube_shorts",
+    "instagram_reels": "platform_instagram_reels",
+    "twitter": "platform_twitter",
+}
+
+# Must match moment_leaderboard_size() in database/schema.sql
+LEADERBOARD_SIZE = 100
+LEADERBOARD_QUEUE_BATCH_SIZE = 5000
+
+# Returns the queue rows taken (0 while another process is applying)
+APPLY_QUEUE_SQL = text("SELECT apply_moment_leaderboard_queue(:limit)")
+
+
+# Prebuilt (see app.services.search); binds metric, scope, scope_key and limit
+TOP_MOMENTS = (
+    select(
+        MomentLeaderboard.moment_id,
+        MomentLeaderboard.video_id,
+        MomentLeaderboard.start_time,
+        MomentLeaderboard.end_time,
+        MomentLeaderboard.summary,
+        MomentLeaderboard.score,
+    )
+    .where(
+        MomentLeaderboard.metric == bindparam("metric"),
+        MomentLeaderboard.scope == bindparam("scope"),
+        MomentLeaderboard.scope_key == bindparam("scope_key"),
+    )
+    .order_by(MomentLeaderboard.score.desc(), MomentLeaderboard.moment_id)
+    .limit(bindparam("limit", type_=Integer))
+)
+
+
+class UnknownTagError(LookupError):
+    """Tag slug not in the taxonomy"""
+
+
+async def top_moments(
+    session: AsyncSession,
+    taxonomy: Taxonomy,
+    metric: str = "overall",
+    creator: str | None = None,
+    tag: str | None = None,
+    limit: int = 50,
+) -> Leaderboard:
+    """
+    Top moments by ``metric``, for all moments or one creator or tag
+
+    Args:
+        session: Database session
+        taxonomy: Resolves the tag slug
+        metric: Key of LEADERBOARD_METRICS
+        creator: Only this creator's moments
+        tag: Only moments tagged with this slug (not its descendants)
+        limit: Entries to return, at most LEADERBOARD_SIZE
+
+    Raises:
+        UnknownTagError: ``tag`` is not in the taxonomy
+    """
+    if tag is not None:
+        if tag not in taxonomy.by_slug:
+            raise UnknownTagError(tag)
+        scope, scope_key = "tag", str(taxonomy.by_slug[tag].id)
+    elif creator is not None:
+        scope, scope_key = "creator", creator
+    else:
+        scope, scope_key = "all", ""
+
+    rows = await session.execute(
+        TOP_MOMENTS,
+        {
+            "metric": LEADERBOARD_METRICS[metric],
+            "scope": scope,
+            "scope_key": scope_key,
+            "limit": min(limit, LEADERBOARD_SIZE),
+        },
+    )
+    return Leaderboard(
+        metric=metric,
+        creator=creator if scope == "creator" else None,
+        tag=tag,
+        entries=[
+            LeaderboardEntry(
+                rank=rank,
+                moment_id=moment_id,
+                video_id=video_id,
+                start_time=start_time,
+                end_time=end_time,
+                summary=summary,
+                score=score,
+            )
+            for rank, (moment_id, video_id, start_time, end_time, summary, score) in enumerate(
+                rows, start=1
+            )
+        ],
+    )
+
+
+async def apply_leaderboard_queue(
+    session: AsyncSession,
+    batch_size: int = LEADERBOARD_QUEUE_BATCH_SIZE,
+) -> int:
+    """Apply queued moment changes to the overall boards, one transaction per batch"""
+    applied = 0
+    while True:
+        taken = await session.scalar(APPLY_QUEUE_SQL, {"limit": batch_size})
+        await session.commit()
+        applied += taken
+        if taken < batch_size:
+            return applied
+
+
+class LeaderboardQueueApplier:
+    """Applies the overall-board queue on an interval in the background"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        if self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                async with AsyncSessionLocal() as session:
+                    await apply_leaderboard_queue(session)
+            except Exception as e:
+                print(f"Leaderboard queue apply failed: {e}")
+            await asyncio.sleep(self.interval)
+
+
+# Global instance
+leaderboard_queue_applier = LeaderboardQueueApplier(settings.leaderboard_apply_interval)
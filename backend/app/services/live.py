@@ -0,0 +1,486 @@
+"""Live transcript ingestion with sliding-window analysis
+
+A livestream's transcript arrives as appended lines instead of one finished
+blob. Each live transcript keeps a grid of ``live_window_size`` second
+windows, ``live_window_overlap`` seconds apart. A window closes once a line
+timestamped at or past its end arrives, and is analyzed right away:
+
+- under the "live" scheduler class, with a ``live`` deadline
+- after the pre-filter
+- while ingestion continues
+
+Moments overlapping one already emitted for the stream are dropped, the rest
+are saved and pushed to subscribers. ``live_moment_latency_seconds`` measures
+the time from receiving the line a moment starts at to that push. A window
+whose analysis or save fails is counted (``live_windows{outcome="error"}``,
+``LiveStream.windows_failed``) and its moments don't suppress later windows'.
+
+Stream state lives in the process receiving the lines, so a stream's
+appends and subscribers must be routed to the same API process. Appended
+lines are stored as rows of ``live_transcript_chunks``, so an append costs
+its own size rather than a rewrite of the growing ``raw_text``; ``finish()``
+assembles ``raw_text`` once. After a restart the state is rebuilt from the
+stored chunks and moments. Windows that were closed but not yet analyzed at
+that point are lost.
+"""
+import asyncio
+import contextlib
+import time
+from array import array
+from bisect import bisect_left
+from collections.abc import AsyncIterable, AsyncIterator
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, Any
+from uuid import UUID, uuid4
+
+from sqlalchemy import delete, func, insert, literal, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.metrics import LIVE_MOMENT_LATENCY_SECONDS, LIVE_STREAMS_ACTIVE, LIVE_WINDOWS
+from app.models import LiveTranscriptChunk, Moment, Transcript, Video
+from app.schemas.live import LiveAppendResult, LiveMoment, LiveStream, LiveStreamCreate
+from app.services.analysis_queue import analysis_queue
+from app.services.executor import cpu_executor
+from app.services.ingest import RecordTooLargeError
+from app.services.moment_store import save_moments
+from app.services.near_duplicates import ensure_fingerprints
+from app.services.prefilter import select_windows, taxonomy_keywords
+from app.services.taxonomy import get_taxonomy
+from app.services.transcript_index import build_segment_index, parse_timestamp
+
+if TYPE_CHECKING:
+    from app.services.analyzer import TranscriptAnalyzer
+
+# Moments overlapping by more than this are the same moment (as in deduplication)
+OVERLAP_TOLERANCE = 10.0
+
+
+class LiveStreamNotFoundError(LookupError):
+    """No live transcript with this id (missing or already finished)"""
+
+
+@dataclass
+class LiveWindow:
+    """A closed window, ready for analysis"""
+
+    index: int
+    start_time: float
+    end_time: float
+    text: str
+
+
+class LiveTranscript:
+    """Sliding-window state of one in-progress transcript"""
+
+    def __init__(
+        self,
+        transcript_id: UUID,
+        video_id: UUID,
+        video_metadata: dict[str, Any],
+        window_size: float,
+        window_overlap: float,
+    ):
+        self.transcript_id = transcript_id
+        self.video_id = video_id
+        self.video_metadata = video_metadata
+        self.window_size = window_size
+        self.step = max(window_size - window_overlap, 1.0)
+        self.origin: float | None = None  # start of window 0
+        self.next_window = 0
+        self.windows_closed = 0  # those with lines; empty ones aren't analyzed
+        self.last_time = 0.0
+
+        # Lines not yet behind every open window; times are kept sorted
+        self.times = array("d")
+        self.lines: list[str] = []
+        # Monotonic receive time of each new timestamp, kept for latency
+        self.spoken_times = array("d")
+        self.spoken_received = array("d")
+
+        self.emitted: list[tuple[float, float]] = []
+        self.windows_failed = 0
+        self.lock = asyncio.Lock()  # serializes appends
+        self.emit_lock = asyncio.Lock()  # serializes dedupe + save of window results
+        self.pending: set[asyncio.Task] = set()
+        self.subscribers: set[asyncio.Queue] = set()
+
+    def window_bounds(self, index: int) -> tuple[float, float]:
+        start = self.origin + index * self.step
+        return start, start + self.window_size
+
+    def add_lines(self, lines: list[str], received: float) -> list[LiveWindow]:
+        """Buffer lines and return the windows they close"""
+        for line in lines:
+            seconds = parse_timestamp(line)
+            # Untimed or out-of-order lines stay with the preceding line
+            if seconds is not None and (seconds > self.last_time or self.origin is None):
+                self.last_time = seconds
+                self.spoken_times.append(seconds)
+                self.spoken_received.append(received)
+            if self.origin is None and seconds is not None:
+                self.origin = (seconds // self.step) * self.step
+                # Untimed lines so far open the first window
+                self.times = array("d", [seconds] * len(self.times))
+            self.times.append(self.last_time)
+            self.lines.append(line)
+        return self._close_windows(final=False)
+
+    def close_all(self) -> list[LiveWindow]:
+        """Close every remaining window (the stream ended)"""
+        return self._close_windows(final=True)
+
+    def _close_windows(self, final: bool) -> list[LiveWindow]:
+        if self.origin is None:
+            return []
+
+        closed = []
+        while True:
+            start, end = self.window_bounds(self.next_window)
+            if start > self.last_time or (not final and end > self.last_time):
+                break
+            first = bisect_left(self.times, start)
+            last = bisect_left(self.times, end) if not final or end <= self.last_time else None
+            if first < len(self.lines) and (last is None or first < last):
+                text = "\n".join(self.lines[first:last])
+                closed.append(LiveWindow(self.next_window, start, end, text))
+            self.next_window += 1
+
+        # Lines before the next window's start can't be part of any later window
+        keep_from = bisect_left(self.times, self.window_bounds(self.next_window)[0])
+        if keep_from:
+            del self.times[:keep_from], self.lines[:keep_from]
+        self.windows_closed += len(closed)
+        return closed
+
+    def spoken_at(self, seconds: float, fallback: float) -> float:
+        """Receive time of the first line timestamped at or after ``seconds``"""
+        index = bisect_left(self.spoken_times, seconds)
+        return self.spoken_received[index] if index < len(self.spoken_received) else fallback
+
+    def novel(self, moments: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Moments overlapping neither an emitted moment nor an earlier one in ``moments``"""
+        fresh, taken = [], list(self.emitted)
+        for moment in moments:
+            start, end = moment.get("start_time", 0), moment.get("end_time", 0)
+            if any(
+                start < taken_end - OVERLAP_TOLERANCE and taken_start < end - OVERLAP_TOLERANCE
+                for taken_start, taken_end in taken
+            ):
+                continue
+            taken.append((start, end))
+            fresh.append(moment)
+        return fresh
+
+    def mark_emitted(self, moments: list[dict[str, Any]]) -> None:
+        """Record saved moments, so later windows drop their duplicates"""
+        self.emitted.extend(
+            (moment.get("start_time", 0), moment.get("end_time", 0)) for moment in moments
+        )
+
+    def publish(self, message: LiveMoment | None) -> None:
+        """Push to every subscriber (None = stream finished)"""
+        for queue in self.subscribers:
+            queue.put_nowait(message)
+
+
+async def live_text(session: AsyncSession, transcript_id: UUID) -> str:
+    """A live transcript's text so far, from its appended chunks"""
+    chunks = await session.scalars(
+        select(LiveTranscriptChunk.text)
+        .where(LiveTranscriptChunk.transcript_id == transcript_id)
+        .order_by(LiveTranscriptChunk.seq)
+    )
+    return "".join(chunks)
+
+
+async def iter_line_batches(
+    chunks: AsyncIterable[bytes],
+    max_line_bytes: int,
+) -> AsyncIterator[list[str]]:
+    """Complete lines per received body chunk, so lines are appended as they arrive"""
+    buffer = bytearray()
+    async for chunk in chunks:
+        buffer.extend(chunk)
+        end = buffer.rfind(b"\n")
+        if end != -1:
+            lines = buffer[:end].decode().splitlines()
+            del buffer[: end + 1]
+            if lines:
+                yield lines
+        if len(buffer) > max_line_bytes:
+            raise RecordTooLargeError(f"Line exceeds {max_line_bytes} bytes")
+    if buffer:
+        yield buffer.decode().splitlines()
+
+
+class LiveIngestor:
+    """Registry of live transcripts in this process"""
+
+    def __init__(self, analyzer: "TranscriptAnalyzer | None" = None):
+        self._analyzer = analyzer
+        self._streams: dict[UUID, LiveTranscript] = {}
+        self._loading = asyncio.Lock()
+
+    @property
+    def analyzer(self) -> "TranscriptAnalyzer":
+        # Share the queue's agent slots when this process runs workers
+        if self._analyzer is None and analysis_queue.analyzer is not None:
+            return analysis_queue.analyzer
+        if self._analyzer is None:
+            from app.services.analyzer import TranscriptAnalyzer
+
+            self._analyzer = TranscriptAnalyzer(
+                max_concurrent_chunks=settings.max_concurrent_chunks,
+                priority_weights=settings.analysis_priority_weights,
+            )
+        return self._analyzer
+
+    async def create(self, request: LiveStreamCreate) -> LiveStream:
+        """Create the video and an empty transcript in status 'live'"""
+        video_id, transcript_id = uuid4(), uuid4()
+        async with AsyncSessionLocal() as session:
+            session.add(
+                Video(
+                    id=video_id,
+                    **request.model_dump(exclude={"transcript_language", "transcript_source"}),
+                )
+            )
+            session.add(
+                Transcript(
+                    id=transcript_id,
+                    video_id=video_id,
+                    raw_text="",
+                    language=request.transcript_language,
+                    source=request.transcript_source,
+                    status="live",
+                    priority="live",
+                )
+            )
+            await session.commit()
+
+        self._register(
+            LiveTranscript(
+                transcript_id,
+                video_id,
+                {"title": request.title, "creator": request.creator},
+                settings.live_window_size,
+                settings.live_window_overlap,
+            )
+        )
+        return LiveStream(video_id=video_id, transcript_id=transcript_id, status="live")
+
+    def _register(self, stream: LiveTranscript) -> None:
+        self._streams[stream.transcript_id] = stream
+        LIVE_STREAMS_ACTIVE.set(len(self._streams))
+
+    async def _stream(self, transcript_id: UUID) -> LiveTranscript:
+        """In-memory state, rebuilt from the database after a restart"""
+        if (stream := self._streams.get(transcript_id)) is not None:
+            return stream
+
+        async with self._loading:
+            if (stream := self._streams.get(transcript_id)) is not None:
+                return stream
+            async with AsyncSessionLocal() as session:
+                transcript = await session.scalar(
+                    select(Transcript)
+                    .options(joinedload(Transcript.video))
+                    .where(Transcript.id == transcript_id, Transcript.status == "live")
+                )
+                if transcript is None:
+                    raise LiveStreamNotFoundError(str(transcript_id))
+                raw_text = await live_text(session, transcript_id)
+                emitted = (
+                    await session.execute(
+                        select(Moment.start_time, Moment.end_time).where(
+                            Moment.video_id == transcript.video_id
+                        )
+                    )
+                ).all()
+
+            video = transcript.video
+            stream = LiveTranscript(
+                transcript.id,
+                video.id,
+                {"title": video.title, "creator": video.creator},
+                settings.live_window_size,
+                settings.live_window_overlap,
+            )
+            # Replaying closes the windows that were closed before the restart
+            stream.add_lines(raw_text.splitlines(), time.monotonic())
+            stream.emitted = [tuple(bounds) for bounds in emitted]
+            self._register(stream)
+            return stream
+
+    async def status(self, transcript_id: UUID) -> LiveStream:
+        stream = await self._stream(transcript_id)
+        return LiveStream(
+            video_id=stream.video_id,
+            transcript_id=transcript_id,
+            status="live",
+            windows_closed=stream.windows_closed,
+            windows_failed=stream.windows_failed,
+            moments_emitted=len(stream.emitted),
+        )
+
+    async def append(self, transcript_id: UUID, lines: list[str]) -> LiveAppendResult:
+        """Store appended lines and start analyzing the windows they close"""
+        stream = await self._stream(transcript_id)
+        async with stream.lock:
+            received = time.monotonic()
+            async with AsyncSessionLocal() as session:
+                appended = await session.execute(
+                    insert(LiveTranscriptChunk).from_select(
+                        ["transcript_id", "text"],
+                        select(
+                            Transcript.id, literal("".join(f"{line}\n" for line in lines))
+                        ).where(Transcript.id == transcript_id, Transcript.status == "live"),
+                    )
+                )
+                if appended.rowcount == 0:
+                    raise LiveStreamNotFoundError(str(transcript_id))
+                await session.commit()
+
+            windows = stream.add_lines(lines, received)
+            for window in windows:
+                task = asyncio.create_task(self._analyze_window(stream, window))
+                stream.pending.add(task)
+                task.add_done_callback(stream.pending.discard)
+        return LiveAppendResult(lines=len(lines), windows_closed=len(windows))
+
+    async def finish(self, transcript_id: UUID) -> LiveStream:
+        """Analyze the last windows, then finalize the transcript like a batch one"""
+        stream = await self._stream(transcript_id)
+        async with stream.lock:
+            for window in stream.close_all():
+                stream.pending.add(asyncio.create_task(self._analyze_window(stream, window)))
+            await asyncio.gather(*stream.pending, return_exceptions=True)
+
+            async with AsyncSessionLocal() as session:
+                transcript = await session.get(Transcript, transcript_id)
+                raw_text = await live_text(session, transcript_id)
+                # Set before the text, which would otherwise keep the empty stream's values;
+                # a long stream's index is built off the event loop
+                transcript.segment_index = await cpu_executor.run(
+                    build_segment_index, raw_text, size=len(raw_text)
+                )
+                transcript.word_count = len(raw_text.split())
+                transcript.raw_text = raw_text
+                await session.execute(
+                    delete(LiveTranscriptChunk).where(
+                        LiveTranscriptChunk.transcript_id == transcript_id
+                    )
+                )
+                transcript.status = "completed"
+                transcript.processed_at = datetime.now(UTC)
+                # Batch-size fingerprints, so later re-uploads of the VOD reuse these moments
+                await ensure_fingerprints(session, transcript)
+                await session.commit()
+
+        stream.publish(None)
+        self._streams.pop(transcript_id, None)
+        LIVE_STREAMS_ACTIVE.set(len(self._streams))
+        return LiveStream(
+            video_id=stream.video_id,
+            transcript_id=transcript_id,
+            status="completed",
+            windows_closed=stream.windows_closed,
+            windows_failed=stream.windows_failed,
+            moments_emitted=len(stream.emitted),
+        )
+
+    async def stop(self) -> None:
+        """Cancel in-flight window analyses and disconnect subscribers (shutdown)"""
+        tasks = [task for stream in self._streams.values() for task in stream.pending]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for stream in self._streams.values():
+            stream.publish(None)
+        self._streams.clear()
+        LIVE_STREAMS_ACTIVE.set(0)
+
+    @contextlib.asynccontextmanager
+    async def subscribe(self, transcript_id: UUID) -> AsyncIterator[asyncio.Queue]:
+        """Queue receiving each new LiveMoment, then None when the stream ends"""
+        stream = await self._stream(transcript_id)
+        queue: asyncio.Queue[LiveMoment | None] = asyncio.Queue()
+        stream.subscribers.add(queue)
+        try:
+            yield queue
+        finally:
+            stream.subscribers.discard(queue)
+
+    async def _analyze_window(self, stream: LiveTranscript, window: LiveWindow) -> None:
+        try:
+            async with AsyncSessionLocal() as session:
+                taxonomy = await get_taxonomy(session)
+            selection = await select_windows([window.text], taxonomy_keywords(taxonomy))
+            moments = []
+            if selection.analyze or selection.deferred:
+                deadline = time.time() + settings.analysis_deadlines.get("live", 30.0)
+                moments = await self.analyzer.analyze_chunks(
+                    [window.text],
+                    stream.video_metadata,
+                    "live" if selection.analyze else "deferred",
+                    deadline if selection.analyze else None,
+                    # One fair share for the whole stream, however many windows are open
+                    video_id=stream.video_id,
+                )
+
+            async with stream.emit_lock:
+                fresh = stream.novel(moments)
+                async with AsyncSessionLocal() as session:
+                    saved = await save_moments(
+                        session,
+                        stream.video_id,
+                        fresh,
+                        raw_text=window.text,
+                        segment_index=build_segment_index(window.text),
+                    )
+                    counter = (
+                        Transcript.windows_skipped if selection.skipped
+                        else Transcript.windows_analyzed
+                    )
+                    await session.execute(
+                        update(Transcript)
+                        .where(Transcript.id == stream.transcript_id)
+                        .values({counter: func.coalesce(counter, 0) + 1})
+                    )
+                    await session.commit()
+                # Only once saved: a failed window must not hide these from later ones
+                stream.mark_emitted(fresh)
+
+            pushed = time.monotonic()
+            for moment in saved:
+                latency = pushed - stream.spoken_at(moment.start_time, pushed)
+                LIVE_MOMENT_LATENCY_SECONDS.observe(latency)
+                stream.publish(
+                    LiveMoment(
+                        id=moment.id,
+                        video_id=moment.video_id,
+                        start_time=moment.start_time,
+                        end_time=moment.end_time,
+                        summary=moment.summary,
+                        virality_overall=moment.virality_overall,
+                        tags=[
+                            taxonomy.by_id[moment_tag.tag_id].slug
+                            for moment_tag in moment.moment_tags
+                            if moment_tag.tag_id in taxonomy.by_id
+                        ],
+                        latency_seconds=latency,
+                    )
+                )
+            LIVE_WINDOWS.labels(outcome="ok").inc()
+        except Exception as e:
+            stream.windows_failed += 1
+            LIVE_WINDOWS.labels(outcome="error").inc()
+            print(f"Live window {window.index} of {stream.transcript_id} failed: {e}")
+
+
+# Global instance
+live_ingestor = LiveIngestor()
@@ -0,0 +1,194 @@
+"""MinHash/LSH fingerprints of transcript windows
+
+Each analysis window (see ``transcript_windows``) is reduced to the set of its
+word 5-gram shingles and summarized by a MinHash signature: the fraction of
+equal signature slots between two windows estimates the Jaccard similarity of
+their shingle sets. Signatures are split into LSH bands whose hashes are stored
+in an indexed array column, so candidate matches are an index lookup rather
+than a comparison against every stored window.
+
+With 16 bands of 4 rows, windows at Jaccard 0.7 (the default threshold) share
+a band with probability ~0.99, and at 0.3 with ~0.12; candidates are then
+checked against the full signature. Changing these constants invalidates
+stored fingerprints.
+
+Pure functions on plain data, so they can run in the process pool.
+"""
+import hashlib
+import re
+import statistics
+import zlib
+from bisect import bisect_left
+
+import numpy as np
+
+from app.services.transcript_index import TIMESTAMP_PATTERN, SegmentIndex, parse_timestamp
+
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERMUTATIONS // LSH_BANDS
+SHINGLE_WORDS = 5
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+
+
+def _coefficients(name: str) -> np.ndarray:
+    """Fixed hash coefficients, derived from hashlib so they never change"""
+    return np.array(
+        [
+            int.from_bytes(hashlib.blake2b(f"{name}{i}".encode(), digest_size=8).digest())
+            % ((1 << 61) - 2)
+            + 1
+            for i in range(NUM_PERMUTATIONS)
+        ],
+        dtype=np.uint64,
+    )
+
+
+_A = _coefficients("a")[:, None]
+_B = _coefficients("b")[:, None]
+
+_WORD = re.compile(r"[a-z0-9']+")
+
+
+def transcript_windows(
+    index: SegmentIndex,
+    size: float,
+    overlap: float,
+) -> list[tuple[float, float, int, int]]:
+    """
+    Fixed time windows over a transcript
+
+    Windows start on a grid of ``size - overlap`` seconds and cover the lines
+    whose timestamps fall in ``[start, start + size)``; empty windows are
+    dropped. Text before the first timestamp is not covered.
+
+    Returns:
+        List of (start_time, end_time, start offset, end offset)
+    """
+    if not index.times:
+        return []
+
+    step = max(size - overlap, 1.0)
+    times, offsets = index.times, index.offsets
+    windows = []
+    start = (times[0] // step) * step
+    while start <= index.duration:
+        end = start + size
+        first = bisect_left(times, start)
+        last = bisect_left(times, end)
+        if first < last:
+            end_offset = offsets[last] if last < len(offsets) else index.text_length
+            windows.append((start, end, offsets[first], end_offset))
+        start += step
+    return windows
+
+
+def normalized_lines(text: str) -> list[tuple[float | None, str]]:
+    """(timestamp, lowercased words) per line, timestamps stripped from the text"""
+    lines = []
+    for line in text.splitlines():
+        seconds = parse_timestamp(line)
+        match = TIMESTAMP_PATTERN.match(line)
+        if match:
+            line = line[match.end() :]
+        words = " ".join(_WORD.findall(line.lower()))
+        if words:
+            lines.append((seconds, words))
+    return lines
+
+
+def signature(text: str) -> np.ndarray | None:
+    """MinHash signature of a window's shingles (None if it has no words)"""
+    words = " ".join(words for _, words in normalized_lines(text)).split()
+    if not words:
+        return None
+
+    count = max(len(words) - SHINGLE_WORDS + 1, 1)
+    shingles = np.fromiter(
+        (
+            zlib.crc32(" ".join(words[i : i + SHINGLE_WORDS]).encode())
+            for i in range(count)
+        ),
+        dtype=np.uint64,
+        count=count,
+    )
+    # Universal hashing (a*x + b) mod p; uint64 wraparound is intended
+    with np.errstate(over="ignore"):
+        hashed = (_A * shingles[None, :] + _B) % _MERSENNE_PRIME
+    return hashed.min(axis=1)
+
+
+def band_hashes(sig: np.ndarray) -> list[int]:
+    """One signed 64-bit hash per LSH band (band number included)"""
+    data = sig.astype("<u8").tobytes()
+    band_bytes = LSH_ROWS * 8
+    return [
+        int.from_bytes(
+            hashlib.blake2b(
+                bytes([band]) + data[band * band_bytes : (band + 1) * band_bytes],
+                digest_size=8,
+            ).digest(),
+            signed=True,
+        )
+        for band in range(LSH_BANDS)
+    ]
+
+
+def similarity(first: bytes, second: bytes) -> float:
+    """Estimated Jaccard similarity of two serialized signatures"""
+    return float(
+        np.mean(np.frombuffer(first, dtype="<u8") == np.frombuffer(second, dtype="<u8"))
+    )
+
+
+def fingerprint_windows(
+    raw_text: str,
+    segment_index: bytes | None,
+    size: float,
+    overlap: float,
+) -> list[tuple[int, float, float, bytes, list[int]]]:
+    """
+    Fingerprint every window of a transcript
+
+    Returns:
+        List of (window index, start_time, end_time, signature bytes, band hashes)
+        for windows that contain words
+    """
+    index = (
+        SegmentIndex.from_bytes(segment_index) if segment_index else SegmentIndex.build(raw_text)
+    )
+    fingerprints = []
+    for window_index, (start, end, start_offset, end_offset) in enumerate(
+        transcript_windows(index, size, overlap)
+    ):
+        sig = signature(raw_text[start_offset:end_offset])
+        if sig is not None:
+            fingerprints.append(
+                (window_index, start, end, sig.astype("<u8").tobytes(), band_hashes(sig))
+            )
+    return fingerprints
+
+
+def estimate_offset(text: str, source_text: str) -> float | None:
+    """
+    Time shift from a source window to a matching window
+
+    Pairs lines whose text appears exactly once in the source window and
+    returns the median difference of their timestamps, so re-uploads with a
+    trimmed or extended intro map onto the right seconds.
+
+    Returns:
+        Seconds to add to source times, or None if no lines could be paired
+    """
+    source_times: dict[str, float | None] = {}
+    for seconds, words in normalized_lines(source_text):
+        # Repeated lines ("yeah", "lol") are ambiguous anchors
+        source_times[words] = None if words in source_times else seconds
+
+    shifts = [
+        seconds - source_times[words]
+        for seconds, words in normalized_lines(text)
+        if seconds is not None and source_times.get(words) is not None
+    ]
+    return statistics.median(shifts) if shifts else None
@@ -0,0 +1,82 @@
+"""Persist analyzer output as moments and moment tags"""
+from datetime import UTC, datetime
+from typing import Any
+from uuid import UUID
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Moment, MomentTag
+from app.schemas.moment import MomentCreate
+from app.services.taxonomy import get_taxonomy
+from app.services.transcript_index import SegmentIndex
+
+ANALYSIS_VERSION = "v1"
+
+
+async def save_moments(
+    session: AsyncSession,
+    video_id: UUID,
+    moments: list[dict[str, Any]],
+    raw_text: str | None = None,
+    segment_index: bytes | None = None,
+) -> list[Moment]:
+    """
+    Validate analyzer moments and add them to the session
+
+    Args:
+        session: Database session (caller commits)
+        video_id: Video the moments belong to
+        moments: Moment dicts as returned by ``TranscriptAnalyzer``
+        raw_text: Transcript text, used to fill missing excerpts
+        segment_index: Serialized segment index for ``raw_text``
+
+    Returns:
+        The Moment objects added to the session (invalid moments are skipped)
+    """
+    taxonomy = await get_taxonomy(session)
+    index = SegmentIndex.from_bytes(segment_index) if segment_index else None
+    analyzed_at = datetime.now(UTC)
+
+    saved = []
+    for data in moments:
+        try:
+            moment_in = MomentCreate.model_validate({**data, "video_id": video_id})
+        except ValidationError:
+            continue
+
+        excerpt = moment_in.transcript_excerpt
+        if excerpt is None and index is not None and raw_text is not None:
+            excerpt = index.excerpt(raw_text, moment_in.start_time, moment_in.end_time)
+
+        virality = moment_in.virality_scores
+        platform = moment_in.platform_scores
+        moment = Moment(
+            video_id=video_id,
+            start_time=moment_in.start_time,
+            end_time=moment_in.end_time,
+            summary=moment_in.summary,
+            transcript_excerpt=excerpt,
+            virality_hook_strength=virality.hook_strength,
+            virality_shareability=virality.shareability,
+            virality_clip_independence=virality.clip_independence,
+            virality_emotional_intensity=virality.emotional_intensity,
+            platform_tiktok=platform.tiktok,
+            platform_youtube_shorts=platform.youtube_shorts,
+            platform_instagram_reels=platform.instagram_reels,
+            platform_twitter=platform.twitter,
+            suggested_clip_start=moment_in.suggested_clip_start,
+            suggested_clip_end=moment_in.suggested_clip_end,
+            suggested_hook_lines=moment_in.suggested_hook_lines,
+            requires_context=moment_in.requires_context,
+            analyzed_at=analyzed_at,
+            analysis_version=ANALYSIS_VERSION,
+        )
+
+        slugs = [slug for dimension_slugs in moment_in.tags.values() for slug in dimension_slugs]
+        moment.moment_tags = [MomentTag(tag_id=tag.id) for tag in taxonomy.resolve(slugs)]
+
+        session.add(moment)
+        saved.append(moment)
+
+    return saved
@@ -0,0 +1,306 @@
+"""Reuse analysis across near-duplicate transcripts
+
+Re-uploads, restreams and self-clips produce transcripts whose windows match
+windows of a transcript we already analyzed. Matching windows (by MinHash/LSH,
+see ``app.services.minhash``) get the source's moments copied and time-shifted
+instead of another agent call; only the novel windows are analyzed.
+"""
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models import Moment, Transcript, TranscriptWindow
+from app.schemas.transcript import NearDuplicateReport, NearDuplicateTranscript
+from app.services.executor import cpu_executor
+from app.services.minhash import (
+    estimate_offset,
+    fingerprint_windows,
+    similarity,
+    transcript_windows,
+)
+from app.services.search import MOMENT_TAG_OPTIONS
+from app.services.transcript_index import SegmentIndex
+
+
+@dataclass
+class Window:
+    """One analysis window (= one agent call) of a transcript"""
+
+    index: int
+    start_time: float
+    end_time: float
+    text: str
+
+
+@dataclass
+class WindowMatch:
+    """Window of an analyzed transcript that a new window duplicates"""
+
+    source_transcript_id: UUID
+    source_video_id: UUID
+    source_start: float
+    source_end: float
+    similarity: float
+    offset: float  # seconds to add to source times
+
+
+@dataclass
+class ReusePlan:
+    """Which windows of a transcript to analyze and which to copy"""
+
+    windows: list[Window]
+    matches: dict[int, WindowMatch] = field(default_factory=dict)
+
+    @property
+    def novel_windows(self) -> list[Window]:
+        return [window for window in self.windows if window.index not in self.matches]
+
+    @property
+    def near_duplicate_of(self) -> UUID | None:
+        """Source transcript contributing the most windows"""
+        if not self.matches:
+            return None
+        sources = Counter(match.source_transcript_id for match in self.matches.values())
+        return sources.most_common(1)[0][0]
+
+
+def _segment_index(transcript: Transcript) -> SegmentIndex:
+    if transcript.segment_index:
+        return SegmentIndex.from_bytes(transcript.segment_index)
+    return SegmentIndex.build(transcript.raw_text)
+
+
+async def ensure_fingerprints(
+    session: AsyncSession, transcript: Transcript
+) -> list[TranscriptWindow]:
+    """Stored window fingerprints, computed now if ingest didn't (caller commits)"""
+    stored = list(
+        await session.scalars(
+            select(TranscriptWindow)
+            .where(TranscriptWindow.transcript_id == transcript.id)
+            .order_by(TranscriptWindow.window_index)
+        )
+    )
+    if stored:
+        return stored
+
+    fingerprints = await cpu_executor.run(
+        fingerprint_windows,
+        transcript.raw_text,
+        transcript.segment_index,
+        settings.transcript_chunk_size,
+        settings.transcript_chunk_overlap,
+        size=len(transcript.raw_text),
+    )
+    windows = [
+        TranscriptWindow(
+            transcript_id=transcript.id,
+            window_index=window_index,
+            start_time=start,
+            end_time=end,
+            minhash=minhash,
+            lsh_bands=bands,
+        )
+        for window_index, start, end, minhash, bands in fingerprints
+    ]
+    session.add_all(windows)
+    return windows
+
+
+async def plan_reuse(session: AsyncSession, transcript: Transcript) -> ReusePlan:
+    """
+    Match a transcript's windows against windows of completed transcripts
+
+    Returns:
+        The transcript's windows and, for each window at or above
+        ``near_duplicate_threshold`` similarity, its best source window.
+        Transcripts without timestamps have no windows.
+    """
+    raw_text = transcript.raw_text
+    plan = ReusePlan(
+        windows=[
+            Window(index, start, end, raw_text[start_offset:end_offset])
+            for index, (start, end, start_offset, end_offset) in enumerate(
+                transcript_windows(
+                    _segment_index(transcript),
+                    settings.transcript_chunk_size,
+                    settings.transcript_chunk_overlap,
+                )
+            )
+        ]
+    )
+    if not plan.windows:
+        return plan
+
+    fingerprints = await ensure_fingerprints(session, transcript)
+    bands = sorted({band for fingerprint in fingerprints for band in fingerprint.lsh_bands})
+    if not bands:
+        return plan
+
+    candidates = await session.execute(
+        select(TranscriptWindow, Transcript.video_id)
+        .join(Transcript, Transcript.id == TranscriptWindow.transcript_id)
+        .where(
+            TranscriptWindow.lsh_bands.overlap(bands),
+            TranscriptWindow.transcript_id != transcript.id,
+            Transcript.status == "completed",
+        )
+    )
+    by_band: dict[int, list[tuple[TranscriptWindow, UUID]]] = defaultdict(list)
+    for candidate, video_id in candidates:
+        for band in candidate.lsh_bands:
+            by_band[band].append((candidate, video_id))
+
+    best: dict[int, tuple[float, TranscriptWindow, UUID]] = {}
+    for fingerprint in fingerprints:
+        if fingerprint.window_index >= len(plan.windows):
+            continue  # fingerprinted with different window settings
+        # LSH only proposes candidates; confirm on the full signature
+        seen = {
+            (candidate.transcript_id, candidate.window_index): (candidate, video_id)
+            for band in fingerprint.lsh_bands
+            for candidate, video_id in by_band.get(band, ())
+        }
+        for candidate, video_id in seen.values():
+            score = similarity(fingerprint.minhash, candidate.minhash)
+            current = best.get(fingerprint.window_index)
+            if score >= settings.near_duplicate_threshold and (
+                current is None or score > current[0]
+            ):
+                best[fingerprint.window_index] = (score, candidate, video_id)
+    if not best:
+        return plan
+
+    sources = {
+        source.id: source
+        for source in await session.scalars(
+            select(Transcript).where(
+                Transcript.id.in_({candidate.transcript_id for _, candidate, _ in best.values()})
+            )
+        )
+    }
+    source_indexes = {source_id: _segment_index(source) for source_id, source in sources.items()}
+
+    for window_index, (score, candidate, video_id) in best.items():
+        window = plan.windows[window_index]
+        source = sources[candidate.transcript_id]
+        source_text = source_indexes[source.id].excerpt(
+            source.raw_text, candidate.start_time, candidate.end_time
+        )
+        offset = estimate_offset(window.text, source_text)
+        plan.matches[window_index] = WindowMatch(
+            source_transcript_id=source.id,
+            source_video_id=video_id,
+            source_start=candidate.start_time,
+            source_end=candidate.end_time,
+            similarity=score,
+            offset=offset if offset is not None else window.start_time - candidate.start_time,
+        )
+    return plan
+
+
+def _shifted_moment(moment: Moment, offset: float) -> dict[str, Any]:
+    """Moment as an analyzer-style dict, moved by ``offset`` seconds"""
+    tags: dict[str, list[str]] = {}
+    for moment_tag in moment.moment_tags:
+        tag = moment_tag.tag
+        tags.setdefault(tag.dimension.name if tag.dimension else "other", []).append(tag.slug)
+
+    def shift(seconds: float | None) -> float | None:
+        return None if seconds is None else seconds + offset
+
+    return {
+        "start_time": moment.start_time + offset,
+        "end_time": moment.end_time + offset,
+        "summary": moment.summary,
+        # Excerpt is re-cut from the new transcript by save_moments
+        "requires_context": moment.requires_context,
+        "virality_scores": {
+            "hook_strength": moment.virality_hook_strength,
+            "shareability": moment.virality_shareability,
+            "clip_independence": moment.virality_clip_independence,
+            "emotional_intensity": moment.virality_emotional_intensity,
+            "overall": moment.virality_overall,
+        },
+        "platform_scores": {
+            "tiktok": moment.platform_tiktok,
+            "youtube_shorts": moment.platform_youtube_shorts,
+            "instagram_reels": moment.platform_instagram_reels,
+            "twitter": moment.platform_twitter,
+        },
+        "suggested_clip_start": shift(moment.suggested_clip_start),
+        "suggested_clip_end": shift(moment.suggested_clip_end),
+        "suggested_hook_lines": list(moment.suggested_hook_lines or []),
+        "tags": tags,
+    }
+
+
+async def reused_moments(session: AsyncSession, plan: ReusePlan) -> list[dict[str, Any]]:
+    """Source moments starting inside matched windows, shifted onto the new transcript"""
+    if not plan.matches:
+        return []
+
+    source_moments: dict[UUID, list[Moment]] = defaultdict(list)
+    for moment in await session.scalars(
+        select(Moment)
+        .options(MOMENT_TAG_OPTIONS)
+        .where(Moment.video_id.in_({match.source_video_id for match in plan.matches.values()}))
+        .order_by(Moment.start_time)
+    ):
+        source_moments[moment.video_id].append(moment)
+
+    reused = []
+    taken: set[UUID] = set()
+    for _, match in sorted(plan.matches.items()):
+        for moment in source_moments[match.source_video_id]:
+            if moment.id in taken or not (
+                match.source_start <= moment.start_time < match.source_end
+            ):
+                continue
+            if moment.start_time + match.offset < 0:
+                continue
+            taken.add(moment.id)
+            reused.append(_shifted_moment(moment, match.offset))
+    return reused
+
+
+async def near_duplicate_report(session: AsyncSession, limit: int = 20) -> NearDuplicateReport:
+    """Totals of analyzed vs reused windows, plus the latest near-duplicates"""
+    analyzed, near_duplicates, calls_made, calls_saved = (
+        await session.execute(
+            select(
+                func.count(),
+                func.count().filter(Transcript.windows_reused > 0),
+                func.coalesce(func.sum(Transcript.windows_analyzed), 0),
+                func.coalesce(func.sum(Transcript.windows_reused), 0),
+            ).where(Transcript.windows_analyzed.is_not(None))
+        )
+    ).one()
+
+    recent = await session.execute(
+        select(
+            Transcript.id.label("transcript_id"),
+            Transcript.video_id,
+            Transcript.near_duplicate_of,
+            Transcript.windows_analyzed,
+            Transcript.windows_reused,
+            Transcript.processed_at,
+        )
+        .where(Transcript.windows_reused > 0)
+        .order_by(Transcript.processed_at.desc())
+        .limit(limit)
+    )
+    total_calls = calls_made + calls_saved
+    return NearDuplicateReport(
+        transcripts_analyzed=analyzed,
+        near_duplicates=near_duplicates,
+        agent_calls_made=calls_made,
+        agent_calls_saved=calls_saved,
+        savings_ratio=calls_saved / total_calls if total_calls else 0.0,
+        recent=[NearDuplicateTranscript.model_validate(dict(row._mapping)) for row in recent],
+    )
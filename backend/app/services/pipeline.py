@@ -0,0 +1,159 @@
+"""CPU-bound analysis pipeline stages as pure functions
+
+Everything here takes and returns plain data (str, list, dict, bytes) so it can
+run in the worker processes of ``app.services.executor`` without pickling ORM
+objects. Keep this module free of database, metrics and event-loop state.
+"""
+import json
+from array import array
+from typing import Any
+
+from app.services.minhash import fingerprint_windows, transcript_windows
+from app.services.transcript_index import SegmentIndex, build_segment_index
+
+
+def chunk_transcript(
+    transcript: str,
+    chunk_size: int = 180,
+    overlap: int = 30,
+) -> list[str]:
+    """
+    Split transcript into overlapping chunks
+
+    Chunks are the timestamp windows of ``transcript_windows``, so chunk N is
+    the window fingerprinted as window N. Transcripts without timestamps
+    fall back to ~10 line-based chunks.
+
+    Args:
+        transcript: Full transcript text
+        chunk_size: Target chunk duration in seconds
+        overlap: Overlap duration in seconds
+
+    Returns:
+        List of transcript chunks
+    """
+    windows = transcript_windows(SegmentIndex.build(transcript), chunk_size, overlap)
+    if windows:
+        return [transcript[start:end] for _, _, start, end in windows]
+
+    lines = transcript.split("\n")
+    chunks = []
+    step_size = max(1, len(lines) // 10)  # ~10 chunks
+
+    for i in range(0, len(lines), step_size):
+        chunk = "\n".join(lines[i : i + step_size + 5])  # Add overlap
+        if chunk.strip():
+            chunks.append(chunk)
+
+    return chunks
+
+
+def extract_moments_from_text(text: str) -> list[dict[str, Any]] | None:
+    """
+    Extract JSON moments from agent response text
+
+    Returns:
+        Parsed moments, or None if no JSON could be parsed
+    """
+    moments = []
+
+    # Try to find JSON blocks in the text
+    try:
+        # Look for JSON array
+        if "[" in text and "]" in text:
+            start = text.index("[")
+            end = text.rindex("]") + 1
+            json_str = text[start:end]
+            moments = json.loads(json_str)
+    except (ValueError, json.JSONDecodeError):
+        # Try to find individual JSON objects
+        try:
+            if "{" in text and "}" in text:
+                start = text.index("{")
+                end = text.rindex("}") + 1
+                json_str = text[start:end]
+                moment = json.loads(json_str)
+                moments = [moment]
+        except (ValueError, json.JSONDecodeError):
+            pass
+
+        if not moments:
+            return None
+
+    return moments if isinstance(moments, list) else []
+
+
+def extract_moments(texts: list[str]) -> tuple[list[dict[str, Any]], int]:
+    """
+    Extract moments from all text blocks of one agent reply
+
+    Returns:
+        (moments, number of blocks whose JSON could not be parsed)
+    """
+    moments = []
+    failures = 0
+    for text in texts:
+        extracted = extract_moments_from_text(text)
+        if extracted is None:
+            failures += 1
+        else:
+            moments.extend(extracted)
+    return moments, failures
+
+
+def moment_bounds(moments: list[dict[str, Any]]) -> tuple[array, array, array]:
+    """Compact (start, end, overall score) columns for ``select_distinct_moments``"""
+    starts = array("d", (m.get("start_time", 0) for m in moments))
+    ends = array("d", (m.get("end_time", 0) for m in moments))
+    scores = array("d", (m.get("virality_scores", {}).get("overall", 0) for m in moments))
+    return starts, ends, scores
+
+
+def select_distinct_moments(starts: array, ends: array, scores: array) -> list[int]:
+    """
+    Pick which moments survive timestamp-overlap deduplication
+
+    Takes compact columns rather than the moment dicts so the payload sent to
+    a worker process is a few bytes per moment.
+
+    Returns:
+        Indexes of the kept moments, ordered by start time
+    """
+    if not starts:
+        return []
+
+    # Sort by start time
+    order = sorted(range(len(starts)), key=starts.__getitem__)
+
+    kept = [order[0]]
+
+    for index in order[1:]:
+        last = kept[-1]
+
+        # If moments don't overlap significantly, keep both
+        if starts[index] >= ends[last] - 10:  # 10 second tolerance
+            kept.append(index)
+        # Otherwise keep the one with higher virality score
+        elif scores[index] > scores[last]:
+            kept[-1] = index
+
+    return kept
+
+
+def deduplicate_moments(moments: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Remove duplicate moments based on timestamp overlap"""
+    return [moments[i] for i in select_distinct_moments(*moment_bounds(moments))]
+
+
+def index_transcripts(
+    texts: list[str],
+    window_size: float,
+    window_overlap: float,
+) -> list[tuple[int, bytes, list[tuple[int, float, float, bytes, list[int]]]]]:
+    """Word count, serialized segment index and window fingerprints per transcript"""
+    results = []
+    for text in texts:
+        segment_index = build_segment_index(text)
+        fingerprints = fingerprint_windows(text, segment_index, window_size, window_overlap)
+        results.append((len(text.split()), segment_index, fingerprints))
+    return results
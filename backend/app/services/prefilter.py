@@ -0,0 +1,265 @@
+"""Local pre-filter for low-signal transcript windows
+
+Dead air, sponsor reads and filler rarely contain clip-worthy moments, yet
+each window costs an agent call. Before analysis every window gets a cheap
+lexical/prosodic score in [0, 1]:
+
+- reaction markers ([laughter], [applause], "lol", ...) per line
+- exclamation marks and shouted (all-caps) words
+- speaker changes per line ("Name:" prefixes)
+- taxonomy keyword hits per 100 words
+- speech rate in words per second (dead air is slow)
+- sponsor phrases and [music]/[silence] markers, which count against
+
+Windows below ``prefilter_threshold`` are deferred (scheduled with the low
+"deferred" weight, so they mostly run after everything else) or, in ``skip``
+mode, not analyzed at all.
+``prefilter_report`` replays the scoring over fully analyzed transcripts to
+show which threshold saves how many calls at what recall.
+
+The scoring functions are pure and run in the process pool.
+"""
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.metrics import ANALYZER_WINDOWS_PREFILTERED
+from app.models import Moment, Transcript
+from app.schemas.transcript import PrefilterOperatingPoint, PrefilterReport
+from app.services.executor import cpu_executor
+from app.services.minhash import transcript_windows
+from app.services.taxonomy import Taxonomy
+from app.services.transcript_index import TIMESTAMP_PATTERN, SegmentIndex, parse_timestamp
+
+# Matched on lowercased text: single words by token, phrases by substring
+REACTION_WORDS = frozenset({"lol", "lmao", "lmfao", "haha", "hahaha", "omg", "wtf", "insane"})
+REACTION_PHRASES = ("no way", "let's go", "lets go")
+REACTION_MARKERS = ("laugh", "applause", "cheer", "crowd", "scream", "gasp", "clap")
+DEAD_AIR_MARKERS = ("music", "silence", "inaudible", "pause", "background")
+SPONSOR_WORDS = frozenset({"sponsor", "sponsored", "sponsors", "discount"})
+SPONSOR_PHRASES = (
+    "promo code",
+    "use code",
+    "link in the description",
+    "link in description",
+    "smash that like",
+    "forget to subscribe",
+)
+
+_TOKEN = re.compile(r"[a-z0-9']+")
+_MARKER = re.compile(r"[\[(]([a-z][a-z ]*)[\])]")
+_SHOUTED = re.compile(r"[A-Z]{3,}")
+_SPEAKER = re.compile(r"^([A-Z][\w .'-]{0,30}):", re.MULTILINE)
+
+# Logistic weights over the features, in FEATURES order; a chunk of ordinary
+# speech (~2.5 words/s, no other signal) scores 0.5
+FEATURES = (
+    "reactions_per_line",
+    "exclamations_per_line",
+    "shouted_word_ratio",
+    "speaker_changes_per_line",
+    "keyword_hits_per_100_words",
+    "speech_rate",
+    "sponsor_phrases_per_line",
+    "dead_air_per_line",
+)
+WEIGHTS = np.array([6.0, 2.0, 3.0, 1.5, 0.3, 2.0, -8.0, -3.0])
+CAPS = np.array([1.0, 1.0, 1.0, 1.0, 5.0, 1.5, 1.0, 1.0])
+BIAS = -2.0
+NORMAL_WORDS_PER_SECOND = 2.5
+
+
+def taxonomy_keywords(taxonomy: Taxonomy) -> list[str]:
+    """Lowercased tag names and slugs worth matching in transcripts"""
+    keywords = set()
+    for tag in taxonomy.tags:
+        for text in (tag.name, tag.slug.replace("-", " ").replace("_", " ")):
+            text = text.lower().strip()
+            if len(text) >= 4:
+                keywords.add(text)
+    return sorted(keywords)
+
+
+def _hits(tokens: Counter, lowered: str, words: frozenset[str], phrases: tuple[str, ...]) -> int:
+    if len(words) < len(tokens):
+        count = sum(tokens[word] for word in words if word in tokens)
+    else:
+        count = sum(n for token, n in tokens.items() if token in words)
+    return count + sum(lowered.count(phrase) for phrase in phrases)
+
+
+def chunk_features(texts: list[str], keywords: list[str]) -> np.ndarray:
+    """Feature matrix (one row per chunk, columns as in FEATURES)"""
+    keyword_words = frozenset(keyword for keyword in keywords if " " not in keyword)
+    keyword_phrases = tuple(keyword for keyword in keywords if " " in keyword)
+
+    counts = np.zeros((len(texts), 10))
+    for row, text in enumerate(texts):
+        lines = [line for line in text.splitlines() if line.strip()]
+        times = [seconds for line in lines if (seconds := parse_timestamp(line)) is not None]
+        body = "\n".join(TIMESTAMP_PATTERN.sub("", line, count=1).lstrip() for line in lines)
+        lowered = body.lower()
+        # Token counting and substring search run in C; no per-word Python loop
+        tokens = Counter(_TOKEN.findall(lowered))
+        markers = _MARKER.findall(lowered)
+        speakers = _SPEAKER.findall(body)
+        counts[row] = (
+            _hits(tokens, lowered, REACTION_WORDS, REACTION_PHRASES)
+            + sum(marker.startswith(REACTION_MARKERS) for marker in markers),
+            body.count("!"),
+            len(_SHOUTED.findall(body)),
+            sum(a != b for a, b in zip(speakers, speakers[1:])),
+            _hits(tokens, lowered, keyword_words, keyword_phrases),
+            _hits(tokens, lowered, SPONSOR_WORDS, SPONSOR_PHRASES),
+            sum(marker.startswith(DEAD_AIR_MARKERS) for marker in markers),
+            tokens.total(),
+            len(lines),
+            # Seconds covered; one typical line gap past the last timestamp
+            (times[-1] - times[0]) * len(times) / (len(times) - 1) if len(times) > 1 else 0,
+        )
+
+    (
+        reactions,
+        exclamations,
+        shouted,
+        speaker_changes,
+        keyword_hits,
+        sponsor,
+        dead_air,
+        words,
+        lines,
+        seconds,
+    ) = counts.T
+    lines = np.maximum(lines, 1)
+    words_per_second = np.divide(
+        words,
+        seconds,
+        out=np.full(len(texts), NORMAL_WORDS_PER_SECOND),  # untimed: assume normal speech
+        where=seconds > 0,
+    )
+    return np.column_stack(
+        (
+            reactions / lines,
+            exclamations / lines,
+            shouted / np.maximum(words, 1),
+            speaker_changes / lines,
+            keyword_hits * 100 / np.maximum(words, 1),
+            words_per_second / NORMAL_WORDS_PER_SECOND,
+            sponsor / lines,
+            dead_air / lines,
+        )
+    )
+
+
+def score_chunks(texts: list[str], keywords: list[str]) -> list[float]:
+    """Signal score in [0, 1] per chunk; higher = more likely to contain moments"""
+    if not texts:
+        return []
+    features = np.minimum(chunk_features(texts, keywords), CAPS)
+    return (1 / (1 + np.exp(-(features @ WEIGHTS + BIAS)))).tolist()
+
+
+async def score_windows(texts: list[str], keywords: list[str]) -> list[float]:
+    """``score_chunks`` in the process pool for large inputs"""
+    return await cpu_executor.run(
+        score_chunks, texts, keywords, size=sum(len(text) for text in texts)
+    )
+
+
+@dataclass
+class WindowSelection:
+    """Pre-filter decision for the windows of one transcript"""
+
+    analyze: list[str] = field(default_factory=list)
+    deferred: list[str] = field(default_factory=list)
+    skipped: int = 0
+
+
+async def select_windows(texts: list[str], keywords: list[str]) -> WindowSelection:
+    """Split windows into those to analyze now, deferred and skipped ones"""
+    if settings.prefilter_mode not in ("defer", "skip") or not texts:
+        return WindowSelection(analyze=texts)
+
+    selection = WindowSelection()
+    for text, score in zip(texts, await score_windows(texts, keywords), strict=True):
+        if score >= settings.prefilter_threshold:
+            selection.analyze.append(text)
+        elif settings.prefilter_mode == "defer":
+            selection.deferred.append(text)
+        else:
+            selection.skipped += 1
+    ANALYZER_WINDOWS_PREFILTERED.labels("analyzed").inc(len(selection.analyze))
+    ANALYZER_WINDOWS_PREFILTERED.labels("deferred").inc(len(selection.deferred))
+    ANALYZER_WINDOWS_PREFILTERED.labels("skipped").inc(selection.skipped)
+    return selection
+
+
+async def prefilter_report(
+    session: AsyncSession,
+    taxonomy: Taxonomy,
+    sample_size: int = 50,
+    thresholds: tuple[float, ...] = (0.05, 0.1, 0.15, 0.2, 0.25, 0.3, 0.4, 0.5),
+) -> PrefilterReport:
+    """
+    Calls avoided and recall of the pre-filter on fully analyzed transcripts
+
+    The sample is the latest completed transcripts from which no window was
+    skipped, so their stored moments are what full analysis found. A window
+    is labeled positive if a moment starts inside it.
+    """
+    transcripts = list(
+        await session.scalars(
+            select(Transcript)
+            .where(
+                Transcript.status == "completed",
+                Transcript.segment_index.is_not(None),
+                Transcript.windows_analyzed > 0,
+                Transcript.windows_skipped.is_(None) | (Transcript.windows_skipped == 0),
+            )
+            .order_by(Transcript.processed_at.desc())
+            .limit(sample_size)
+        )
+    )
+    starts: dict[UUID, list[float]] = defaultdict(list)
+    for video_id, start_time in await session.execute(
+        select(Moment.video_id, Moment.start_time).where(
+            Moment.video_id.in_({transcript.video_id for transcript in transcripts})
+        )
+    ):
+        starts[video_id].append(start_time)
+
+    texts, labels = [], []
+    for transcript in transcripts:
+        moment_starts = np.array(starts[transcript.video_id])
+        for start, end, start_offset, end_offset in transcript_windows(
+            SegmentIndex.from_bytes(transcript.segment_index),
+            settings.transcript_chunk_size,
+            settings.transcript_chunk_overlap,
+        ):
+            texts.append(transcript.raw_text[start_offset:end_offset])
+            labels.append(bool(np.any((moment_starts >= start) & (moment_starts < end))))
+
+    scores = np.array(await score_windows(texts, taxonomy_keywords(taxonomy)))
+    positive = np.array(labels, dtype=bool)
+
+    def operating_point(threshold: float) -> PrefilterOperatingPoint:
+        kept = scores >= threshold
+        return PrefilterOperatingPoint(
+            threshold=threshold,
+            calls_avoided_ratio=float(1 - kept.mean()) if len(kept) else 0.0,
+            recall=float(kept[positive].mean()) if positive.any() else 1.0,
+        )
+
+    return PrefilterReport(
+        transcripts=len(transcripts),
+        windows=len(texts),
+        windows_with_moments=int(positive.sum()),
+        current=operating_point(settings.prefilter_threshold),
+        curve=[operating_point(threshold) for threshold in thresholds],
+    )
@@ -0,0 +1,173 @@
+"""Fair, priority-aware scheduling of agent calls across videos
+
+Every chunk of every transcript needs one of a fixed number of agent slots. A
+plain semaphore serves them first come, first served, so the hundreds of
+chunks of a long livestream queue ahead of a short video submitted a moment
+later. Here each video gets its own queue (a job per video and priority
+class, shared by every call analyzing that video's chunks, so splitting the
+work into many calls earns no extra share) and free slots go to:
+
+1. Jobs at risk of missing a deadline, earliest deadline first: a chunk is
+   at risk once it and the chunks queued ahead of it in its job, at the
+   observed chunk duration, would no longer finish in time with all slots.
+2. Otherwise the job with the lowest virtual time (start-time fair queuing):
+   each dispatched chunk advances its job's virtual time by 1 / weight, so
+   backlogged jobs share slots in proportion to their priority class weight.
+
+A job that becomes backlogged starts at the current virtual time, so idling
+earns no credit. Slots never idle while a chunk waits, so total throughput
+is that of the semaphore.
+"""
+import asyncio
+import contextlib
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Hashable, Iterator
+from dataclasses import dataclass, field
+
+from app.metrics import ANALYZER_CHUNK_WAIT_SECONDS, ANALYZER_CHUNKS_QUEUED
+
+# Initial guess for the duration of one agent call, refined as chunks finish
+DEFAULT_CHUNK_SECONDS = 30.0
+CHUNK_SECONDS_SMOOTHING = 0.2
+
+
+@dataclass(eq=False)
+class Job:
+    """Chunks of one video (and priority class) waiting for agent slots"""
+
+    priority: str
+    weight: float
+    virtual_time: float = 0.0
+    # FIFO of waiting chunks with their deadlines (epoch seconds)
+    waiters: deque[tuple[asyncio.Future, float | None]] = field(default_factory=deque)
+    deadlines: int = 0  # waiters with a deadline
+    users: int = 0  # open job() contexts
+
+
+class ChunkScheduler:
+    """Hands out ``slots`` concurrent agent calls fairly across jobs"""
+
+    def __init__(self, slots: int, weights: dict[str, float] | None = None):
+        self.slots = slots
+        self.weights = weights or {
+            "live": 8.0,
+            "interactive": 4.0,
+            "backfill": 1.0,
+            "deferred": 0.25,
+        }
+        self.free = slots
+        self.virtual_time = 0.0
+        self.chunk_seconds = DEFAULT_CHUNK_SECONDS
+        self._backlogged: list[Job] = []
+        self._jobs: dict[tuple[Hashable, str], Job] = {}
+
+    @contextlib.contextmanager
+    def job(self, video: Hashable, priority: str = "interactive") -> Iterator[Job]:
+        """
+        Queue for the chunks of ``video`` in one priority class
+
+        Concurrent users for the same video and class share the job, and with
+        it one fair share. Unknown priorities get weight 1.
+        """
+        key = (video, priority)
+        job = self._jobs.get(key)
+        if job is None:
+            job = self._jobs[key] = Job(priority, self.weights.get(priority, 1.0))
+        job.users += 1
+        try:
+            yield job
+        finally:
+            job.users -= 1
+            if not job.users:
+                del self._jobs[key]
+
+    @contextlib.asynccontextmanager
+    async def slot(self, job: Job, deadline: float | None = None) -> AsyncIterator[None]:
+        """Hold one agent slot for a chunk of ``job`` due by ``deadline`` (epoch seconds)"""
+        await self._acquire(job, deadline)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.chunk_seconds += CHUNK_SECONDS_SMOOTHING * (
+                time.monotonic() - started - self.chunk_seconds
+            )
+            self._release()
+
+    def _charge(self, job: Job) -> None:
+        self.virtual_time = max(self.virtual_time, job.virtual_time)
+        job.virtual_time += 1 / job.weight
+
+    async def _acquire(self, job: Job, deadline: float | None) -> None:
+        if not job.waiters:
+            # Newly backlogged (or idle) jobs catch up to the current virtual time
+            job.virtual_time = max(job.virtual_time, self.virtual_time)
+        if self.free > 0 and not self._backlogged:
+            self.free -= 1
+            self._charge(job)
+            ANALYZER_CHUNK_WAIT_SECONDS.labels(job.priority).observe(0)
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        entry = (waiter, deadline)
+        if not job.waiters:
+            self._backlogged.append(job)
+        job.waiters.append(entry)
+        job.deadlines += deadline is not None
+        ANALYZER_CHUNKS_QUEUED.labels(job.priority).inc()
+        queued = time.monotonic()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted a slot just as we were cancelled; pass it on
+                self._release()
+            else:
+                job.waiters.remove(entry)
+                job.deadlines -= deadline is not None
+                ANALYZER_CHUNKS_QUEUED.labels(job.priority).dec()
+                if not job.waiters:
+                    self._backlogged.remove(job)
+            raise
+        ANALYZER_CHUNK_WAIT_SECONDS.labels(job.priority).observe(time.monotonic() - queued)
+
+    def _release(self) -> None:
+        job = self._next_job()
+        if job is None:
+            self.free += 1
+            return
+
+        waiter, deadline = job.waiters.popleft()
+        job.deadlines -= deadline is not None
+        if not job.waiters:
+            self._backlogged.remove(job)
+        ANALYZER_CHUNKS_QUEUED.labels(job.priority).dec()
+        self._charge(job)
+        waiter.set_result(None)
+
+    def _next_job(self) -> Job | None:
+        if not self._backlogged:
+            return None
+
+        now = time.time()
+        at_risk = [
+            (deadline, job)
+            for job in self._backlogged
+            if (deadline := self._at_risk(job, now)) is not None
+        ]
+        if at_risk:
+            return min(at_risk, key=lambda item: item[0])[1]
+        return min(self._backlogged, key=lambda job: job.virtual_time)
+
+    def _at_risk(self, job: Job, now: float) -> float | None:
+        """Earliest deadline among ``job``'s waiting chunks that would now be missed"""
+        if not job.deadlines:
+            return None
+        per_chunk = self.chunk_seconds / self.slots
+        missed = [
+            deadline
+            for position, (_, deadline) in enumerate(job.waiters, start=1)
+            if deadline is not None and now + position * per_chunk >= deadline
+        ]
+        return min(missed, default=None)
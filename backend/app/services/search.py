@@ -0,0 +1,315 @@
+"""Moment search queries (tag, semantic, pattern discovery)
+
+The request paths (tag and semantic search) run prebuilt statements rather
+than building a Select per request:
+
+- A statement is built once per shape, i.e. which optional filters are
+  present, with every value a bind parameter. Reusing the object skips
+  construction and makes SQLAlchemy's compiled cache a memoized lookup.
+- Lists bind as a single array (``= ANY(:tags)``) rather than an expanding
+  IN, so a shape has one SQL text whatever the list length. Each connection
+  then prepares it once and skips parsing it again (see app.database).
+
+They also select only the columns of ``MomentSummary``, with each moment's
+tag ids aggregated in the same query, and map rows straight to responses:
+no ORM entities, and none of the embedding, metadata or transcript excerpt
+that make up most of a full row.
+"""
+import math
+import time
+from collections.abc import Sequence
+from functools import cache
+from uuid import UUID
+
+from sqlalchemy import (
+    ColumnElement,
+    Float,
+    Integer,
+    Row,
+    Select,
+    String,
+    and_,
+    any_,
+    bindparam,
+    desc,
+    distinct,
+    func,
+    literal_column,
+    select,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.dialects.postgresql import UUID as PGUUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, selectinload
+
+from app.models import Moment, MomentTag, Tag, TagClosure
+from app.schemas.moment import MomentSummary
+from app.schemas.search import (
+    PatternDiscoveryRequest,
+    PatternDiscoveryResponse,
+    SearchPattern,
+    SemanticSearchRequest,
+    TagSearchRequest,
+    TagSearchResponse,
+)
+from app.services.taxonomy import Taxonomy, get_taxonomy
+
+# Generated, indexed column in schema.sql (idx_moments_virality); the ORM model
+# only exposes virality_overall as a Python property
+VIRALITY_OVERALL = literal_column("moments.virality_overall", Float)
+
+
+def tag_filter(tags: list[str], operator: str = "AND") -> ColumnElement[bool]:
+    """
+    Match moments carrying the given tag slugs or any of their descendants
+
+    Hierarchies are expanded through the precomputed tag_closure table, so
+    parent tags cost one indexed join rather than a recursive query.
+
+    Args:
+        tags: Tag slugs
+        operator: "AND" (all tags) or "OR" (any tag)
+    """
+    return _tag_filter(Tag.slug.in_(tags), operator, len(set(tags)))
+
+
+def _tag_filter(
+    slug_clause: ColumnElement[bool], operator: str, tag_count: int | ColumnElement[int]
+) -> ColumnElement[bool]:
+    tagged = (
+        select(MomentTag.moment_id)
+        .join(TagClosure, TagClosure.descendant_id == MomentTag.tag_id)
+        .join(Tag, TagClosure.ancestor_id == Tag.id)
+        .where(slug_clause)
+    )
+    if operator == "AND":
+        # A moment matches a requested tag through any tag in its subtree
+        tagged = tagged.group_by(MomentTag.moment_id).having(
+            func.count(distinct(TagClosure.ancestor_id)) == tag_count
+        )
+    return Moment.id.in_(tagged)
+
+
+def moment_filters(
+    tags: list[str] | None = None,
+    operator: str = "AND",
+    min_virality: float = 0.0,
+    video_ids: list[UUID] | None = None,
+) -> list[ColumnElement[bool]]:
+    """Build WHERE clauses matching ``TagSearchRequest`` semantics"""
+    clauses = []
+    if tags:
+        clauses.append(tag_filter(tags, operator))
+    if min_virality > 0:
+        clauses.append(VIRALITY_OVERALL >= min_virality)
+    if video_ids:
+        clauses.append(Moment.video_id.in_(video_ids))
+    return clauses
+
+
+# For code that needs full Moment entities with their tags, in one extra round trip
+MOMENT_TAG_OPTIONS = selectinload(Moment.moment_tags).joinedload(MomentTag.tag).joinedload(
+    Tag.dimension
+)
+
+# Columns of MomentSummary, the shape of list and search results
+SUMMARY_COLUMNS = (
+    Moment.id,
+    Moment.video_id,
+    Moment.start_time,
+    Moment.end_time,
+    Moment.summary,
+    Moment.requires_context,
+    Moment.virality_hook_strength,
+    Moment.virality_shareability,
+    Moment.virality_clip_independence,
+    Moment.virality_emotional_intensity,
+    VIRALITY_OVERALL.label("virality_overall"),
+    Moment.platform_tiktok,
+    Moment.platform_youtube_shorts,
+    Moment.platform_instagram_reels,
+    Moment.platform_twitter,
+    Moment.suggested_clip_start,
+    Moment.suggested_clip_end,
+    Moment.created_at,
+)
+
+# Index-only scan of moment_tags' (moment_id, tag_id) key; Postgres runs it
+# after ORDER BY ... LIMIT, for the returned rows only
+MOMENT_TAG_IDS = (
+    select(func.array_agg(MomentTag.tag_id))
+    .where(MomentTag.moment_id == Moment.id)
+    .scalar_subquery()
+    .label("tag_ids")
+)
+
+
+@cache
+def tag_search_statements(
+    operator: str, min_virality: bool, video_ids: bool
+) -> tuple[Select, Select]:
+    """
+    Count and page statements for one shape of ``TagSearchRequest``
+
+    Binds tags, tag_count, min_virality, video_ids, limit and offset; see
+    ``tag_search_params``.
+
+    Args:
+        operator: "AND" or "OR"
+        min_virality: Whether a minimum virality filter is applied
+        video_ids: Whether results are restricted to some videos
+    """
+    filters = [
+        _tag_filter(
+            Tag.slug == any_(bindparam("tags", type_=ARRAY(String))),
+            operator,
+            bindparam("tag_count", type_=Integer),
+        )
+    ]
+    if min_virality:
+        filters.append(VIRALITY_OVERALL >= bindparam("min_virality", type_=Float))
+    if video_ids:
+        filters.append(
+            Moment.video_id == any_(bindparam("video_ids", type_=ARRAY(PGUUID(as_uuid=True))))
+        )
+
+    count = select(func.count()).select_from(Moment).where(*filters)
+    page = (
+        select(*SUMMARY_COLUMNS, MOMENT_TAG_IDS)
+        .where(*filters)
+        .order_by(VIRALITY_OVERALL.desc(), Moment.id)
+        .limit(bindparam("limit", type_=Integer))
+        .offset(bindparam("offset", type_=Integer))
+    )
+    return count, page
+
+
+def tag_search_params(request: TagSearchRequest) -> tuple[tuple[Select, Select], dict]:
+    """Statements for the request's shape, and its bind parameters"""
+    statements = tag_search_statements(
+        request.operator, request.min_virality > 0, bool(request.video_ids)
+    )
+    return statements, {
+        "tags": request.tags,
+        "tag_count": len(set(request.tags)),
+        "min_virality": request.min_virality,
+        "video_ids": request.video_ids,
+        "limit": request.limit,
+        "offset": request.offset,
+    }
+
+
+_semantic_distance = Moment.embedding.cosine_distance(
+    bindparam("embedding", type_=Moment.embedding.type)
+)
+# Binds embedding, max_distance, limit and offset
+SEMANTIC_SEARCH = (
+    select(*SUMMARY_COLUMNS, MOMENT_TAG_IDS, _semantic_distance.label("distance"))
+    .where(_semantic_distance <= bindparam("max_distance", type_=Float))
+    # Ordering by the raw distance lets the ivfflat index drive the scan
+    .order_by(_semantic_distance)
+    .limit(bindparam("limit", type_=Integer))
+    .offset(bindparam("offset", type_=Integer))
+)
+
+
+def moment_summary(row: Row, taxonomy: Taxonomy) -> MomentSummary:
+    """Convert a SUMMARY_COLUMNS + MOMENT_TAG_IDS row to its response schema"""
+    tags: dict[str, list[str]] = {}
+    for tag_id in row.tag_ids or ():
+        tag = taxonomy.by_id.get(tag_id)
+        if tag is not None:
+            tags.setdefault(taxonomy.dimensions[tag_id] or "other", []).append(tag.slug)
+    return MomentSummary.model_validate({**row._mapping, "tags": tags})
+
+
+async def tag_search(session: AsyncSession, request: TagSearchRequest) -> TagSearchResponse:
+    """Find moments by tag combination, highest virality first"""
+    started = time.perf_counter()
+    (count, page), params = tag_search_params(request)
+
+    total = await session.scalar(count, params)
+    rows = await session.execute(page, params)
+    taxonomy = await get_taxonomy(session)
+
+    return TagSearchResponse(
+        moments=[moment_summary(row, taxonomy) for row in rows],
+        total_count=total,
+        query_time_ms=(time.perf_counter() - started) * 1000,
+        page=request.offset // request.limit + 1,
+        page_size=request.limit,
+        total_pages=math.ceil(total / request.limit),
+    )
+
+
+async def semantic_search(
+    session: AsyncSession,
+    request: SemanticSearchRequest,
+    embedding: Sequence[float],
+) -> list[tuple[MomentSummary, float]]:
+    """
+    Find moments whose embedding is close to ``embedding``
+
+    Args:
+        session: Database session
+        request: Similarity threshold and paging
+        embedding: Query vector (same model/dimensions as Moment.embedding)
+
+    Returns:
+        List of (moment, cosine similarity), most similar first
+    """
+    rows = await session.execute(
+        SEMANTIC_SEARCH,
+        {
+            "embedding": embedding,
+            "max_distance": 1 - request.min_similarity,
+            "limit": request.limit,
+            "offset": request.offset,
+        },
+    )
+    taxonomy = await get_taxonomy(session)
+    return [(moment_summary(row, taxonomy), 1 - row.distance) for row in rows]
+
+
+async def discover_patterns(
+    session: AsyncSession,
+    request: PatternDiscoveryRequest,
+) -> PatternDiscoveryResponse:
+    """Find tag pairs that co-occur on moments, ranked by average virality"""
+    started = time.perf_counter()
+    first, second = aliased(MomentTag), aliased(MomentTag)
+    avg_virality = func.avg(VIRALITY_OVERALL).label("avg_virality")
+
+    stmt = (
+        select(first.tag_id, second.tag_id, func.count().label("occurrences"), avg_virality)
+        .select_from(first)
+        .join(
+            second,
+            and_(first.moment_id == second.moment_id, first.tag_id < second.tag_id),
+        )
+        .join(Moment, Moment.id == first.moment_id)
+        .group_by(first.tag_id, second.tag_id)
+        .having(func.count() >= request.min_occurrences)
+        .order_by(desc(avg_virality))
+        .limit(request.limit)
+    )
+    if request.min_virality > 0:
+        stmt = stmt.where(VIRALITY_OVERALL >= request.min_virality)
+
+    rows = (await session.execute(stmt)).all()
+    taxonomy = await get_taxonomy(session)
+    patterns = [
+        SearchPattern(
+            tag_pattern=[taxonomy.by_id[first_id].slug, taxonomy.by_id[second_id].slug],
+            occurrence_count=occurrences,
+            avg_virality=avg,
+        )
+        for first_id, second_id, occurrences, avg in rows
+        if first_id in taxonomy.by_id and second_id in taxonomy.by_id
+    ]
+
+    return PatternDiscoveryResponse(
+        patterns=patterns,
+        total_patterns=len(patterns),
+        query_time_ms=(time.perf_counter() - started) * 1000,
+    )
@@ -0,0 +1,240 @@
+"""In-memory tag autocomplete
+
+The tag picker requests suggestions on every keystroke, so lookups never touch
+the database: an index over the cached taxonomy answers prefix queries with a
+binary search over sorted keys and falls back to trigram similarity (the
+pg_trgm measure) for typos. Tags are ranked by the ``usage_count`` of their
+subtree, as searching a parent tag matches its descendants' moments, and
+inherit their nearest ancestor's dimension when they have none.
+
+The index is rebuilt whenever the taxonomy is reloaded (tag changes are pushed
+by ``taxonomy_listener``) and at least every
+``tag_autocomplete_refresh_interval`` seconds so the ranking follows usage.
+Only the first build happens in a request; afterwards a stale index keeps
+being served while a single background task replaces it.
+"""
+import asyncio
+import heapq
+import re
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from collections.abc import Iterable
+from itertools import islice
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.metrics import TAG_AUTOCOMPLETE_SECONDS
+from app.services.taxonomy import Taxonomy, TaxonomyTag, cached_taxonomy, get_taxonomy
+
+# Match tiers, best first
+EXACT, PREFIX, WORD_PREFIX, DIMENSION_PREFIX = range(4)
+
+# Prefixes up to this length match too many keys to scan per keystroke; their
+# best MAX_SUGGESTIONS are precomputed
+SHORT_PREFIX = 2
+MAX_SUGGESTIONS = 50
+
+MIN_TRIGRAM_QUERY = 3
+TRIGRAM_THRESHOLD = 0.3  # pg_trgm's default similarity threshold
+
+_SEPARATORS = re.compile(r"[\s\-_/]+")
+
+
+def normalize(text: str) -> str:
+    """Lowercase with slug separators folded to single spaces"""
+    return _SEPARATORS.sub(" ", text.lower()).strip()
+
+
+def trigrams(text: str) -> set[str]:
+    """pg_trgm-style trigrams: each word padded with two leading and one trailing space"""
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _best_tiers(matches: Iterable[tuple[int, int]]) -> dict[int, int]:
+    """Lowest tier per rank from (tier, rank) pairs"""
+    best: dict[int, int] = {}
+    for tier, rank in matches:
+        if tier < best.get(rank, DIMENSION_PREFIX + 1):
+            best[rank] = tier
+    return best
+
+
+def _ranked(best: dict[int, int], limit: int) -> list[int]:
+    return heapq.nsmallest(limit, best, key=lambda rank: (best[rank], rank))
+
+
+class TagAutocompleteIndex:
+    """Prefix and trigram index over tag slugs, names and dimensions"""
+
+    def __init__(self, taxonomy: Taxonomy):
+        self.taxonomy = taxonomy
+        self.built_at = time.monotonic()
+
+        # Position in this list is the tag's rank: lower = more used
+        self.tags = sorted(
+            taxonomy.tags, key=lambda tag: (-taxonomy.subtree_usage[tag.id], tag.slug)
+        )
+        self._dimensions = [taxonomy.dimensions[tag.id] for tag in self.tags]
+
+        entries: list[tuple[str, int, int]] = []
+        postings: dict[str, list[int]] = defaultdict(list)
+        trigram_counts = []
+        for rank, tag in enumerate(self.tags):
+            slug, name = normalize(tag.slug), normalize(tag.name)
+            for text in {slug, name}:
+                entries.append((text, PREFIX, rank))
+                entries.extend((word, WORD_PREFIX, rank) for word in text.split()[1:])
+            if self._dimensions[rank]:
+                entries.append((normalize(self._dimensions[rank]), DIMENSION_PREFIX, rank))
+
+            grams = trigrams(f"{slug} {name}")
+            for gram in grams:
+                postings[gram].append(rank)
+            trigram_counts.append(len(grams))
+        self._trigrams = {
+            gram: np.array(ranks, dtype=np.int32) for gram, ranks in postings.items()
+        }
+        self._trigram_counts = np.array(trigram_counts, dtype=np.int32)
+
+        # Parallel sorted columns, so a prefix is one bisect away
+        entries.sort()
+        self._keys = [key for key, _, _ in entries]
+        self._tiers = [tier for _, tier, _ in entries]
+        self._ranks = [rank for _, _, rank in entries]
+
+        short: dict[str, list[tuple[int, int]]] = defaultdict(list)
+        for key, tier, rank in entries:
+            for length in range(1, min(len(key), SHORT_PREFIX) + 1):
+                exact = length == len(key) and tier == PREFIX
+                short[key[:length]].append((EXACT if exact else tier, rank))
+        self._short = {
+            prefix: _ranked(_best_tiers(matches), MAX_SUGGESTIONS)
+            for prefix, matches in short.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.tags)
+
+    def _prefix_matches(self, query: str) -> dict[int, int]:
+        """Best tier per tag rank for keys starting with ``query``"""
+        keys, tiers, ranks = self._keys, self._tiers, self._ranks
+        start = bisect_left(keys, query)
+        # Keys starting with query sort below query + the highest code point
+        end = bisect_left(keys, query + "\U0010ffff", start)
+        return _best_tiers(
+            (EXACT if keys[i] == query and tiers[i] == PREFIX else tiers[i], ranks[i])
+            for i in range(start, end)
+        )
+
+    def _trigram_matches(self, query: str) -> list[int]:
+        """Ranks of tags similar to ``query``, most similar first"""
+        grams = trigrams(query)
+        postings = [self._trigrams[gram] for gram in grams if gram in self._trigrams]
+        if not postings:
+            return []
+        # Shared trigram counts for every tag at once; a per-candidate Python
+        # loop costs milliseconds when a query has common trigrams
+        shared = np.bincount(np.concatenate(postings), minlength=len(self.tags))
+        scores = shared / (len(grams) + self._trigram_counts - shared)
+        candidates = np.flatnonzero(scores >= TRIGRAM_THRESHOLD)
+        return candidates[np.lexsort((candidates, -scores[candidates]))].tolist()
+
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        dimension: str | None = None,
+    ) -> list[TaxonomyTag]:
+        """
+        Tags matching a partial query
+
+        Args:
+            query: What the user has typed so far
+            limit: Maximum number of suggestions
+            dimension: Only suggest tags of this dimension
+
+        Returns:
+            Exact and prefix matches (slug/name, then later words, then the
+            dimension name) by usage, followed by fuzzy matches by similarity
+        """
+        start = time.perf_counter()
+        ranks = self._search(normalize(query), min(limit, MAX_SUGGESTIONS), dimension)
+        TAG_AUTOCOMPLETE_SECONDS.observe(time.perf_counter() - start)
+        return [self.tags[rank] for rank in ranks]
+
+    def _search(self, query: str, limit: int, dimension: str | None) -> list[int]:
+        def allowed(rank: int) -> bool:
+            return dimension is None or self._dimensions[rank] == dimension
+
+        if not query:
+            return list(islice(filter(allowed, range(len(self.tags))), limit))
+
+        ranks = None
+        if len(query) <= SHORT_PREFIX:
+            ranks = list(islice(filter(allowed, self._short.get(query, ())), limit))
+            if len(ranks) < limit and len(self._short.get(query, ())) == MAX_SUGGESTIONS:
+                ranks = None  # filtered too many of the precomputed ones; scan instead
+        if ranks is None:
+            matches = self._prefix_matches(query)
+            if dimension is not None:
+                matches = {rank: tier for rank, tier in matches.items() if allowed(rank)}
+            ranks = _ranked(matches, limit)
+
+        if len(ranks) < limit and len(query) >= MIN_TRIGRAM_QUERY:
+            taken = set(ranks)
+            fuzzy = (
+                rank
+                for rank in self._trigram_matches(query)
+                if rank not in taken and allowed(rank)
+            )
+            ranks.extend(islice(fuzzy, limit - len(ranks)))
+        return ranks
+
+
+_index: TagAutocompleteIndex | None = None
+_first_build = asyncio.Lock()
+_refreshing: asyncio.Task | None = None
+
+
+async def _refresh(reload: bool) -> None:
+    """Replace the index; ``reload`` also re-reads the taxonomy for new usage counts"""
+    global _index
+    try:
+        async with AsyncSessionLocal() as session:
+            taxonomy = await get_taxonomy(session, refresh=reload)
+        _index = await asyncio.to_thread(TagAutocompleteIndex, taxonomy)
+    except Exception as e:
+        print(f"Tag autocomplete refresh failed: {e}")
+
+
+async def get_tag_autocomplete(session: AsyncSession) -> TagAutocompleteIndex:
+    """
+    Index for the current taxonomy
+
+    The first call builds it (concurrent first calls wait for that one build).
+    Later calls return the existing index at once; when tags changed or its
+    rankings are older than the refresh interval, one background refresh is
+    started and its index served once ready.
+    """
+    global _index, _refreshing
+    if _index is None:
+        async with _first_build:
+            if _index is None:
+                taxonomy = await get_taxonomy(session)
+                _index = await asyncio.to_thread(TagAutocompleteIndex, taxonomy)
+        return _index
+
+    aged = time.monotonic() - _index.built_at > settings.tag_autocomplete_refresh_interval
+    if (aged or cached_taxonomy() is not _index.taxonomy) and (
+        _refreshing is None or _refreshing.done()
+    ):
+        _refreshing = asyncio.create_task(_refresh(reload=aged))
+    return _index
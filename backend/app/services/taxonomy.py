@@ -0,0 +1,171 @@
+"""In-memory tag taxonomy cache
+
+The cache is dropped whenever tags change: the ``tags_changed`` notification
+(see schema.sql) reaches every process through ``taxonomy_listener``.
+"""
+import asyncio
+import contextlib
+from dataclasses import dataclass
+from uuid import UUID
+
+import asyncpg
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models import Tag, TagDimension
+
+
+@dataclass(frozen=True, slots=True)
+class TaxonomyTag:
+    """Lightweight, immutable view of a tag"""
+
+    id: UUID
+    slug: str
+    name: str
+    dimension: str | None
+    parent_id: UUID | None
+    usage_count: int
+
+
+class Taxonomy:
+    """Tags indexed by slug and id, with the closure of the parent hierarchy
+
+    The closure holds the same pairs as the ``tag_closure`` table, which tag
+    filters join in SQL; this copy serves the hierarchy to Python callers.
+    """
+
+    def __init__(self, tags: list[TaxonomyTag]):
+        self.tags = tags
+        self.by_slug = {tag.slug: tag for tag in tags}
+        self.by_id = {tag.id: tag for tag in tags}
+
+        self.ancestors: dict[UUID, tuple[UUID, ...]] = {}  # nearest first
+        descendants: dict[UUID, set[UUID]] = {tag.id: {tag.id} for tag in tags}
+        for tag in tags:
+            chain = []
+            parent_id = tag.parent_id
+            while parent_id in self.by_id and parent_id != tag.id and parent_id not in chain:
+                chain.append(parent_id)
+                descendants[parent_id].add(tag.id)
+                parent_id = self.by_id[parent_id].parent_id
+            self.ancestors[tag.id] = tuple(chain)
+        self.descendants = {tag_id: frozenset(ids) for tag_id, ids in descendants.items()}
+
+        # Tags without a dimension of their own take their nearest ancestor's
+        self.dimensions: dict[UUID, str | None] = {}
+        for tag in tags:
+            lineage = (tag, *(self.by_id[tag_id] for tag_id in self.ancestors[tag.id]))
+            self.dimensions[tag.id] = next((t.dimension for t in lineage if t.dimension), None)
+        # A tag filter matches its whole subtree, so its popularity does too
+        self.subtree_usage = {
+            tag.id: sum(self.by_id[tag_id].usage_count for tag_id in self.descendants[tag.id])
+            for tag in tags
+        }
+
+    def __len__(self) -> int:
+        return len(self.tags)
+
+    def resolve(self, slugs: list[str]) -> list[TaxonomyTag]:
+        """
+        Map slugs to the most specific tags they name
+
+        Unknown and duplicate slugs are dropped, and so is a tag when one of
+        its descendants is also named: tag filters match descendants through
+        the closure, so the ancestor adds nothing.
+        """
+        resolved = {}
+        for slug in slugs:
+            tag = self.by_slug.get(slug)
+            if tag is not None:
+                resolved[tag.id] = tag
+        implied = {ancestor for tag_id in resolved for ancestor in self.ancestors[tag_id]}
+        return [tag for tag_id, tag in resolved.items() if tag_id not in implied]
+
+
+async def load_taxonomy(session: AsyncSession) -> Taxonomy:
+    """Load all tags with their dimension names, and build the hierarchy closure"""
+    result = await session.execute(
+        select(
+            Tag.id,
+            Tag.slug,
+            Tag.name,
+            TagDimension.name,
+            Tag.parent_id,
+            Tag.usage_count,
+        ).outerjoin(TagDimension, Tag.dimension_id == TagDimension.id)
+    )
+    return Taxonomy([TaxonomyTag(*row) for row in result.all()])
+
+
+_taxonomy: Taxonomy | None = None
+
+
+async def get_taxonomy(session: AsyncSession, refresh: bool = False) -> Taxonomy:
+    """Return the cached taxonomy, loading it on first use"""
+    global _taxonomy
+    if _taxonomy is None or refresh:
+        _taxonomy = await load_taxonomy(session)
+    return _taxonomy
+
+
+def cached_taxonomy() -> Taxonomy | None:
+    """The cached taxonomy, without loading it (None until loaded or after invalidation)"""
+    return _taxonomy
+
+
+def invalidate_taxonomy() -> None:
+    """Drop the cached taxonomy so the next lookup reloads it"""
+    global _taxonomy
+    _taxonomy = None
+
+
+class TaxonomyListener:
+    """Invalidates the cached taxonomy on ``tags_changed`` notifications"""
+
+    def __init__(self, retry_interval: float = 30.0):
+        self.retry_interval = retry_interval
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        invalidate_taxonomy()
+
+    async def _run(self) -> None:
+        """Hold a LISTEN connection, reconnecting after failures"""
+        reconnect = False
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(
+                    settings.database_listen_url or settings.database_url
+                )
+                await connection.add_listener("tags_changed", self._on_notify)
+                if reconnect:
+                    # Tags may have changed while we weren't listening
+                    invalidate_taxonomy()
+                while True:
+                    await asyncio.sleep(self.retry_interval)
+                    # Keepalive; raises once the connection is gone
+                    await connection.execute("SELECT 1")
+            except Exception as e:
+                print(f"Taxonomy listener error: {e}")
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            reconnect = True
+            await asyncio.sleep(self.retry_interval)
+
+
+# Global instance
+taxonomy_listener = TaxonomyListener()
@@ -0,0 +1,122 @@
+"""Timestamp → offset index for transcripts
+
+Transcripts are stored as one TEXT blob. At ingest we parse the line timestamps
+once and keep a compact, sorted index of ``(seconds, character offset)`` pairs
+next to the text, so excerpts for ``[start_time, end_time]`` are a binary search
+plus a slice instead of a scan of the whole transcript.
+"""
+import re
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+
+# Matches "0:07", "12:34", "1:23:45" (optionally bracketed) at the start of a line
+TIMESTAMP_PATTERN = re.compile(r"^\s*[\[(]?(?:(\d{1,2}):)?(\d{1,3}):(\d{2})(?:\.\d+)?[\])]?")
+
+# Serialized layout: version, entry count, text length, then float64 times and
+# int64 offsets, all little-endian
+_HEADER = struct.Struct("<BIQ")
+_VERSION = 1
+
+
+def parse_timestamp(line: str) -> float | None:
+    """Return the leading timestamp of a transcript line in seconds, if any"""
+    match = TIMESTAMP_PATTERN.match(line)
+    if not match:
+        return None
+    hours, minutes, seconds = match.groups()
+    return float(int(hours or 0) * 3600 + int(minutes) * 60 + int(seconds))
+
+
+class SegmentIndex:
+    """Sorted timestamp → character offset index over a transcript"""
+
+    __slots__ = ("times", "offsets", "text_length")
+
+    def __init__(self, times: array, offsets: array, text_length: int):
+        self.times = times
+        self.offsets = offsets
+        self.text_length = text_length
+
+    @classmethod
+    def build(cls, raw_text: str) -> "SegmentIndex":
+        """Parse line timestamps from a transcript"""
+        times = array("d")
+        offsets = array("q")
+        offset = 0
+        last_time = float("-inf")
+
+        for line in raw_text.splitlines(keepends=True):
+            seconds = parse_timestamp(line)
+            # Out-of-order timestamps stay part of the preceding segment so the
+            # index remains sorted for binary search
+            if seconds is not None and seconds >= last_time:
+                times.append(seconds)
+                offsets.append(offset)
+                last_time = seconds
+            offset += len(line)
+
+        return cls(times, offsets, len(raw_text))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "SegmentIndex":
+        """Deserialize an index produced by ``to_bytes``"""
+        version, count, text_length = _HEADER.unpack_from(data)
+        if version != _VERSION:
+            raise ValueError(f"Unsupported segment index version: {version}")
+
+        times = array("d")
+        offsets = array("q")
+        start = _HEADER.size
+        times.frombytes(data[start : start + count * 8])
+        offsets.frombytes(data[start + count * 8 : start + count * 16])
+        if sys.byteorder == "big":
+            times.byteswap()
+            offsets.byteswap()
+
+        return cls(times, offsets, text_length)
+
+    def to_bytes(self) -> bytes:
+        """Serialize to the compact on-disk form"""
+        times = array("d", self.times)
+        offsets = array("q", self.offsets)
+        if sys.byteorder == "big":
+            times.byteswap()
+            offsets.byteswap()
+        header = _HEADER.pack(_VERSION, len(times), self.text_length)
+        return header + times.tobytes() + offsets.tobytes()
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    @property
+    def duration(self) -> float:
+        """Timestamp of the last segment (0 if the transcript has none)"""
+        return self.times[-1] if self.times else 0.0
+
+    def span(self, start_time: float, end_time: float) -> tuple[int, int]:
+        """
+        Character range covering ``[start_time, end_time]``
+
+        Starts at the segment containing ``start_time`` and ends before the
+        first segment that begins after ``end_time``.
+        """
+        if not self.times:
+            return 0, self.text_length
+
+        first = max(bisect_right(self.times, start_time) - 1, 0)
+        last = bisect_right(self.times, end_time)
+        end = self.offsets[last] if last < len(self.offsets) else self.text_length
+        return self.offsets[first], end
+
+    def excerpt(self, raw_text: str, start_time: float, end_time: float) -> str:
+        """Slice the transcript lines covering ``[start_time, end_time]``"""
+        start, end = self.span(start_time, end_time)
+        return raw_text[start:end]
+
+
+def build_segment_index(raw_text: str) -> bytes:
+    """Build the serialized segment index stored on ``Transcript.segment_index``"""
+    return SegmentIndex.build(raw_text).to_bytes()
+
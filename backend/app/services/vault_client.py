@@ -1,32 +1,77 @@
-"""HashiCorp Vault client for secrets management"""
+"""HashiCorp Vault client for secrets management
+
+Secrets are cached in memory for their lease duration (or ``vault_cache_ttl``
+for non-leased KV secrets) and refreshed by a background task before they
+expire. If Vault is unreachable, cached values keep being served for up to
+``vault_max_stale`` seconds past expiry.
+"""
+import asyncio
+import contextlib
 import os
+import random
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
 from typing import Any
 
 import httpx
 
 from app.config import settings
 
+# Refresh once this fraction of the TTL has elapsed
+REFRESH_AT = 0.75
+# Delay before retrying a failed refresh
+RETRY_INTERVAL = 5.0
+
+
+@dataclass
+class CachedSecret:
+    """A secret and its cache deadlines (on the client's clock)"""
+
+    data: dict[str, Any]
+    refresh_at: float
+    expires_at: float
+
 
 class VaultClient:
-    """Client for HashiCorp Vault integration"""
+    """Async client for HashiCorp Vault with a lease-aware secret cache"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
         self.vault_addr = settings.vault_addr
         self.vault_token = settings.vault_token or os.getenv("VAULT_TOKEN")
         self.enabled = settings.vault_enabled and self.vault_token is not None
-
-        if self.enabled:
-            self.client = httpx.Client(
+        self.default_ttl = settings.vault_cache_ttl
+        self.max_stale = settings.vault_max_stale
+        # Replaceable (e.g. httpx.MockTransport) to run against a fake Vault
+        self._transport = transport
+        # Replaceable to move cache deadlines without waiting
+        self._clock = clock
+        self._client: httpx.AsyncClient | None = None
+        self._cache: dict[str, CachedSecret] = {}
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._refresher: asyncio.Task | None = None
+        self._wakeup = asyncio.Event()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Created on first use so it binds to the running event loop
+        if self._client is None:
+            self._client = httpx.AsyncClient(
                 base_url=self.vault_addr,
                 headers={"X-Vault-Token": self.vault_token},
-                timeout=10.0,
+                timeout=settings.vault_timeout,
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+                transport=self._transport,
             )
-        else:
-            self.client = None
+        return self._client
 
-    def get_secret(self, path: str) -> dict[str, Any] | None:
+    async def get_secret(self, path: str) -> dict[str, Any] | None:
         """
-        Get secret from Vault
+        Get secret from Vault (cached)
 
         Args:
             path: Secret path (e.g., "secret/postgres/viral_clip_finder")
@@ -34,19 +79,93 @@ class VaultClient:
         Returns:
             Secret data dict or None if not enabled/found
         """
-        if not self.enabled or not self.client:
+        if not self.enabled:
             return None
 
+        cached = self._cache.get(path)
+        if cached is not None and self._clock() < cached.expires_at:
+            return cached.data
+
         try:
-            response = self.client.get(f"/v1/{path}")
-            response.raise_for_status()
-            data = response.json()
-            return data.get("data", {}).get("data", {})
+            return (await self._fetch_once(path)).data
         except Exception as e:
             print(f"Vault error: {e}")
+            if cached is not None and self._clock() < cached.expires_at + self.max_stale:
+                return cached.data
             return None
 
-    def get_database_credentials(self, db_name: str = "viral_clip_finder") -> dict[str, str]:
+    async def _fetch_once(self, path: str) -> CachedSecret:
+        """Fetch ``path``, sharing one request between concurrent callers"""
+        if path in self._inflight:
+            return await asyncio.shield(self._inflight[path])
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[path] = future
+        try:
+            secret = await self._fetch(path)
+            future.set_result(secret)
+            return secret
+        except BaseException as e:
+            future.set_exception(e)
+            # Callers that joined this request see the error; don't warn if none did
+            future.exception()
+            raise
+        finally:
+            del self._inflight[path]
+
+    async def _fetch(self, path: str) -> CachedSecret:
+        response = await self.client.get(f"/v1/{path}")
+        response.raise_for_status()
+        body = response.json()
+        data = body.get("data", {})
+        # KV v2 nests the secret under data.data; KV v1 and dynamic secrets don't
+        if isinstance(data.get("data"), dict):
+            data = data["data"]
+
+        ttl = body.get("lease_duration") or self.default_ttl
+        now = self._clock()
+        secret = CachedSecret(
+            data=data,
+            # Jitter so secrets fetched together don't all refresh together
+            refresh_at=now + ttl * REFRESH_AT * random.uniform(0.9, 1.0),
+            expires_at=now + ttl,
+        )
+        self._cache[path] = secret
+        self._ensure_refresher()
+        return secret
+
+    def _ensure_refresher(self) -> None:
+        if self._refresher is None or self._refresher.done():
+            self._refresher = asyncio.create_task(self._refresh_loop())
+        else:
+            self._wakeup.set()
+
+    async def _refresh_due(self) -> None:
+        """Refresh the cached secrets whose refresh time has passed"""
+        now = self._clock()
+        due = [path for path, secret in self._cache.items() if secret.refresh_at <= now]
+        for path in due:
+            try:
+                await self._fetch_once(path)
+            except Exception as e:
+                print(f"Vault refresh failed for {path}: {e}")
+                secret = self._cache[path]
+                secret.refresh_at = self._clock() + RETRY_INTERVAL
+                if self._clock() > secret.expires_at + self.max_stale:
+                    del self._cache[path]
+
+    async def _refresh_loop(self) -> None:
+        """Refresh cached secrets before they expire"""
+        while self._cache:
+            self._wakeup.clear()
+            await self._refresh_due()
+            if not self._cache:
+                break
+            delay = min(secret.refresh_at for secret in self._cache.values()) - self._clock()
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), max(delay, 0))
+
+    async def get_database_credentials(self, db_name: str = "viral_clip_finder") -> dict[str, str]:
         """
         Get database credentials from Vault
 
@@ -56,7 +175,7 @@ class VaultClient:
         Returns:
             Dict with host, port, database, username, password
         """
-        secret = self.get_secret(f"secret/postgres/{db_name}")
+        secret = await self.get_secret(f"secret/postgres/{db_name}")
         if secret:
             return {
                 "host": secret.get("host", "localhost"),
@@ -75,11 +194,31 @@ class VaultClient:
             "password": os.getenv("DB_PASSWORD", ""),
         }
 
-    def close(self):
-        """Close Vault client"""
-        if self.client:
-            self.client.close()
+    async def close(self) -> None:
+        """Stop background refresh and close the connection pool"""
+        if self._refresher is not None:
+            self._refresher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._refresher
+            self._refresher = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+_vault: VaultClient | None = None
+
+
+def get_vault() -> VaultClient:
+    """Shared client, created on first use rather than at import time"""
+    global _vault
+    if _vault is None:
+        _vault = VaultClient()
+    return _vault
 
 
-# Global instance
-vault = VaultClient()
+async def close_vault() -> None:
+    global _vault
+    if _vault is not None:
+        await _vault.close()
+        _vault = None
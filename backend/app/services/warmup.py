@@ -0,0 +1,65 @@
+"""Startup warm-up so the first requests don't pay one-time setup costs"""
+import asyncio
+import contextlib
+import time
+
+from sqlalchemy import text
+from sqlalchemy.orm import configure_mappers
+
+from app.config import settings
+from app.database import AsyncSessionLocal, engine
+from app.services.tag_autocomplete import get_tag_autocomplete
+from app.services.taxonomy import get_taxonomy
+
+
+async def open_pool_connections(count: int) -> None:
+    """Open ``count`` pool connections concurrently and return them to the pool"""
+    async with contextlib.AsyncExitStack() as stack:
+
+        async def open_one() -> None:
+            connection = await stack.enter_async_context(engine.connect())
+            await connection.execute(text("SELECT 1"))
+
+        # Held open together, so the pool can't hand the same connection out twice
+        results = await asyncio.gather(*(open_one() for _ in range(count)), return_exceptions=True)
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if errors:
+        raise errors[0]
+
+
+async def warm_up() -> dict[str, float | str]:
+    """
+    Configure ORM mappers, pre-open pool connections and load the taxonomy
+    (with its autocomplete index)
+
+    Failures are reported, not raised: a database outage at boot should leave
+    the process running (and not ready) rather than crash-looping.
+
+    Returns:
+        Milliseconds per phase, or the error message of a failed phase
+    """
+    timings: dict[str, float | str] = {}
+
+    started = time.perf_counter()
+    configure_mappers()
+    timings["mappers"] = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    try:
+        await open_pool_connections(min(settings.db_warmup_connections, settings.db_pool_size))
+        timings["pool"] = (time.perf_counter() - started) * 1000
+    except Exception as e:
+        timings["pool"] = str(e) or repr(e)
+        # Skip the taxonomy too; it would only wait on the same failure
+        return timings
+
+    started = time.perf_counter()
+    try:
+        async with AsyncSessionLocal() as session:
+            await get_taxonomy(session, refresh=True)
+            await get_tag_autocomplete(session)
+        timings["taxonomy"] = (time.perf_counter() - started) * 1000
+    except Exception as e:
+        timings["taxonomy"] = str(e) or repr(e)
+
+    return timings
@@ -0,0 +1,8 @@
+"""Performance benchmarks for the analyzer and query hot paths
+
+Run from ``backend/``:
+
+    python -m benchmarks                       # run and compare to baseline
+    python -m benchmarks --update-baseline     # record a new baseline
+    python -m benchmarks --group analyzer      # only one group
+"""
@@ -0,0 +1,123 @@
+"""Benchmark runner: python -m benchmarks [options]"""
+import argparse
+import asyncio
+import importlib
+import os
+import sys
+from pathlib import Path
+
+from benchmarks.corpus import CorpusConfig, load_corpus
+from benchmarks.harness import (
+    REGISTRY,
+    check,
+    load_report,
+    missing_from_baseline,
+    run_all,
+    save_report,
+    to_report,
+)
+
+MODULES = [
+    "benchmarks.bench_analytics",
+    "benchmarks.bench_analyzer",
+    "benchmarks.bench_live",
+    "benchmarks.bench_projection",
+    "benchmarks.bench_queries",
+    "benchmarks.bench_startup",
+    "benchmarks.bench_statements",
+    "benchmarks.bench_tags",
+]
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run performance benchmarks")
+    parser.add_argument("--group", action="append", help="Only run these groups")
+    parser.add_argument("-k", "--filter", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--output", type=Path, help="Write this run's report here")
+    parser.add_argument(
+        "--update-baseline", action="store_true", help="Save results as the new baseline"
+    )
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=float(os.getenv("BENCH_MAX_REGRESSION", "0.25")),
+        help="Allowed median slowdown vs baseline (fraction, default 0.25)",
+    )
+    parser.add_argument(
+        "--corpus-scale",
+        type=float,
+        help="Replace the database contents with a synthetic corpus first (e.g. 0.01, 0.1, 1)",
+    )
+    parser.add_argument("--corpus-seed", type=int, default=42)
+    parser.add_argument(
+        "--require-baseline",
+        action=argparse.BooleanOptionalAction,
+        default=bool(os.getenv("CI")),
+        help="Fail when a benchmark has no baseline to compare against (default: on in CI)",
+    )
+    args = parser.parse_args()
+
+    if args.corpus_scale:
+        config = CorpusConfig(scale=args.corpus_scale, seed=args.corpus_seed)
+        print(f"Loading synthetic corpus: {config.videos} videos")
+        asyncio.run(load_corpus(config, truncate=True))
+
+    for module in MODULES:
+        importlib.import_module(module)
+
+    selected = [
+        bench
+        for bench in REGISTRY
+        if (not args.group or bench.group in args.group)
+        and (not args.filter or args.filter in bench.name)
+    ]
+    results = asyncio.run(run_all(selected))
+    report = to_report(results)
+
+    for name, stats in report["benchmarks"].items():
+        if "skipped" in stats:
+            print(f"{name:45} skipped: {stats['skipped']}")
+        else:
+            unit = stats["unit"]
+            print(
+                f"{name:45} median {stats['median']:10.2f}{unit:2}  "
+                f"p95 {stats['p95']:10.2f}{unit:2}  runs {stats['runs']}"
+            )
+
+    if args.output:
+        save_report(args.output, report)
+
+    if args.update_baseline:
+        baseline = load_report(args.baseline) or {"benchmarks": {}}
+        baseline["benchmarks"].update(
+            {name: stats for name, stats in report["benchmarks"].items() if "skipped" not in stats}
+        )
+        baseline["created_at"] = report["created_at"]
+        baseline["environment"] = report["environment"]
+        save_report(args.baseline, baseline)
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    baseline = load_report(args.baseline)
+    failures = check(selected, results, baseline, args.max_regression)
+    # Without a baseline only budgets are checked, so a regression would pass unnoticed
+    missing = missing_from_baseline(results, baseline)
+    if missing:
+        message = (
+            f"no baseline in {args.baseline} for {len(missing)} benchmark(s), "
+            f"regressions not checked (run with --update-baseline on the reference machine): "
+            + ", ".join(missing)
+        )
+        if args.require_baseline:
+            failures.append(message)
+        else:
+            print(f"WARNING {message}", file=sys.stderr)
+    for failure in failures:
+        print(f"FAIL {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
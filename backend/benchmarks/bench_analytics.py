@@ -0,0 +1,108 @@
+"""Analytics queries: DuckDB over the Parquet snapshot vs the same queries on Postgres
+
+Both run against DATABASE_URL's moments (e.g. after --corpus-scale 1): the
+snapshot_* benchmarks query a snapshot exported from it with a full refresh
+into a temporary directory, the postgres_* benchmarks the tables themselves,
+so both engines see the same moments and tags. They need the 'analytics'
+extra and are skipped when the database has no moments.
+"""
+import atexit
+import shutil
+import tempfile
+from pathlib import Path
+
+from sqlalchemy import text
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.schemas.search import PatternDiscoveryRequest
+from app.services.analytics import AnalyticsSnapshot, analytics_available
+from app.services.search import discover_patterns
+from benchmarks.bench_queries import popular_tags
+from benchmarks.harness import SkipBenchmarkError, benchmark
+
+PATTERNS = PatternDiscoveryRequest(min_occurrences=5)
+
+# Same aggregates as AnalyticsSnapshot.virality_breakdown, in Postgres
+POSTGRES_VIRALITY = {
+    "tag": """
+        SELECT t.slug, count(*), avg(m.platform_tiktok),
+               percentile_cont(0.9) WITHIN GROUP (ORDER BY m.platform_tiktok)
+        FROM moments m
+        JOIN moment_tags mt ON mt.moment_id = m.id
+        JOIN tags t ON t.id = mt.tag_id
+        GROUP BY t.slug
+        HAVING count(*) >= 10
+        ORDER BY 3 DESC
+        LIMIT 50
+    """,
+    "creator": """
+        SELECT v.creator, count(*), avg(m.platform_tiktok),
+               percentile_cont(0.9) WITHIN GROUP (ORDER BY m.platform_tiktok)
+        FROM moments m
+        JOIN videos v ON v.id = m.video_id
+        WHERE v.creator IS NOT NULL
+        GROUP BY v.creator
+        HAVING count(*) >= 10
+        ORDER BY 3 DESC
+        LIMIT 50
+    """,
+}
+
+
+_snapshot: AnalyticsSnapshot | None = None
+
+
+async def corpus_snapshot() -> AnalyticsSnapshot:
+    """Snapshot of the benchmark database, exported on first use (not timed)"""
+    global _snapshot
+    if _snapshot is None:
+        if not analytics_available():
+            raise SkipBenchmarkError("the 'analytics' extra (pyarrow, duckdb) is not installed")
+        await popular_tags()  # skips on an empty or unreachable database
+        directory = Path(tempfile.mkdtemp(prefix="analytics-bench-"))
+        atexit.register(shutil.rmtree, directory, ignore_errors=True)
+        snapshot = AnalyticsSnapshot(directory, threads=settings.analytics_threads)
+        async with AsyncSessionLocal() as session:
+            await snapshot.refresh(session, full=True)
+        _snapshot = snapshot
+    return _snapshot
+
+
+@benchmark("analytics", repeat=3)
+async def snapshot_patterns():
+    snapshot = await corpus_snapshot()
+    await snapshot.patterns(PATTERNS)
+
+
+@benchmark("analytics", repeat=5)
+async def snapshot_virality_by_tag():
+    snapshot = await corpus_snapshot()
+    await snapshot.virality_breakdown("tag", "tiktok")
+
+
+@benchmark("analytics", repeat=5)
+async def snapshot_virality_by_creator():
+    snapshot = await corpus_snapshot()
+    await snapshot.virality_breakdown("creator", "tiktok")
+
+
+@benchmark("analytics", repeat=3)
+async def postgres_patterns():
+    await popular_tags()
+    async with AsyncSessionLocal() as session:
+        await discover_patterns(session, PATTERNS)
+
+
+@benchmark("analytics", repeat=3)
+async def postgres_virality_by_tag():
+    await popular_tags()
+    async with AsyncSessionLocal() as session:
+        await session.execute(text(POSTGRES_VIRALITY["tag"]))
+
+
+@benchmark("analytics", repeat=3)
+async def postgres_virality_by_creator():
+    await popular_tags()
+    async with AsyncSessionLocal() as session:
+        await session.execute(text(POSTGRES_VIRALITY["creator"]))
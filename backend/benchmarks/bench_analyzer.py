@@ -0,0 +1,203 @@
+"""Analyzer hot paths on large synthetic inputs"""
+import asyncio
+import json
+import random
+from functools import cache
+from typing import Any
+
+from app.services.analyzer import TranscriptAnalyzer
+from app.services.executor import CpuExecutor
+from app.services.minhash import fingerprint_windows
+from app.services.pipeline import (
+    chunk_transcript,
+    deduplicate_moments,
+    extract_moments_from_text,
+    moment_bounds,
+    select_distinct_moments,
+)
+from app.services.prefilter import score_chunks
+from app.services.transcript_index import parse_timestamp
+from benchmarks.corpus import generate_transcript
+from benchmarks.harness import benchmark
+
+
+@cache
+def synthetic_transcript(hours: float = 10, seed: int = 0) -> str:
+    """Livestream-like transcript (same generator as the synthetic corpus)"""
+    return generate_transcript(random.Random(seed), int(hours * 3600))
+
+
+def synthetic_moment(rng: random.Random, start: float) -> dict[str, Any]:
+    return {
+        "start_time": start,
+        "end_time": start + rng.uniform(10, 60),
+        "summary": "Streamer reacts to the crowd",
+        "tags": {"emotion": ["excited"], "viral_marker": ["chaotic"]},
+        "virality_scores": {
+            "hook_strength": rng.uniform(0, 10),
+            "shareability": rng.uniform(0, 10),
+            "clip_independence": rng.uniform(0, 10),
+            "emotional_intensity": rng.uniform(0, 10),
+            "overall": rng.uniform(0, 10),
+        },
+        "platform_scores": {"tiktok": rng.uniform(0, 10)},
+    }
+
+
+@cache
+def synthetic_agent_response(moment_count: int = 2000, seed: int = 0) -> str:
+    """Agent-style reply: prose around a large JSON array of moments"""
+    rng = random.Random(seed)
+    moments = [synthetic_moment(rng, i * 30.0) for i in range(moment_count)]
+    return f"Here are the moments I found:\n```json\n{json.dumps(moments)}\n```\nDone."
+
+
+@cache
+def synthetic_moments(count: int = 50_000, seed: int = 0) -> list[dict[str, Any]]:
+    """Overlapping moments, as produced by overlapping chunks"""
+    rng = random.Random(seed)
+    return [synthetic_moment(rng, rng.uniform(0, 36_000)) for _ in range(count)]
+
+
+class _Block:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class _Message:
+    def __init__(self, text: str):
+        self.content = [_Block(text)]
+
+
+def fake_query(latency: float = 0.0):
+    """Agent backend stand-in: two moments per chunk after ``latency`` seconds"""
+
+    async def query(prompt: str):
+        await asyncio.sleep(latency)
+        times = [t for line in prompt.splitlines() if (t := parse_timestamp(line)) is not None]
+        rng = random.Random(len(prompt))
+        start = times[0] if times else 0.0
+        moments = [synthetic_moment(rng, start), synthetic_moment(rng, start + 60)]
+        yield _Message(json.dumps(moments))
+
+    return query
+
+
+# Inline (no worker processes) so the stage benchmarks time the work itself
+inline = CpuExecutor(workers=0)
+offloaded = CpuExecutor(workers=2, min_offload_size=0)
+analyzer = TranscriptAnalyzer(max_concurrent_chunks=5, query_fn=fake_query(), executor=inline)
+
+
+@benchmark("analyzer")
+def chunk_transcript_10h():
+    chunk_transcript(synthetic_transcript())
+
+
+@benchmark("analyzer")
+def fingerprint_windows_10h():
+    fingerprint_windows(synthetic_transcript(), None, 180, 30)
+
+
+@benchmark("analyzer")
+def prefilter_score_10h():
+    score_chunks(chunk_transcript(synthetic_transcript()), ["backflip", "street food", "crowd"])
+
+
+@benchmark("analyzer")
+def extract_moments_2k():
+    extract_moments_from_text(synthetic_agent_response())
+
+
+@benchmark("analyzer")
+def deduplicate_moments_50k():
+    deduplicate_moments(synthetic_moments())
+
+
+async def max_loop_lag_ms(executor: CpuExecutor, fn, *args) -> float:
+    """Worst delay of a 1ms ticker on the event loop while ``fn`` runs"""
+    loop = asyncio.get_running_loop()
+    lags = [0.0]
+    done = asyncio.Event()
+
+    async def tick():
+        while not done.is_set():
+            due = loop.time() + 0.001
+            await asyncio.sleep(0.001)
+            lags.append(loop.time() - due)
+
+    ticker = asyncio.create_task(tick())
+    await asyncio.sleep(0)
+    try:
+        await executor.run(fn, *args)
+    finally:
+        done.set()
+        await ticker
+    return max(lags) * 1000
+
+
+# These report loop lag rather than wall time: offloading should keep it near 0
+@benchmark("analyzer")
+async def loop_lag_dedup_50k_inline():
+    return await max_loop_lag_ms(inline, deduplicate_moments, synthetic_moments())
+
+
+@benchmark("analyzer")
+async def loop_lag_dedup_50k_offloaded():
+    # As in TranscriptAnalyzer: compact columns out, kept indexes back
+    bounds = moment_bounds(synthetic_moments())
+    return await max_loop_lag_ms(offloaded, select_distinct_moments, *bounds)
+
+
+@benchmark("analyzer")
+async def loop_lag_chunk_10h_offloaded():
+    return await max_loop_lag_ms(offloaded, chunk_transcript, synthetic_transcript())
+
+
+@benchmark("analyzer")
+async def analyze_transcript_10h_fake_agent():
+    await analyzer.analyze_transcript(
+        synthetic_transcript(), {"title": "Bench", "creator": "bench"}
+    )
+
+
+async def fair_share_run(short_jobs: int = 5, latency: float = 0.01) -> tuple[float, float]:
+    """
+    A 10h backfill transcript, then short interactive videos submitted 50ms later
+
+    Returns:
+        (slowest short video, whole run) in milliseconds
+    """
+    fair = TranscriptAnalyzer(
+        max_concurrent_chunks=5, query_fn=fake_query(latency), executor=inline
+    )
+    metadata = {"title": "Bench", "creator": "bench"}
+    long_chunks = chunk_transcript(synthetic_transcript())
+    short_chunks = chunk_transcript(synthetic_transcript(hours=0.1, seed=1))
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    backfill = asyncio.create_task(fair.analyze_chunks(long_chunks, metadata, "backfill"))
+    await asyncio.sleep(0.05)
+
+    async def short_video() -> float:
+        submitted = loop.time()
+        await fair.analyze_chunks(short_chunks, metadata, "interactive")
+        return loop.time() - submitted
+
+    latencies = await asyncio.gather(*(short_video() for _ in range(short_jobs)))
+    await backfill
+    return max(latencies) * 1000, (loop.time() - started) * 1000
+
+
+# With first-come-first-served slots the short videos wait for the whole backfill
+@benchmark("analyzer", repeat=3, budget=100)
+async def fair_share_short_videos_during_backfill():
+    slowest, _ = await fair_share_run()
+    return slowest
+
+
+@benchmark("analyzer", repeat=3)
+async def fair_share_total_with_backfill():
+    _, total = await fair_share_run()
+    return total
@@ -0,0 +1,43 @@
+"""Live ingestion: windowing cost per line and window latency under load"""
+import asyncio
+import time
+import uuid
+
+from app.services.analyzer import TranscriptAnalyzer
+from app.services.live import LiveTranscript
+from app.services.pipeline import chunk_transcript
+from benchmarks.bench_analyzer import fake_query, inline, synthetic_transcript
+from benchmarks.harness import benchmark
+
+
+@benchmark("live")
+def live_windowing_10h():
+    """Append a 10h transcript in 20-line network chunks, closing 60s windows"""
+    lines = synthetic_transcript().splitlines()
+    stream = LiveTranscript(uuid.uuid4(), uuid.uuid4(), {}, window_size=60, window_overlap=15)
+    for start in range(0, len(lines), 20):
+        stream.add_lines(lines[start : start + 20], time.monotonic())
+    stream.close_all()
+
+
+# A closed live window must not wait behind a backfill's queued chunks
+@benchmark("live", repeat=3, budget=100)
+async def live_window_during_backfill():
+    analyzer = TranscriptAnalyzer(
+        max_concurrent_chunks=5,
+        query_fn=fake_query(0.01),
+        executor=inline,
+        priority_weights={"live": 8.0, "backfill": 1.0},
+    )
+    metadata = {"title": "Bench", "creator": "bench"}
+    backfill = asyncio.create_task(
+        analyzer.analyze_chunks(chunk_transcript(synthetic_transcript()), metadata, "backfill")
+    )
+    await asyncio.sleep(0.05)
+
+    window = "\n".join(synthetic_transcript(hours=0.02, seed=2).splitlines()[:20])
+    closed = time.perf_counter()
+    await analyzer.analyze_chunks([window], metadata, "live", time.time() + 30)
+    latency = (time.perf_counter() - closed) * 1000
+    await backfill
+    return latency
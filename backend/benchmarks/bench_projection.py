@@ -0,0 +1,129 @@
+"""200-row search pages: column projection vs full Moment entities
+
+    page200_entities_*      select(Moment) with tags selectin-loaded, converted
+                            to MomentWithTags (how tag search read pages before)
+    page200_projection_*    tag_search: SUMMARY_COLUMNS with tag ids
+                            aggregated in the same query, mapped to MomentSummary
+
+*_ms is a page's latency, *_db_kb the rows Postgres returns for it (summed
+pg_column_size, which approximates the bytes sent) and *_response_kb the
+page's moments as JSON. Uses DATABASE_URL; skipped when it has no moments.
+Embeddings are most of an entity row, so load the corpus with them (the
+default).
+"""
+from pydantic import TypeAdapter
+from sqlalchemy import Select, func, select
+
+from app.database import AsyncSessionLocal
+from app.models import Moment, MomentTag, Tag, TagDimension
+from app.schemas.moment import MomentSummary, MomentWithTags
+from app.schemas.search import TagSearchRequest
+from app.schemas.tag import TagWithDimension
+from app.services.search import (
+    MOMENT_TAG_OPTIONS,
+    VIRALITY_OVERALL,
+    moment_filters,
+    tag_search,
+    tag_search_params,
+)
+from benchmarks.bench_queries import popular_tags
+from benchmarks.harness import benchmark
+
+PAGE_SIZE = 200
+
+ENTITY_PAGE = TypeAdapter(list[MomentWithTags])
+PROJECTION_PAGE = TypeAdapter(list[MomentSummary])
+
+
+async def page_request() -> TagSearchRequest:
+    return TagSearchRequest(tags=(await popular_tags())[:1], operator="OR", limit=PAGE_SIZE)
+
+
+def entity_page(request: TagSearchRequest) -> Select:
+    filters = moment_filters(
+        request.tags, request.operator, request.min_virality, request.video_ids
+    )
+    return (
+        select(Moment)
+        .where(*filters)
+        .order_by(VIRALITY_OVERALL.desc(), Moment.id)
+        .limit(request.limit)
+        .offset(request.offset)
+    )
+
+
+def moment_with_tags(moment: Moment) -> MomentWithTags:
+    tags: dict[str, list[TagWithDimension]] = {}
+    for moment_tag in moment.moment_tags:
+        tag = moment_tag.tag
+        dimension = tag.dimension.name if tag.dimension else "other"
+        tags.setdefault(dimension, []).append(TagWithDimension.model_validate(tag))
+
+    result = MomentWithTags.model_validate(moment)
+    result.tags = tags
+    return result
+
+
+async def entity_search(request: TagSearchRequest) -> list[MomentWithTags]:
+    """Tag search as it was: count, then a page of entities and their tags"""
+    async with AsyncSessionLocal() as session:
+        filters = moment_filters(
+            request.tags, request.operator, request.min_virality, request.video_ids
+        )
+        await session.scalar(select(func.count()).select_from(Moment).where(*filters))
+        moments = await session.scalars(entity_page(request).options(MOMENT_TAG_OPTIONS))
+        return [moment_with_tags(moment) for moment in moments]
+
+
+async def projection_search(request: TagSearchRequest) -> list[MomentSummary]:
+    async with AsyncSessionLocal() as session:
+        return (await tag_search(session, request)).moments
+
+
+def row_kb(statement: Select) -> Select:
+    """Summed size of the rows ``statement`` returns, in KB"""
+    rows = statement.subquery("page")
+    return select(func.coalesce(func.sum(func.pg_column_size(rows.table_valued())), 0) / 1024)
+
+
+@benchmark("projection", repeat=10)
+async def page200_entities_ms():
+    await entity_search(await page_request())
+
+
+@benchmark("projection", repeat=10)
+async def page200_projection_ms():
+    await projection_search(await page_request())
+
+
+@benchmark("projection", repeat=1, warmup=0, unit="KB")
+async def page200_entities_db_kb():
+    page = entity_page(await page_request()).subquery()
+    # The selectin load: moment_tags joined with tags and dimensions
+    tag_rows = (
+        select(MomentTag, Tag, TagDimension)
+        .join(Tag, MomentTag.tag_id == Tag.id)
+        .outerjoin(TagDimension, Tag.dimension_id == TagDimension.id)
+        .where(MomentTag.moment_id.in_(select(page.c.id)))
+    )
+    async with AsyncSessionLocal() as session:
+        moments_kb = await session.scalar(row_kb(select(page)))
+        tags_kb = await session.scalar(row_kb(tag_rows))
+    return float(moments_kb + tags_kb)
+
+
+@benchmark("projection", repeat=1, warmup=0, unit="KB")
+async def page200_projection_db_kb():
+    (_, page), params = tag_search_params(await page_request())
+    async with AsyncSessionLocal() as session:
+        return float(await session.scalar(row_kb(page), params))
+
+
+@benchmark("projection", repeat=1, warmup=0, unit="KB")
+async def page200_entities_response_kb():
+    return len(ENTITY_PAGE.dump_json(await entity_search(await page_request()))) / 1024
+
+
+@benchmark("projection", repeat=1, warmup=0, unit="KB")
+async def page200_projection_response_kb():
+    return len(PROJECTION_PAGE.dump_json(await projection_search(await page_request()))) / 1024
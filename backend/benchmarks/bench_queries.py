@@ -0,0 +1,96 @@
+"""Search and pattern-discovery queries against a seeded local Postgres
+
+Uses DATABASE_URL; benchmarks are skipped when the database is unreachable or
+has no moments.
+"""
+import random
+from functools import cache
+
+from sqlalchemy import func, select
+
+from app.database import AsyncSessionLocal
+from app.models import Moment, Tag
+from app.schemas.search import PatternDiscoveryRequest, SemanticSearchRequest, TagSearchRequest
+from app.services.leaderboards import top_moments
+from app.services.search import discover_patterns, semantic_search, tag_search
+from app.services.taxonomy import get_taxonomy
+from benchmarks.harness import SkipBenchmarkError, benchmark
+
+# PRD: search results in under 200ms
+SEARCH_BUDGET_MS = 200.0
+# Landing page boards are precomputed; reading one must not grow with the corpus
+LEADERBOARD_BUDGET_MS = 10.0
+
+_popular_tags: list[str] | None = None
+
+
+async def popular_tags() -> list[str]:
+    """Most used tag slugs; skips the query benchmarks on an empty database"""
+    global _popular_tags
+    if _popular_tags is None:
+        try:
+            async with AsyncSessionLocal() as session:
+                if not await session.scalar(select(func.count()).select_from(Moment)):
+                    raise SkipBenchmarkError("database has no moments")
+                _popular_tags = list(
+                    await session.scalars(
+                        select(Tag.slug).order_by(Tag.usage_count.desc()).limit(5)
+                    )
+                )
+        except SkipBenchmarkError:
+            raise
+        except Exception as e:
+            raise SkipBenchmarkError(f"database unavailable: {e}") from e
+    return _popular_tags
+
+
+@cache
+def query_embedding(seed: int = 0) -> list[float]:
+    rng = random.Random(seed)
+    return [rng.gauss(0, 1) for _ in range(1536)]
+
+
+@benchmark("queries", repeat=20, budget=SEARCH_BUDGET_MS)
+async def tag_search_and():
+    tags = await popular_tags()
+    async with AsyncSessionLocal() as session:
+        await tag_search(session, TagSearchRequest(tags=tags[:2], operator="AND"))
+
+
+@benchmark("queries", repeat=20, budget=SEARCH_BUDGET_MS)
+async def tag_search_or_min_virality():
+    tags = await popular_tags()
+    async with AsyncSessionLocal() as session:
+        await tag_search(
+            session, TagSearchRequest(tags=tags[:3], operator="OR", min_virality=7.0)
+        )
+
+
+@benchmark("queries", repeat=20, budget=SEARCH_BUDGET_MS)
+async def semantic_search_top50():
+    await popular_tags()
+    async with AsyncSessionLocal() as session:
+        await semantic_search(
+            session, SemanticSearchRequest(query="bench", min_similarity=0.0), query_embedding()
+        )
+
+
+@benchmark("queries", repeat=3)
+async def pattern_discovery():
+    await popular_tags()
+    async with AsyncSessionLocal() as session:
+        await discover_patterns(session, PatternDiscoveryRequest(min_occurrences=5))
+
+
+@benchmark("queries", repeat=20, budget=LEADERBOARD_BUDGET_MS)
+async def leaderboard_top_tiktok():
+    await popular_tags()
+    async with AsyncSessionLocal() as session:
+        await top_moments(session, await get_taxonomy(session), metric="tiktok", limit=100)
+
+
+@benchmark("queries", repeat=20, budget=LEADERBOARD_BUDGET_MS)
+async def leaderboard_top_tag():
+    tags = await popular_tags()
+    async with AsyncSessionLocal() as session:
+        await top_moments(session, await get_taxonomy(session), tag=tags[0], limit=100)
@@ -0,0 +1,66 @@
+"""Cold-start costs: importing the app and the lifespan warm-up
+
+Imports run in a fresh interpreter each time, since a warm ``sys.modules``
+would hide the cost.
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from app.database import engine
+from app.services.warmup import open_pool_connections, warm_up
+from benchmarks.harness import SkipBenchmarkError, benchmark
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Fails the benchmark if an API-only import pulls in the agent SDK again
+IMPORT_APP = """
+import sys
+import app.main
+assert "claude_agent_sdk" not in sys.modules, "app.main imported claude_agent_sdk"
+"""
+
+
+def run_python(code: str) -> None:
+    subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "ANALYSIS_WORKERS": "0"},
+        check=True,
+        capture_output=True,
+    )
+
+
+@benchmark("startup", repeat=5)
+def interpreter_baseline():
+    """Bare interpreter start, to tell import regressions from machine noise"""
+    run_python("pass")
+
+
+@benchmark("startup", repeat=5)
+def import_app_main():
+    run_python(IMPORT_APP)
+
+
+_database_available: bool | None = None
+
+
+async def require_database() -> None:
+    global _database_available
+    if _database_available is None:
+        try:
+            await open_pool_connections(1)
+            _database_available = True
+        except Exception:
+            _database_available = False
+    if not _database_available:
+        raise SkipBenchmarkError("database unavailable")
+
+
+@benchmark("startup", repeat=5)
+async def lifespan_warm_up():
+    await require_database()
+    # Start every run from an empty pool
+    await engine.dispose()
+    await warm_up()
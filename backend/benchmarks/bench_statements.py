@@ -0,0 +1,157 @@
+"""Per-query statement overhead: prebuilt vs per-request statements, prepared vs not
+
+    statement_key_*           client side only: build the statements and
+                              compute the key SQLAlchemy looks compiled SQL
+                              up by, per request (no database needed)
+    tag_search_*_built        statements built per request (what search did before)
+    tag_search_*_prebuilt     app.services.search's prebuilt statements
+    tag_search_*_unprepared   prebuilt, on an engine configured for
+                              db_pooler=pgbouncer_unprepared (parse + plan every call)
+
+The difference between built and prebuilt is client-side build/compile time;
+between prebuilt and unprepared, server-side parse/plan time. The "narrow"
+request restricts to a few videos; "page" is a typical first page. The
+tag_search_* benchmarks use DATABASE_URL and are skipped when it has no
+moments.
+"""
+import time
+import uuid
+from collections.abc import Callable
+from functools import cache
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.config import settings
+from app.database import AsyncSessionLocal, InstrumentedPool, database_url, engine_connect_args
+from app.models import Moment
+from app.schemas.search import TagSearchRequest
+from app.services.search import (
+    MOMENT_TAG_IDS,
+    SUMMARY_COLUMNS,
+    VIRALITY_OVERALL,
+    moment_filters,
+    moment_summary,
+    tag_search,
+    tag_search_params,
+)
+from app.services.taxonomy import get_taxonomy
+from benchmarks.bench_queries import popular_tags
+from benchmarks.harness import benchmark
+
+KEY_ITERATIONS = 1_000
+KEY_REQUEST = TagSearchRequest(
+    tags=["comedy", "reaction"], operator="AND", video_ids=[uuid.uuid4()], min_virality=5
+)
+
+_video_ids: list | None = None
+
+
+async def narrow_request() -> TagSearchRequest:
+    global _video_ids
+    tags = await popular_tags()
+    if _video_ids is None:
+        async with AsyncSessionLocal() as session:
+            _video_ids = list(await session.scalars(select(Moment.video_id).distinct().limit(5)))
+    return TagSearchRequest(tags=tags[:1], operator="OR", video_ids=_video_ids, limit=20)
+
+
+async def page_request() -> TagSearchRequest:
+    return TagSearchRequest(tags=(await popular_tags())[:2], operator="AND")
+
+
+@cache
+def unprepared_sessions() -> async_sessionmaker[AsyncSession]:
+    engine = create_async_engine(
+        database_url,
+        pool_pre_ping=False,
+        pool_size=settings.db_pool_size,
+        poolclass=InstrumentedPool,
+        connect_args=engine_connect_args("pgbouncer_unprepared"),
+    )
+    return async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+def built_statements(request: TagSearchRequest) -> tuple[Select, Select]:
+    """Count and page statements as tag_search built them per request"""
+    filters = moment_filters(
+        request.tags, request.operator, request.min_virality, request.video_ids
+    )
+    count = select(func.count()).select_from(Moment).where(*filters)
+    page = (
+        select(*SUMMARY_COLUMNS, MOMENT_TAG_IDS)
+        .where(*filters)
+        .order_by(VIRALITY_OVERALL.desc(), Moment.id)
+        .limit(request.limit)
+        .offset(request.offset)
+    )
+    return count, page
+
+
+def per_request_ms(statements: Callable[[], tuple[Select, Select]]) -> float:
+    started = time.perf_counter()
+    for _ in range(KEY_ITERATIONS):
+        for statement in statements():
+            statement._generate_cache_key()
+    return (time.perf_counter() - started) * 1000 / KEY_ITERATIONS
+
+
+@benchmark("statements")
+def statement_key_built():
+    return per_request_ms(lambda: built_statements(KEY_REQUEST))
+
+
+@benchmark("statements")
+def statement_key_prebuilt():
+    return per_request_ms(lambda: tag_search_params(KEY_REQUEST)[0])
+
+
+async def built_tag_search(session: AsyncSession, request: TagSearchRequest) -> None:
+    """tag_search, building both statements from the request's values"""
+    count, page = built_statements(request)
+    await session.scalar(count)
+    rows = await session.execute(page)
+    taxonomy = await get_taxonomy(session)
+    [moment_summary(row, taxonomy) for row in rows]
+
+
+@benchmark("statements", repeat=50)
+async def tag_search_narrow_built():
+    request = await narrow_request()
+    async with AsyncSessionLocal() as session:
+        await built_tag_search(session, request)
+
+
+@benchmark("statements", repeat=50)
+async def tag_search_narrow_prebuilt():
+    request = await narrow_request()
+    async with AsyncSessionLocal() as session:
+        await tag_search(session, request)
+
+
+@benchmark("statements", repeat=50)
+async def tag_search_narrow_unprepared():
+    request = await narrow_request()
+    async with unprepared_sessions()() as session:
+        await tag_search(session, request)
+
+
+@benchmark("statements", repeat=20)
+async def tag_search_page_built():
+    request = await page_request()
+    async with AsyncSessionLocal() as session:
+        await built_tag_search(session, request)
+
+
+@benchmark("statements", repeat=20)
+async def tag_search_page_prebuilt():
+    request = await page_request()
+    async with AsyncSessionLocal() as session:
+        await tag_search(session, request)
+
+
+@benchmark("statements", repeat=20)
+async def tag_search_page_unprepared():
+    request = await page_request()
+    async with unprepared_sessions()() as session:
+        await tag_search(session, request)
@@ -0,0 +1,92 @@
+"""Tag autocomplete latency per keystroke on a large synthetic taxonomy"""
+import random
+import string
+import time
+import uuid
+from functools import cache
+
+from app.services.tag_autocomplete import TagAutocompleteIndex
+from app.services.taxonomy import Taxonomy, TaxonomyTag
+from benchmarks.harness import benchmark
+
+# Keystrokes must feel instant; network time dominates above this
+KEYSTROKE_BUDGET_MS = 1.0
+
+DIMENSIONS = ["emotion", "content_type", "topic", "viral_marker", "format", "audience"]
+
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9)))
+
+
+@cache
+def synthetic_index(tag_count: int = 20_000, seed: int = 0) -> TagAutocompleteIndex:
+    """Taxonomy far larger than the seeded one, with Zipf-like usage counts"""
+    rng = random.Random(seed)
+    tags, slugs = [], set()
+    while len(tags) < tag_count:
+        words = [_word(rng) for _ in range(rng.randint(1, 3))]
+        slug = "-".join(words)
+        if slug in slugs:
+            continue
+        slugs.add(slug)
+        tags.append(
+            TaxonomyTag(
+                id=uuid.UUID(int=rng.getrandbits(128)),
+                slug=slug,
+                name=" ".join(words).title(),
+                dimension=rng.choice(DIMENSIONS),
+                parent_id=None,
+                usage_count=int(100_000 / (len(tags) + 1)),
+            )
+        )
+    return TagAutocompleteIndex(Taxonomy(tags))
+
+
+def _typed(word: str) -> list[str]:
+    """Every prefix of ``word``, as sent while typing it"""
+    return [word[:i] for i in range(1, len(word) + 1)]
+
+
+@cache
+def keystrokes(count: int = 200, seed: int = 1) -> list[str]:
+    """Prefixes of real tags, typos of real tags, and misses"""
+    rng = random.Random(seed)
+    tags = synthetic_index().tags
+    queries = []
+    for _ in range(count):
+        slug = rng.choice(tags).slug
+        if rng.random() < 0.2:
+            position = rng.randrange(len(slug))
+            slug = slug[:position] + rng.choice(string.ascii_lowercase) + slug[position + 1 :]
+        queries.extend(_typed(slug))
+    return queries
+
+
+@benchmark("tags", repeat=20)
+def build_autocomplete_index_20k():
+    index = synthetic_index()
+    TagAutocompleteIndex(index.taxonomy)
+
+
+@benchmark("tags", repeat=20, budget=KEYSTROKE_BUDGET_MS)
+def autocomplete_keystroke_p99():
+    """99th percentile of per-keystroke latency over typed prefixes"""
+    index = synthetic_index()
+    samples = []
+    for query in keystrokes():
+        start = time.perf_counter()
+        index.search(query)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return samples[int(len(samples) * 0.99)] * 1000
+
+
+@benchmark("tags", repeat=20, budget=KEYSTROKE_BUDGET_MS)
+def autocomplete_single_letter():
+    """Widest prefix range: one letter matches thousands of keys"""
+    index = synthetic_index()
+    start = time.perf_counter()
+    for letter in string.ascii_lowercase:
+        index.search(letter)
+    return (time.perf_counter() - start) * 1000 / len(string.ascii_lowercase)
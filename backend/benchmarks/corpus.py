@@ -0,0 +1,445 @@
+"""Deterministic synthetic corpus at the architecture doc's scale target
+
+    python -m benchmarks.corpus --scale 0.01            # 100 videos, ~10k moments
+    python -m benchmarks.corpus --scale 1 --truncate    # 10k videos, ~1M moments
+
+Scale 1.0 is the documented target: 10,000 videos, ~100 moments per video and
+~50 tags per moment, drawn from the taxonomy seeded by database/schema.sql.
+Everything is derived from ``--seed`` and the video's position, so the same
+seed and scale always produce the same rows regardless of batch size.
+
+Rows are loaded with binary COPY. User triggers on moments/moment_tags are
+disabled during the load and their aggregates recomputed once at the end.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import asyncpg
+import numpy as np
+from pgvector.asyncpg import register_vector
+
+from app.config import settings
+from app.services.transcript_index import SegmentIndex
+
+FULL_SCALE_VIDEOS = 10_000
+MOMENTS_PER_VIDEO = 100
+TAGS_PER_MOMENT = 50
+EMBEDDING_DIM = 1536
+
+PLATFORMS = ["youtube", "twitch", "kick", "tiktok"]
+WORDS = (
+    "okay chat look at this crowd bro this is crazy they are chanting my name let's go "
+    "we need to try the food right now what is that no way he did a backflip on the roof "
+    "thank you so much for the gifted subs we just hit the goal I can't believe it "
+    "the market is packed everybody is running somebody grab the camera"
+).split()
+MARKERS = ["[laughter]", "[applause]", "[crowd cheering]", "[music]", "[inaudible]"]
+SUMMARY_VERBS = ["reacts to", "tries", "gets surprised by", "celebrates", "argues about", "meets"]
+SUMMARY_OBJECTS = [
+    "street food",
+    "a huge crowd",
+    "a local legend",
+    "a milestone",
+    "a stunt",
+    "a gift",
+]
+
+VIDEO_COLUMNS = [
+    "id",
+    "title",
+    "source_url",
+    "source_platform",
+    "creator",
+    "creator_id",
+    "duration_seconds",
+    "published_at",
+    "metadata",
+]
+TRANSCRIPT_COLUMNS = [
+    "id",
+    "video_id",
+    "raw_text",
+    "word_count",
+    "language",
+    "source",
+    "segment_index",
+    "status",
+    "processed_at",
+]
+MOMENT_COLUMNS = [
+    "id",
+    "video_id",
+    "start_time",
+    "end_time",
+    "summary",
+    "transcript_excerpt",
+    "virality_hook_strength",
+    "virality_shareability",
+    "virality_clip_independence",
+    "virality_emotional_intensity",
+    "platform_tiktok",
+    "platform_youtube_shorts",
+    "platform_instagram_reels",
+    "platform_twitter",
+    "suggested_clip_start",
+    "suggested_clip_end",
+    "suggested_hook_lines",
+    "requires_context",
+    "embedding",
+    "analyzed_at",
+    "analysis_version",
+]
+MOMENT_TAG_COLUMNS = ["moment_id", "tag_id", "confidence"]
+TABLES = {
+    "videos": VIDEO_COLUMNS,
+    "transcripts": TRANSCRIPT_COLUMNS,
+    "moments": MOMENT_COLUMNS,
+    "moment_tags": MOMENT_TAG_COLUMNS,
+}
+
+
+@dataclass
+class CorpusConfig:
+    """Corpus size and content options"""
+
+    scale: float = 0.01
+    seed: int = 42
+    moments_per_video: int = MOMENTS_PER_VIDEO
+    tags_per_moment: int = TAGS_PER_MOMENT
+    embeddings: bool = True
+    transcripts: bool = True
+    batch_videos: int = 20
+
+    @property
+    def videos(self) -> int:
+        return max(1, round(FULL_SCALE_VIDEOS * self.scale))
+
+
+def format_timestamp(seconds: int) -> str:
+    hours, rest = divmod(seconds, 3600)
+    return f"{hours}:{rest // 60:02d}:{rest % 60:02d}"
+
+
+def generate_transcript(rng: random.Random, duration_seconds: int) -> str:
+    """Livestream-like transcript with a timestamped line every few seconds"""
+    lines = []
+    seconds = 0
+    while seconds < duration_seconds:
+        text = " ".join(rng.choices(WORDS, k=rng.randint(4, 20)))
+        if rng.random() < 0.05:
+            text = f"{text} {rng.choice(MARKERS)}"
+        lines.append(f"[{format_timestamp(seconds)}] {text}")
+        seconds += rng.randint(3, 8)
+    return "\n".join(lines)
+
+
+def deterministic_uuid(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+class TagModel:
+    """
+    Correlated tag sampler over the seeded taxonomy
+
+    Tags have a Zipf-like base popularity. Every moment picks one archetype,
+    which boosts a fixed set of affine tags, so co-occurrence patterns and
+    their virality effects are stable across runs with the same seed.
+    """
+
+    def __init__(self, tags: list[tuple[uuid.UUID, str, str | None]], seed: int):
+        rng = np.random.default_rng(seed)
+        self.ids = [tag_id for tag_id, _, _ in tags]
+        self.count = len(tags)
+        dimensions = [dimension for _, _, dimension in tags]
+
+        base = 1.0 / np.power(rng.permutation(self.count) + 1.0, 0.8)
+        archetypes = [i for i, dimension in enumerate(dimensions) if dimension == "archetype"]
+        self.archetypes = archetypes or list(range(self.count))
+
+        self.profiles = {}
+        for archetype in self.archetypes:
+            weights = base.copy()
+            affine = rng.choice(self.count, size=min(6, self.count), replace=False)
+            weights[affine] *= 8.0
+            weights[archetype] = 0.0
+            self.profiles[archetype] = weights / weights.sum()
+
+        self.virality_effect = rng.normal(0.0, 1.0, self.count)
+        self.centroids = rng.standard_normal((self.count, EMBEDDING_DIM)).astype(np.float32)
+
+    def sample(self, rng: np.random.Generator, k: int) -> np.ndarray:
+        """Indices of ``k`` distinct tags for one moment, archetype first"""
+        archetype = self.archetypes[rng.integers(len(self.archetypes))]
+        k = max(1, min(k, self.count))
+        profile = self.profiles[archetype]
+        others = rng.choice(
+            self.count, size=min(k - 1, np.count_nonzero(profile)), replace=False, p=profile
+        )
+        return np.concatenate(([archetype], others))
+
+
+def generate_video(
+    config: CorpusConfig,
+    tag_model: TagModel,
+    index: int,
+    analyzed_at: datetime,
+) -> dict[str, list[tuple]]:
+    """All rows for the ``index``-th video"""
+    rng = random.Random(f"{config.seed}:{index}")
+    np_rng = np.random.default_rng([config.seed, index])
+
+    video_id = deterministic_uuid(rng)
+    creator_rank = min(int(np_rng.zipf(1.5)), 500)
+    creator = f"creator_{creator_rank:03d}"
+    platform = PLATFORMS[creator_rank % len(PLATFORMS)]
+    duration = int(min(max(np_rng.lognormal(np.log(5400), 0.6), 600), 12 * 3600))
+    published_at = datetime(2023, 1, 1, tzinfo=UTC) + timedelta(minutes=rng.randrange(1_000_000))
+
+    rows: dict[str, list[tuple]] = {table: [] for table in TABLES}
+    rows["videos"].append(
+        (
+            video_id,
+            f"{creator} stream #{index}",
+            f"https://example.com/{platform}/{video_id}",
+            platform,
+            creator,
+            f"{platform}:{creator_rank}",
+            duration,
+            published_at,
+            json.dumps({"synthetic": True, "seed": config.seed}),
+        )
+    )
+
+    raw_text = segments = None
+    if config.transcripts:
+        raw_text = generate_transcript(rng, duration)
+        segments = SegmentIndex.build(raw_text)
+        rows["transcripts"].append(
+            (
+                deterministic_uuid(rng),
+                video_id,
+                raw_text,
+                len(raw_text.split()),
+                "en",
+                "synthetic",
+                segments.to_bytes(),
+                "completed",
+                analyzed_at,
+            )
+        )
+
+    moment_count = int(np_rng.poisson(config.moments_per_video))
+    starts = np.sort(np_rng.uniform(0, max(duration - 90, 1), moment_count))
+    lengths = np_rng.uniform(10, 90, moment_count)
+    noise = np_rng.normal(0.0, 1.0, (moment_count, 8))
+
+    for i in range(moment_count):
+        moment_id = deterministic_uuid(rng)
+        start = float(starts[i])
+        end = start + float(lengths[i])
+        tag_indices = tag_model.sample(np_rng, config.tags_per_moment)
+
+        base = 5.0 + 1.5 * tag_model.virality_effect[tag_indices].mean() + 1.2 * noise[i, 0]
+        virality = np.clip(base + noise[i, 1:5], 0.0, 10.0)
+        platforms = np.clip(virality.mean() + 1.5 * noise[i, 4:8], 0.0, 10.0)
+
+        embedding = None
+        if config.embeddings:
+            vector = tag_model.centroids[tag_indices].sum(axis=0)
+            vector += np_rng.standard_normal(EMBEDDING_DIM).astype(np.float32) * 2.0
+            embedding = vector / np.linalg.norm(vector)
+
+        rows["moments"].append(
+            (
+                moment_id,
+                video_id,
+                start,
+                end,
+                f"{creator} {rng.choice(SUMMARY_VERBS)} {rng.choice(SUMMARY_OBJECTS)}",
+                segments.excerpt(raw_text, start, end) if segments is not None else None,
+                *map(float, virality),
+                *map(float, platforms),
+                max(start - 3.0, 0.0),
+                end + 2.0,
+                json.dumps(["You won't believe this"]),
+                rng.choice(["none", "none", "title_only", "brief"]),
+                embedding,
+                analyzed_at,
+                "synthetic",
+            )
+        )
+        confidences = np_rng.uniform(0.5, 1.0, len(tag_indices))
+        rows["moment_tags"].extend(
+            (moment_id, tag_model.ids[tag], float(confidence))
+            for tag, confidence in zip(tag_indices, confidences, strict=True)
+        )
+
+    return rows
+
+
+def generate_batch(
+    config: CorpusConfig,
+    tag_model: TagModel,
+    batch_start: int,
+) -> dict[str, list[tuple]]:
+    """Rows for videos ``batch_start`` .. ``batch_start + config.batch_videos``"""
+    analyzed_at = datetime(2024, 1, 1, tzinfo=UTC)
+    batch: dict[str, list[tuple]] = {table: [] for table in TABLES}
+    for index in range(batch_start, min(batch_start + config.batch_videos, config.videos)):
+        for table, rows in generate_video(config, tag_model, index, analyzed_at).items():
+            batch[table].extend(rows)
+    return batch
+
+
+async def _finalize(connection: asyncpg.Connection, embeddings: bool) -> None:
+    """Recompute what the disabled triggers would have maintained"""
+    await connection.execute(
+        """
+        UPDATE videos v
+        SET moment_count = s.moment_count, avg_virality_score = s.avg_virality
+        FROM (
+            SELECT video_id, COUNT(*) AS moment_count, AVG(virality_overall) AS avg_virality
+            FROM moments GROUP BY video_id
+        ) s
+        WHERE v.id = s.video_id
+        """
+    )
+    await connection.execute(
+        """
+        UPDATE tags t
+        SET usage_count = (SELECT COUNT(*) FROM moment_tags mt WHERE mt.tag_id = t.id)
+        """
+    )
+    await connection.execute("SELECT rebuild_moment_leaderboards()")
+    if embeddings:
+        # ivfflat lists are chosen at build time; rebuild now that data exists
+        await connection.execute("REINDEX INDEX idx_moments_embedding")
+    await connection.execute("ANALYZE videos, transcripts, moments, moment_tags, tags")
+
+
+async def load_corpus(
+    config: CorpusConfig,
+    dsn: str | None = None,
+    truncate: bool = False,
+    jobs: int | None = None,
+) -> dict[str, Any]:
+    """
+    Generate and COPY a corpus into the database
+
+    Args:
+        config: Corpus size and content options
+        dsn: Postgres DSN (defaults to settings.database_url)
+        truncate: Delete all existing videos (and their rows) first
+        jobs: Generator processes (default: CPU count)
+
+    Returns:
+        Row counts per table and elapsed seconds
+    """
+    jobs = jobs or os.cpu_count() or 1
+    connection = await asyncpg.connect(dsn or settings.database_url)
+    await register_vector(connection)
+    started = time.perf_counter()
+    counts = dict.fromkeys(TABLES, 0)
+
+    try:
+        tags = await connection.fetch(
+            """
+            SELECT t.id, t.slug, d.name AS dimension
+            FROM tags t LEFT JOIN tag_dimensions d ON t.dimension_id = d.id
+            ORDER BY t.slug
+            """
+        )
+        if not tags:
+            raise RuntimeError("No tags found; load database/schema.sql first")
+        tag_model = TagModel([tuple(tag) for tag in tags], config.seed)
+
+        if truncate:
+            await connection.execute("TRUNCATE videos CASCADE")
+
+        await connection.execute("ALTER TABLE moments DISABLE TRIGGER USER")
+        await connection.execute("ALTER TABLE moment_tags DISABLE TRIGGER USER")
+        try:
+            async def copy_batch(batch: dict[str, list[tuple]]) -> None:
+                async with connection.transaction():
+                    for table, rows in batch.items():
+                        if rows:
+                            await connection.copy_records_to_table(
+                                table, records=rows, columns=TABLES[table]
+                            )
+                            counts[table] += len(rows)
+                print(
+                    f"  {counts['videos']}/{config.videos} videos, "
+                    f"{counts['moments']} moments ({time.perf_counter() - started:.0f}s)",
+                    flush=True,
+                )
+
+            # Generate in worker processes while this one COPYs; a bounded
+            # number of batches in flight keeps memory flat
+            loop = asyncio.get_running_loop()
+            with ProcessPoolExecutor(jobs) as pool:
+                pending: deque[asyncio.Future] = deque()
+                for batch_start in range(0, config.videos, config.batch_videos):
+                    pending.append(
+                        loop.run_in_executor(pool, generate_batch, config, tag_model, batch_start)
+                    )
+                    if len(pending) > jobs:
+                        await copy_batch(await pending.popleft())
+                while pending:
+                    await copy_batch(await pending.popleft())
+        finally:
+            await connection.execute("ALTER TABLE moments ENABLE TRIGGER USER")
+            await connection.execute("ALTER TABLE moment_tags ENABLE TRIGGER USER")
+
+        await _finalize(connection, config.embeddings)
+    finally:
+        await connection.close()
+
+    return {**counts, "seconds": time.perf_counter() - started}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load a synthetic corpus")
+    parser.add_argument("--scale", type=float, default=0.01, help="1.0 = 10k videos, ~1M moments")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--moments-per-video", type=int, default=MOMENTS_PER_VIDEO)
+    parser.add_argument("--tags-per-moment", type=int, default=TAGS_PER_MOMENT)
+    parser.add_argument("--batch-videos", type=int, default=20)
+    parser.add_argument("--no-embeddings", action="store_true")
+    parser.add_argument("--no-transcripts", action="store_true")
+    parser.add_argument("--truncate", action="store_true", help="Delete existing videos first")
+    parser.add_argument("--jobs", type=int, help="Generator processes (default: CPU count)")
+    parser.add_argument("--dsn", help="Postgres DSN (default: DATABASE_URL)")
+    args = parser.parse_args()
+
+    config = CorpusConfig(
+        scale=args.scale,
+        seed=args.seed,
+        moments_per_video=args.moments_per_video,
+        tags_per_moment=args.tags_per_moment,
+        embeddings=not args.no_embeddings,
+        transcripts=not args.no_transcripts,
+        batch_videos=args.batch_videos,
+    )
+    print(f"Loading {config.videos} videos (scale {config.scale}, seed {config.seed})")
+    result = asyncio.run(
+        load_corpus(config, dsn=args.dsn, truncate=args.truncate, jobs=args.jobs)
+    )
+    print(
+        f"Loaded {result['videos']} videos, {result['transcripts']} transcripts, "
+        f"{result['moments']} moments, {result['moment_tags']} moment tags "
+        f"in {result['seconds']:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""Minimal benchmark registry, runner and baseline comparison"""
+import asyncio
+import inspect
+import json
+import platform
+import statistics
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+
+class SkipBenchmarkError(Exception):
+    """Raised by a benchmark whose prerequisites (e.g. a database) are missing"""
+
+
+@dataclass
+class Benchmark:
+    """A registered benchmark function"""
+
+    name: str
+    group: str
+    fn: Callable[[], Any]
+    repeat: int = 5
+    warmup: int = 1
+    budget: float | None = None  # absolute p95 ceiling in ``unit``, e.g. PRD latency targets
+    max_regression: float | None = None  # overrides the run-wide threshold
+    unit: str = "ms"  # of every sample: wall time, or e.g. "KB" for returned sizes
+
+
+@dataclass
+class BenchmarkResult:
+    """Samples for one benchmark, in its unit (milliseconds unless it says otherwise)"""
+
+    name: str
+    group: str
+    samples: list[float] = field(default_factory=list)
+    skipped: str | None = None
+    unit: str = "ms"
+
+    def stats(self) -> dict[str, Any]:
+        if self.skipped:
+            return {"skipped": self.skipped}
+        samples = sorted(self.samples)
+        p95_index = min(len(samples) - 1, round(0.95 * (len(samples) - 1)))
+        return {
+            "group": self.group,
+            "unit": self.unit,
+            "runs": len(samples),
+            "min": samples[0],
+            "median": statistics.median(samples),
+            "mean": statistics.fmean(samples),
+            "p95": samples[p95_index],
+        }
+
+
+REGISTRY: list[Benchmark] = []
+
+
+def benchmark(
+    group: str,
+    name: str | None = None,
+    *,
+    repeat: int = 5,
+    warmup: int = 1,
+    budget: float | None = None,
+    max_regression: float | None = None,
+    unit: str = "ms",
+) -> Callable:
+    """
+    Register a sync or async zero-argument function as a benchmark
+
+    The sample is the call's wall time, unless the function returns a number,
+    which is then taken as the measurement in milliseconds (or ``unit``). ``budget``
+    is in the same unit.
+    """
+
+    def register(fn: Callable[[], Any]) -> Callable[[], Any]:
+        REGISTRY.append(
+            Benchmark(
+                name=name or fn.__name__,
+                group=group,
+                fn=fn,
+                repeat=repeat,
+                warmup=warmup,
+                budget=budget,
+                max_regression=max_regression,
+                unit=unit,
+            )
+        )
+        return fn
+
+    return register
+
+
+async def _call(fn: Callable[[], Any]) -> Any:
+    result = fn()
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+async def run_benchmark(bench: Benchmark) -> BenchmarkResult:
+    """Run warmups, then time ``repeat`` calls"""
+    result = BenchmarkResult(name=bench.name, group=bench.group, unit=bench.unit)
+    try:
+        for _ in range(bench.warmup):
+            await _call(bench.fn)
+        for _ in range(bench.repeat):
+            started = time.perf_counter()
+            measured = await _call(bench.fn)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            # A benchmark may return its own measurement instead of wall time
+            is_number = isinstance(measured, int | float) and not isinstance(measured, bool)
+            result.samples.append(measured if is_number else elapsed_ms)
+    except SkipBenchmarkError as e:
+        result.skipped = str(e) or "skipped"
+    return result
+
+
+async def run_all(benchmarks: list[Benchmark]) -> list[BenchmarkResult]:
+    """Run benchmarks sequentially in one event loop"""
+    results = []
+    for bench in benchmarks:
+        results.append(await run_benchmark(bench))
+        # Let cancelled/background tasks settle between benchmarks
+        await asyncio.sleep(0)
+    return results
+
+
+def to_report(results: list[BenchmarkResult]) -> dict[str, Any]:
+    """Machine-readable report (also the baseline file format)"""
+    return {
+        "created_at": datetime.now(UTC).isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+        },
+        "benchmarks": {result.name: result.stats() for result in results},
+    }
+
+
+def load_report(path: Path) -> dict[str, Any] | None:
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def save_report(path: Path, report: dict[str, Any]) -> None:
+    path.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+
+
+def check(
+    benchmarks: list[Benchmark],
+    results: list[BenchmarkResult],
+    baseline: dict[str, Any] | None,
+    max_regression: float,
+) -> list[str]:
+    """
+    Compare results against budgets and the baseline
+
+    Returns:
+        Human-readable failure messages (empty when everything passes)
+    """
+    failures = []
+    by_name = {bench.name: bench for bench in benchmarks}
+    baseline_stats = (baseline or {}).get("benchmarks", {})
+
+    for result in results:
+        if result.skipped:
+            continue
+        bench = by_name[result.name]
+        stats = result.stats()
+
+        unit = bench.unit
+        if bench.budget is not None and stats["p95"] > bench.budget:
+            failures.append(
+                f"{result.name}: p95 {stats['p95']:.1f}{unit} "
+                f"exceeds budget {bench.budget:.0f}{unit}"
+            )
+
+        previous = baseline_stats.get(result.name, {})
+        # A baseline in another unit is not comparable
+        if "median" not in previous or previous.get("unit") != unit:
+            continue
+        allowed = bench.max_regression if bench.max_regression is not None else max_regression
+        limit = previous["median"] * (1 + allowed)
+        if stats["median"] > limit:
+            failures.append(
+                f"{result.name}: median {stats['median']:.2f}{unit} regressed more than "
+                f"{allowed:.0%} from baseline {previous['median']:.2f}{unit}"
+            )
+
+    return failures
+
+
+def missing_from_baseline(
+    results: list[BenchmarkResult],
+    baseline: dict[str, Any] | None,
+) -> list[str]:
+    """Names of benchmarks that ran but have no comparable baseline entry"""
+    baseline_stats = (baseline or {}).get("benchmarks", {})
+    missing = []
+    for result in results:
+        previous = baseline_stats.get(result.name, {})
+        if not result.skipped and ("median" not in previous or previous.get("unit") != result.unit):
+            missing.append(result.name)
+    return missing
@@ -0,0 +1,30 @@
+"""Shared fixtures"""
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.database import database_url, engine_connect_args
+
+
+@pytest.fixture
+async def db_session():
+    """Session on DATABASE_URL whose changes are rolled back; skips without a database"""
+    engine = create_async_engine(
+        database_url, poolclass=NullPool, connect_args=engine_connect_args()
+    )
+    try:
+        connection = await engine.connect()
+    except Exception as e:
+        await engine.dispose()
+        pytest.skip(f"Database unavailable: {e}")
+    transaction = await connection.begin()
+    session = AsyncSession(
+        bind=connection, expire_on_commit=False, join_transaction_mode="create_savepoint"
+    )
+    try:
+        yield session
+    finally:
+        await session.close()
+        await transaction.rollback()
+        await connection.close()
+        await engine.dispose()
@@ -0,0 +1,74 @@
+"""Analysis queue claims and their leases"""
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import select
+
+from app.models import Transcript, Video
+from app.services.analysis_queue import CLAIM_PENDING_SQL, RELEASE_CLAIM_SQL, RENEW_CLAIM_SQL
+
+LEASE = 600.0
+# Older than anything else in the table, so the claim query picks it first
+LONG_AGO = datetime(2000, 1, 1, tzinfo=UTC)
+
+
+async def add_transcript(session, status: str, claimed_at: datetime | None = None) -> Transcript:
+    video = Video(title="Queue test")
+    session.add(video)
+    await session.flush()
+    transcript = Transcript(
+        video_id=video.id, raw_text="", status=status, claimed_at=claimed_at, created_at=LONG_AGO
+    )
+    session.add(transcript)
+    await session.flush()
+    return transcript
+
+
+async def claim(session):
+    return (
+        await session.execute(CLAIM_PENDING_SQL, {"allow_backfill": True, "lease": LEASE})
+    ).first()
+
+
+async def claim_state(session, transcript: Transcript) -> tuple[str, datetime | None]:
+    row = await session.execute(
+        select(Transcript.status, Transcript.claimed_at).where(Transcript.id == transcript.id)
+    )
+    return tuple(row.one())
+
+
+async def test_abandoned_claim_is_taken_again(db_session):
+    now = datetime.now(UTC)
+    await add_transcript(db_session, "processing", claimed_at=now)
+    abandoned = await add_transcript(
+        db_session, "processing", claimed_at=now - timedelta(seconds=2 * LEASE)
+    )
+
+    claimed = await claim(db_session)
+    assert claimed.id == abandoned.id
+    assert claimed.claimed_at > now - timedelta(seconds=LEASE)
+
+
+async def test_claim_without_lease_is_abandoned(db_session):
+    # Rows claimed before claimed_at existed
+    stranded = await add_transcript(db_session, "processing")
+    assert (await claim(db_session)).id == stranded.id
+
+
+async def test_renew_and_release_need_the_current_claim(db_session):
+    transcript = await add_transcript(db_session, "pending")
+    claimed = await claim(db_session)
+    assert claimed.id == transcript.id
+
+    renewed = await db_session.scalar(
+        RENEW_CLAIM_SQL, {"id": transcript.id, "claimed_at": claimed.claimed_at}
+    )
+    assert renewed is not None
+
+    # Another worker took the transcript over after the lease lapsed
+    taken_over = {"id": transcript.id, "claimed_at": renewed - timedelta(seconds=1)}
+    assert await db_session.scalar(RENEW_CLAIM_SQL, taken_over) is None
+    await db_session.execute(RELEASE_CLAIM_SQL, taken_over)
+    assert await claim_state(db_session, transcript) == ("processing", renewed)
+
+    await db_session.execute(RELEASE_CLAIM_SQL, {"id": transcript.id, "claimed_at": renewed})
+    assert await claim_state(db_session, transcript) == ("pending", None)
@@ -0,0 +1,43 @@
+"""NDJSON splitting of streamed request bodies"""
+from collections.abc import AsyncIterator
+
+import pytest
+
+from app.services.ingest import RecordTooLargeError, iter_ndjson_lines
+
+
+async def chunked(*chunks: bytes) -> AsyncIterator[bytes]:
+    for chunk in chunks:
+        yield chunk
+
+
+async def collect(*chunks: bytes, max_record_bytes: int = 100) -> list[bytes]:
+    return [line async for line in iter_ndjson_lines(chunked(*chunks), max_record_bytes)]
+
+
+async def test_lines_split_across_chunks():
+    assert await collect(b'{"a":', b' 1}\n{"b"', b": 2}\n\n", b'{"c": 3}') == [
+        b'{"a": 1}',
+        b'{"b": 2}',
+        b"",
+        b'{"c": 3}',
+    ]
+
+
+async def test_many_lines_in_one_chunk():
+    assert await collect(b"1\n2\n3\n") == [b"1", b"2", b"3"]
+
+
+async def test_empty_body():
+    assert await collect() == []
+    assert await collect(b"") == []
+
+
+async def test_record_over_the_limit_is_rejected():
+    with pytest.raises(RecordTooLargeError):
+        await collect(b"x" * 6, b"x" * 6, max_record_bytes=10)
+
+
+async def test_limit_applies_per_record_not_per_chunk():
+    body = b"".join(b"x" * 8 + b"\n" for _ in range(5))
+    assert await collect(body, max_record_bytes=10) == [b"x" * 8] * 5
@@ -0,0 +1,82 @@
+"""Trigger-maintained leaderboards and the overall-board queue"""
+from uuid import uuid4
+
+from sqlalchemy import select
+
+from app.models import Moment, MomentLeaderboard, MomentTag, Tag, Video
+from app.services.leaderboards import apply_leaderboard_queue
+
+# Above any real score, so the test moments top every board
+TOP_SCORE = 100.0
+
+
+async def board(session, scope: str, scope_key: str = "") -> list:
+    return list(
+        await session.scalars(
+            select(MomentLeaderboard.moment_id)
+            .where(
+                MomentLeaderboard.metric == "platform_tiktok",
+                MomentLeaderboard.scope == scope,
+                MomentLeaderboard.scope_key == scope_key,
+            )
+            .order_by(MomentLeaderboard.score.desc(), MomentLeaderboard.moment_id)
+            .limit(2)
+        )
+    )
+
+
+async def add_moment(session, video: Video, score: float) -> Moment:
+    moment = Moment(
+        video_id=video.id, start_time=0, end_time=10, summary="top", platform_tiktok=score
+    )
+    session.add(moment)
+    await session.flush()
+    return moment
+
+
+async def test_overall_boards_follow_the_queue(db_session):
+    creator = f"creator-{uuid4().hex[:8]}"
+    video = Video(title="Leaderboard test", creator=creator)
+    db_session.add(video)
+    await db_session.flush()
+    await apply_leaderboard_queue(db_session)
+
+    moment = await add_moment(db_session, video, TOP_SCORE)
+
+    # The creator board changes with the write, the overall board once applied
+    assert await board(db_session, "creator", creator) == [moment.id]
+    assert moment.id not in await board(db_session, "all")
+    assert await apply_leaderboard_queue(db_session) >= 1
+    assert (await board(db_session, "all"))[0] == moment.id
+
+    moment.platform_tiktok = 0.0
+    await db_session.flush()
+    assert (await board(db_session, "all"))[0] == moment.id
+    await apply_leaderboard_queue(db_session)
+    assert moment.id not in await board(db_session, "all")
+
+    await db_session.delete(moment)
+    await db_session.flush()
+    assert await board(db_session, "creator", creator) == []
+
+
+async def test_tag_boards_change_with_the_write(db_session):
+    video = Video(title="Leaderboard test")
+    db_session.add(video)
+    await db_session.flush()
+    first = await add_moment(db_session, video, TOP_SCORE)
+    second = await add_moment(db_session, video, TOP_SCORE + 1)
+    tag = await db_session.scalar(select(Tag).limit(1))
+
+    db_session.add_all(
+        [MomentTag(moment_id=moment.id, tag_id=tag.id) for moment in (first, second)]
+    )
+    await db_session.flush()
+    assert await board(db_session, "tag", str(tag.id)) == [second.id, first.id]
+
+    second_tag = await db_session.scalar(
+        select(MomentTag).where(MomentTag.moment_id == second.id)
+    )
+    await db_session.delete(second_tag)
+    await db_session.flush()
+    assert (await board(db_session, "tag", str(tag.id)))[0] == first.id
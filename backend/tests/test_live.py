@@ -0,0 +1,150 @@
+"""Live transcript windowing and moment subscriptions"""
+import time
+import uuid
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import live as live_api
+from app.schemas.live import LiveMoment
+from app.services.live import LiveTranscript, live_ingestor
+
+
+def make_stream(window_size: float = 60, window_overlap: float = 15) -> LiveTranscript:
+    return LiveTranscript(uuid.uuid4(), uuid.uuid4(), {}, window_size, window_overlap)
+
+
+def line(seconds: int, text: str) -> str:
+    return f"[{seconds // 60:02d}:{seconds % 60:02d}] {text}"
+
+
+def window_texts(windows) -> list[tuple[int, list[str]]]:
+    """(index, last word of each line) per window"""
+    return [
+        (window.index, [text.split()[-1] for text in window.text.splitlines()])
+        for window in windows
+    ]
+
+
+def test_window_closes_once_a_line_reaches_its_end():
+    stream = make_stream()
+    # Window 0 is [0, 60), window 1 [45, 105), window 2 [90, 150)
+    assert stream.add_lines([line(10, "a"), line(50, "b")], 0) == []
+    assert stream.add_lines([line(59, "c")], 0) == []
+
+    closed = stream.add_lines([line(60, "d")], 0)
+    assert [(w.start_time, w.end_time) for w in closed] == [(0, 60)]
+    assert window_texts(closed) == [(0, ["a", "b", "c"])]
+
+
+def test_overlapping_windows_share_lines():
+    stream = make_stream()
+    stream.add_lines([line(10, "a"), line(50, "b"), line(60, "c")], 0)
+    closed = stream.add_lines([line(100, "d"), line(110, "e")], 0)
+    assert window_texts(closed) == [(1, ["b", "c", "d"])]
+
+
+def test_origin_is_aligned_to_the_window_step():
+    stream = make_stream()
+    stream.add_lines([line(100, "a")], 0)
+    assert stream.window_bounds(0) == (90, 150)
+
+
+def test_late_and_untimed_lines_stay_with_the_preceding_line():
+    stream = make_stream()
+    stream.add_lines(["intro", line(10, "a"), line(50, "b")], 0)
+    # 00:40 arrives after 00:50, and "untimed" has no timestamp: both count as 00:50
+    stream.add_lines([line(40, "late"), "untimed", line(70, "c")], 0)
+    closed = stream.add_lines([line(110, "d")], 0)
+    assert window_texts(closed) == [(1, ["b", "late", "untimed", "c"])]
+    assert stream.window_bounds(0) == (0, 60)
+
+
+def test_close_all_flushes_the_open_windows():
+    stream = make_stream()
+    stream.add_lines([line(10, "a"), line(50, "b"), line(100, "c")], 0)
+    assert window_texts(stream.close_all()) == [(1, ["b", "c"]), (2, ["c"])]
+    assert stream.close_all() == []
+
+
+def test_only_windows_with_lines_are_counted():
+    stream = make_stream()
+    stream.add_lines([line(10, "a")], 0)
+    # Jumping ten minutes ahead passes a dozen empty windows
+    closed = stream.add_lines([line(600, "b")], 0)
+    assert window_texts(closed) == [(0, ["a"])]
+    assert stream.next_window > 10
+    assert stream.windows_closed == 1
+
+    stream.close_all()
+    assert stream.windows_closed == 2
+
+
+def test_moments_found_in_two_windows_are_emitted_once():
+    stream = make_stream()
+    first = [{"start_time": 40.0, "end_time": 70.0}]
+    assert stream.novel(first) == first
+    stream.mark_emitted(first)
+
+    # The next window finds the same moment with slightly different bounds
+    second = [{"start_time": 42.0, "end_time": 75.0}, {"start_time": 90.0, "end_time": 110.0}]
+    assert stream.novel(second) == second[1:]
+    # Overlaps within one window's results count too
+    assert stream.novel([second[1], {"start_time": 92.0, "end_time": 115.0}]) == second[1:]
+
+
+def test_unsaved_moments_do_not_suppress_later_windows():
+    stream = make_stream()
+    moments = [{"start_time": 40.0, "end_time": 70.0}]
+    assert stream.novel(moments) == moments
+    # Not marked emitted (the save failed), so the next window may emit it
+    assert stream.novel(moments) == moments
+
+
+@pytest.fixture
+def subscribed_stream():
+    app = FastAPI()
+    app.include_router(live_api.router, prefix="/live")
+    stream = make_stream()
+    live_ingestor._streams[stream.transcript_id] = stream
+    with TestClient(app) as client:
+        yield client, stream
+    live_ingestor._streams.pop(stream.transcript_id, None)
+
+
+def wait_for(condition, timeout: float = 2.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_subscriber_receives_moments_until_the_stream_ends(subscribed_stream):
+    client, stream = subscribed_stream
+    moment = LiveMoment(
+        id=uuid.uuid4(),
+        video_id=stream.video_id,
+        start_time=10,
+        end_time=40,
+        summary="A moment",
+        virality_overall=0.8,
+        latency_seconds=1.5,
+    )
+    with client.websocket_connect(f"/live/{stream.transcript_id}/moments") as websocket:
+        assert wait_for(lambda: len(stream.subscribers) == 1)
+        client.portal.call(stream.publish, moment)
+        assert LiveMoment.model_validate_json(websocket.receive_text()) == moment
+        client.portal.call(stream.publish, None)
+        assert websocket.receive()["type"] == "websocket.close"
+    assert wait_for(lambda: not stream.subscribers)
+
+
+def test_disconnected_subscriber_is_dropped_on_a_quiet_stream(subscribed_stream):
+    client, stream = subscribed_stream
+    with client.websocket_connect(f"/live/{stream.transcript_id}/moments"):
+        assert wait_for(lambda: len(stream.subscribers) == 1)
+    # Nothing is published, yet the subscription goes away with the client
+    assert wait_for(lambda: not stream.subscribers)
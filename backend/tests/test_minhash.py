@@ -0,0 +1,84 @@
+"""MinHash/LSH fingerprints of transcript windows"""
+from app.services.minhash import (
+    LSH_BANDS,
+    band_hashes,
+    estimate_offset,
+    fingerprint_windows,
+    signature,
+    similarity,
+    transcript_windows,
+)
+from app.services.transcript_index import SegmentIndex
+
+WORDS = (
+    "the quick brown fox jumps over the lazy dog while the band plays "
+    "a song about rivers mountains and the long road home tonight"
+).split()
+
+
+def timed(lines: list[str], start: int = 0, step: int = 5) -> str:
+    return "".join(
+        f"[{(start + i * step) // 60}:{(start + i * step) % 60:02d}] {line}\n"
+        for i, line in enumerate(lines)
+    )
+
+
+def phrases(words: list[str], size: int = 4) -> list[str]:
+    return [" ".join(words[i : i + size]) for i in range(0, len(words), size)]
+
+
+def test_windows_start_on_a_grid_and_skip_empty_ones():
+    text = timed(["a", "b", "c"], step=10) + "[2:00] d\n"
+    windows = transcript_windows(SegmentIndex.build(text), size=30, overlap=10)
+
+    assert [(start, end) for start, end, _, _ in windows] == [
+        (0, 30),
+        (20, 50),
+        (100, 130),
+        (120, 150),
+    ]
+    start, end, start_offset, end_offset = windows[0]
+    assert text[start_offset:end_offset] == "[0:00] a\n[0:10] b\n[0:20] c\n"
+
+
+def test_untimed_transcript_has_no_windows():
+    assert transcript_windows(SegmentIndex.build("no\ntimes\n"), 30, 10) == []
+
+
+def test_identical_text_matches_regardless_of_timestamps():
+    first = signature(timed(phrases(WORDS)))
+    shifted = signature(timed(phrases(WORDS), start=90))
+
+    assert similarity(first.astype("<u8").tobytes(), shifted.astype("<u8").tobytes()) == 1.0
+    assert band_hashes(first) == band_hashes(shifted)
+    assert len(band_hashes(first)) == LSH_BANDS
+
+
+def test_unrelated_text_shares_no_bands():
+    first = signature(timed(phrases(WORDS)))
+    other = signature(timed(phrases([f"word{i}" for i in range(len(WORDS))])))
+
+    assert similarity(first.astype("<u8").tobytes(), other.astype("<u8").tobytes()) < 0.2
+    assert not set(band_hashes(first)) & set(band_hashes(other))
+
+
+def test_signature_of_empty_text_is_none():
+    assert signature("[0:01]\n[0:02] \n") is None
+
+
+def test_fingerprints_cover_windows_with_words():
+    text = timed(phrases(WORDS), step=20)
+    fingerprints = fingerprint_windows(text, None, size=60, overlap=15)
+
+    windows = transcript_windows(SegmentIndex.build(text), 60, 15)
+    assert [fingerprint[0] for fingerprint in fingerprints] == list(range(len(windows)))
+    assert all(len(fingerprint[4]) == LSH_BANDS for fingerprint in fingerprints)
+
+
+def test_estimate_offset_uses_unique_lines():
+    lines = ["welcome back", "yeah", "so today", "yeah", "we build a boat"]
+    source = timed(lines)
+    reupload = timed(lines, start=42)
+
+    assert estimate_offset(reupload, source) == 42
+    assert estimate_offset(timed(["yeah", "yeah"]), timed(["yeah", "yeah"])) is None
@@ -0,0 +1,75 @@
+"""Pre-filter scoring of transcript windows"""
+from uuid import uuid4
+
+import pytest
+
+from app.services.prefilter import FEATURES, chunk_features, score_chunks, taxonomy_keywords
+from app.services.taxonomy import Taxonomy, TaxonomyTag
+
+ORDINARY = (
+    "[0:00] so we went down to the shop and picked up some things\n"
+    "[0:04] then we drove back home and started on the kitchen\n"
+    "[0:08] it took most of the afternoon to get it finished\n"
+)
+EXCITED = (
+    "[0:00] Alex: NO WAY did that just happen!\n"
+    "[0:02] Sam: lol [laughter] let's go!\n"
+    "[0:04] Alex: that was INSANE!\n"
+)
+SPONSOR = (
+    "[0:00] this video is sponsored by our friends, use code clip for a discount\n"
+    "[0:04] and check the link in the description for the promo code\n"
+)
+DEAD_AIR = "[0:00] [music]\n[0:30] [silence]\n[1:00] ok\n"
+
+
+def feature(texts: list[str], name: str, keywords: list[str] = ()) -> list[float]:
+    return chunk_features(texts, list(keywords))[:, FEATURES.index(name)].tolist()
+
+
+def test_ordinary_speech_scores_near_the_midpoint():
+    (score,) = score_chunks([ORDINARY], [])
+    assert 0.3 < score < 0.7
+
+
+def test_reactions_score_above_ordinary_speech():
+    excited, ordinary = score_chunks([EXCITED, ORDINARY], [])
+    assert excited > 0.9
+    assert excited > ordinary
+
+
+@pytest.mark.parametrize("text", [SPONSOR, DEAD_AIR])
+def test_sponsor_reads_and_dead_air_score_low(text):
+    score, ordinary = score_chunks([text, ORDINARY], [])
+    assert score < 0.1
+    assert score < ordinary
+
+
+def test_features():
+    assert feature([EXCITED], "speaker_changes_per_line") == [2 / 3]
+    assert feature([EXCITED], "exclamations_per_line") == [1.0]
+    assert feature([DEAD_AIR], "dead_air_per_line") == [2 / 3]
+    # Three words (markers included) over three lines 30s apart, i.e. 90s
+    assert feature([DEAD_AIR], "speech_rate") == [pytest.approx(3 / 90 / 2.5)]
+    # Untimed text is assumed to be spoken at the normal rate
+    assert feature(["just some words"], "speech_rate") == [1.0]
+
+
+def test_keyword_hits_count_words_and_phrases():
+    text = "[0:00] the boss fight was a speed run\n"
+    (hits,) = feature([text], "keyword_hits_per_100_words", ["boss", "speed run"])
+    assert hits == pytest.approx(2 * 100 / 7)
+
+
+def test_taxonomy_keywords_skip_short_names():
+    taxonomy = Taxonomy(
+        [
+            TaxonomyTag(uuid4(), "boss-fight", "Boss Fight", None, None, 0),
+            TaxonomyTag(uuid4(), "lol", "LOL", None, None, 0),
+        ]
+    )
+    assert taxonomy_keywords(taxonomy) == ["boss fight"]
+
+
+def test_no_chunks():
+    assert score_chunks([], ["boss"]) == []
@@ -0,0 +1,171 @@
+"""Fair, deadline-aware chunk scheduling"""
+import asyncio
+import time
+
+import pytest
+
+from app.services import scheduler as scheduler_module
+from app.services.scheduler import ChunkScheduler
+
+WEIGHTS = {"live": 8.0, "interactive": 4.0, "backfill": 1.0, "deferred": 0.25}
+
+
+async def settle() -> None:
+    """Let started tasks run up to their first real wait"""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.fixture
+def chunk_seconds(monkeypatch) -> float:
+    """Keep the chunk duration estimate at 10s instead of learning it from the test"""
+    monkeypatch.setattr(scheduler_module, "CHUNK_SECONDS_SMOOTHING", 0.0)
+    return 10.0
+
+
+class Recorder:
+    """Runs chunks that log which job got each slot, in grant order"""
+
+    def __init__(self, scheduler: ChunkScheduler):
+        self.scheduler = scheduler
+        self.order: list[str] = []
+        self.release = asyncio.Event()
+
+    async def hold_all_slots(self) -> list[asyncio.Task]:
+        """Occupy every slot until ``release`` is set, so later chunks queue"""
+
+        async def blocker():
+            with self.scheduler.job(object()) as job:
+                async with self.scheduler.slot(job):
+                    await self.release.wait()
+
+        blockers = [asyncio.create_task(blocker()) for _ in range(self.scheduler.slots)]
+        await settle()
+        return blockers
+
+    def chunks(self, name, video, priority, count, deadline=None) -> asyncio.Task:
+        """One caller (like one analyze_chunks call) queueing ``count`` chunks"""
+
+        async def chunk(job):
+            async with self.scheduler.slot(job, deadline):
+                self.order.append(name)
+                await asyncio.sleep(0)
+
+        async def call():
+            with self.scheduler.job(video, priority) as job:
+                await asyncio.gather(*(chunk(job) for _ in range(count)))
+
+        return asyncio.create_task(call())
+
+    async def run(self, blockers: list[asyncio.Task], calls: list[asyncio.Task]) -> None:
+        await settle()  # let every call queue its chunks
+        self.release.set()
+        await asyncio.gather(*blockers, *calls)
+
+
+async def test_backlogged_jobs_share_slots_by_weight():
+    recorder = Recorder(ChunkScheduler(1, WEIGHTS))
+    blockers = await recorder.hold_all_slots()
+    calls = [
+        recorder.chunks("interactive", "a", "interactive", 20),
+        recorder.chunks("backfill", "b", "backfill", 20),
+    ]
+    await recorder.run(blockers, calls)
+
+    assert recorder.order[:20].count("interactive") == 16
+    assert recorder.order[:20].count("backfill") == 4
+
+
+async def test_calls_for_one_video_share_its_fair_share():
+    scheduler = ChunkScheduler(1, WEIGHTS)
+    recorder = Recorder(scheduler)
+    blockers = await recorder.hold_all_slots()
+    # Five small calls for "many" (e.g. live windows) against one call for "one"
+    calls = [recorder.chunks("many", "many", "interactive", 2) for _ in range(5)]
+    calls.append(recorder.chunks("one", "one", "interactive", 10))
+    await recorder.run(blockers, calls)
+
+    assert recorder.order[:10].count("many") == 5
+    assert scheduler._jobs == {}
+
+
+def test_job_is_shared_per_video_and_priority():
+    scheduler = ChunkScheduler(2, WEIGHTS)
+    with scheduler.job("video") as first, scheduler.job("video") as second:
+        assert first is second
+        with scheduler.job("video", "deferred") as deferred:
+            assert deferred is not first
+            assert deferred.weight == 0.25
+    assert scheduler._jobs == {}
+
+
+@pytest.mark.parametrize(("seconds_left", "first"), [(5, "urgent"), (1000, "backfill")])
+async def test_deadline_at_risk_preempts_fair_order(seconds_left, first, chunk_seconds):
+    scheduler = ChunkScheduler(1, WEIGHTS)
+    scheduler.chunk_seconds = chunk_seconds
+    recorder = Recorder(scheduler)
+    blockers = await recorder.hold_all_slots()
+    # Queued first and weighted 4x higher, so fair queuing alone serves it first
+    calls = [
+        recorder.chunks("backfill", "b", "backfill", 3),
+        recorder.chunks("urgent", "u", "deferred", 1, deadline=time.time() + seconds_left),
+    ]
+    await recorder.run(blockers, calls)
+
+    assert recorder.order[0] == first
+
+
+@pytest.mark.parametrize(("count", "first"), [(3, "urgent"), (1, "backfill")])
+async def test_chunks_queued_ahead_count_toward_the_risk(count, first, chunk_seconds):
+    scheduler = ChunkScheduler(1, WEIGHTS)
+    scheduler.chunk_seconds = chunk_seconds
+    recorder = Recorder(scheduler)
+    blockers = await recorder.hold_all_slots()
+    calls = [
+        recorder.chunks("backfill", "b", "backfill", 3),
+        # One chunk makes it in time; the third of three in line would not
+        recorder.chunks("urgent", "u", "deferred", count, deadline=time.time() + 25),
+    ]
+    await recorder.run(blockers, calls)
+
+    assert recorder.order[0] == first
+
+
+async def test_slot_is_released_when_the_chunk_raises():
+    scheduler = ChunkScheduler(1, WEIGHTS)
+    granted = asyncio.Event()
+
+    async def failing(job):
+        async with scheduler.slot(job):
+            await asyncio.sleep(0)
+            raise RuntimeError("agent call failed")
+
+    async def waiting(job):
+        async with scheduler.slot(job):
+            granted.set()
+
+    with scheduler.job("a") as first, scheduler.job("b") as second:
+        results = await asyncio.gather(failing(first), waiting(second), return_exceptions=True)
+
+    assert isinstance(results[0], RuntimeError)
+    assert granted.is_set()
+    assert scheduler.free == 1
+
+
+async def test_cancelled_waiter_leaves_the_queue():
+    scheduler = ChunkScheduler(1, WEIGHTS)
+    recorder = Recorder(scheduler)
+    blockers = await recorder.hold_all_slots()
+    call = recorder.chunks("live", "v", "live", 1, deadline=time.time())
+    await settle()
+    (job,) = scheduler._backlogged
+    assert job.deadlines == 1
+
+    call.cancel()
+    await asyncio.gather(call, return_exceptions=True)
+    assert not job.waiters and job.deadlines == 0
+    assert scheduler._backlogged == [] and ("v", "live") not in scheduler._jobs
+
+    recorder.release.set()
+    await asyncio.gather(*blockers)
+    assert scheduler.free == 1 and recorder.order == []
@@ -0,0 +1,150 @@
+"""In-memory tag autocomplete ranking"""
+import asyncio
+import contextlib
+from uuid import uuid4
+
+import pytest
+
+from app.services import tag_autocomplete
+from app.services.tag_autocomplete import (
+    TagAutocompleteIndex,
+    get_tag_autocomplete,
+    normalize,
+    trigrams,
+)
+from app.services.taxonomy import Taxonomy, TaxonomyTag
+
+
+def make_tag(
+    slug: str,
+    name: str | None = None,
+    parent: TaxonomyTag | None = None,
+    dimension: str | None = None,
+    usage_count: int = 0,
+) -> TaxonomyTag:
+    return TaxonomyTag(
+        id=uuid4(),
+        slug=slug,
+        name=name or slug.replace("-", " ").title(),
+        dimension=dimension,
+        parent_id=parent.id if parent else None,
+        usage_count=usage_count,
+    )
+
+
+def slugs(tags: list[TaxonomyTag]) -> list[str]:
+    return [tag.slug for tag in tags]
+
+
+@pytest.fixture
+def index() -> TagAutocompleteIndex:
+    funny = make_tag("funny", dimension="emotion", usage_count=5)
+    return TagAutocompleteIndex(
+        Taxonomy(
+            [
+                funny,
+                make_tag("fun-fact", dimension="format", usage_count=50),
+                make_tag("funny-fail", parent=funny, usage_count=100),
+                make_tag("so-funny", usage_count=1),
+                make_tag("fundraiser", usage_count=10),
+                make_tag("speedrun", dimension="format", usage_count=20),
+                make_tag("emotional", usage_count=0),
+            ]
+        )
+    )
+
+
+def test_normalize_and_trigrams():
+    assert normalize("  Funny_Fail/Clip-Of the-DAY ") == "funny fail clip of the day"
+    assert trigrams("ab") == {"  a", " ab", "ab "}
+
+
+@pytest.mark.parametrize("query", ["funny", "fun"])
+def test_exact_before_prefix_before_word_prefix(index, query):
+    # Parents rank by subtree usage: funny (5 + 100) above fun-fact (50)
+    expected = {
+        "funny": ["funny", "funny-fail", "so-funny"],
+        "fun": ["funny", "funny-fail", "fun-fact", "fundraiser", "so-funny"],
+    }
+    assert slugs(index.search(query)) == expected[query]
+
+
+def test_dimension_names_match_last(index):
+    assert slugs(index.search("emo")) == ["emotional", "funny", "funny-fail"]
+
+
+def test_short_prefixes_use_the_precomputed_ranking(index):
+    # speedrun only matches through its dimension, "format"
+    assert slugs(index.search("f")) == [
+        "funny",
+        "funny-fail",
+        "fun-fact",
+        "fundraiser",
+        "so-funny",
+        "speedrun",
+    ]
+    assert slugs(index.search("fu", limit=2)) == ["funny", "funny-fail"]
+
+
+def test_typos_fall_back_to_trigram_similarity(index):
+    assert slugs(index.search("speedrum")) == ["speedrun"]
+    assert index.search("zzzz") == []
+
+
+def test_dimension_filter_includes_inherited_dimensions(index):
+    assert slugs(index.search("fun", dimension="emotion")) == ["funny", "funny-fail"]
+    assert slugs(index.search("", dimension="format")) == ["fun-fact", "speedrun"]
+
+
+def test_empty_query_lists_by_usage(index):
+    assert slugs(index.search("", limit=3)) == ["funny", "funny-fail", "fun-fact"]
+
+
+@pytest.fixture
+def taxonomy_source(monkeypatch):
+    """Stand-in taxonomy cache whose loads wait for ``release``"""
+    source = type("Source", (), {})()
+    source.current = Taxonomy([make_tag("old")])
+    source.loads = []
+    source.release = asyncio.Event()
+
+    async def get_taxonomy(session, refresh=False):
+        source.loads.append(refresh)
+        await source.release.wait()
+        source.current = Taxonomy([make_tag("new")])
+        return source.current
+
+    monkeypatch.setattr(tag_autocomplete, "get_taxonomy", get_taxonomy)
+    monkeypatch.setattr(tag_autocomplete, "cached_taxonomy", lambda: source.current)
+    monkeypatch.setattr(tag_autocomplete, "AsyncSessionLocal", contextlib.nullcontext)
+    monkeypatch.setattr(tag_autocomplete, "_index", None)
+    monkeypatch.setattr(tag_autocomplete, "_refreshing", None)
+    return source
+
+
+async def test_concurrent_first_calls_build_once(taxonomy_source):
+    taxonomy_source.release.set()
+    first, second = await asyncio.gather(get_tag_autocomplete(None), get_tag_autocomplete(None))
+    assert first is second
+    assert taxonomy_source.loads == [False]
+
+
+@pytest.mark.parametrize("reason", ["aged", "tags changed"])
+async def test_stale_index_is_served_while_one_refresh_runs(taxonomy_source, monkeypatch, reason):
+    old = TagAutocompleteIndex(taxonomy_source.current)
+    if reason == "aged":
+        old.built_at -= tag_autocomplete.settings.tag_autocomplete_refresh_interval + 1
+    else:
+        taxonomy_source.current = None
+    monkeypatch.setattr(tag_autocomplete, "_index", old)
+
+    served = await asyncio.gather(*(get_tag_autocomplete(None) for _ in range(5)))
+    await asyncio.sleep(0)
+    assert all(index is old for index in served)
+    assert taxonomy_source.loads == [reason == "aged"]
+
+    taxonomy_source.release.set()
+    await tag_autocomplete._refreshing
+    fresh = await get_tag_autocomplete(None)
+    assert slugs(fresh.search("")) == ["new"]
+    assert tag_autocomplete._refreshing.done()
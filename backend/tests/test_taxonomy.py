@@ -0,0 +1,111 @@
+"""In-memory tag hierarchy closure"""
+from uuid import uuid4
+
+from sqlalchemy import select
+
+from app.models import Tag, TagClosure, TagDimension
+from app.services.taxonomy import Taxonomy, TaxonomyTag, load_taxonomy
+
+
+def make_tag(
+    slug: str,
+    parent: TaxonomyTag | None = None,
+    dimension: str | None = None,
+    usage_count: int = 0,
+) -> TaxonomyTag:
+    return TaxonomyTag(
+        id=uuid4(),
+        slug=slug,
+        name=slug.title(),
+        dimension=dimension,
+        parent_id=parent.id if parent else None,
+        usage_count=usage_count,
+    )
+
+
+def closure_pairs(taxonomy: Taxonomy) -> set[tuple]:
+    """(ancestor, descendant, depth) rows, as stored in tag_closure"""
+    pairs = {(tag.id, tag.id, 0) for tag in taxonomy.tags}
+    for tag_id, chain in taxonomy.ancestors.items():
+        pairs.update((ancestor, tag_id, depth) for depth, ancestor in enumerate(chain, start=1))
+    return pairs
+
+
+def test_closure_follows_parents():
+    humor = make_tag("humor", dimension="emotion")
+    satire = make_tag("satire", parent=humor)
+    parody = make_tag("parody", parent=satire)
+    other = make_tag("other")
+    taxonomy = Taxonomy([parody, other, satire, humor])
+
+    assert taxonomy.ancestors[parody.id] == (satire.id, humor.id)
+    assert taxonomy.ancestors[humor.id] == ()
+    assert taxonomy.descendants[humor.id] == {humor.id, satire.id, parody.id}
+    assert taxonomy.descendants[other.id] == {other.id}
+
+
+def test_cycle_does_not_loop():
+    first_id = uuid4()
+    second = make_tag("second", parent=TaxonomyTag(first_id, "", "", None, None, 0))
+    first = TaxonomyTag(first_id, "first", "First", None, second.id, 0)
+    taxonomy = Taxonomy([first, second])
+
+    assert taxonomy.ancestors[first.id] == (second.id,)
+    assert taxonomy.ancestors[second.id] == (first.id,)
+
+
+def test_resolve_keeps_the_most_specific_tags():
+    humor = make_tag("humor")
+    satire = make_tag("satire", parent=humor)
+    excited = make_tag("excited")
+    taxonomy = Taxonomy([humor, satire, excited])
+
+    resolved = taxonomy.resolve(["humor", "satire", "unknown", "excited", "satire"])
+    assert resolved == [satire, excited]
+    assert taxonomy.resolve(["humor"]) == [humor]
+
+
+def test_dimension_and_usage_come_from_the_hierarchy():
+    humor = make_tag("humor", dimension="emotion", usage_count=5)
+    satire = make_tag("satire", parent=humor, usage_count=3)
+    parody = make_tag("parody", parent=satire, dimension="format", usage_count=2)
+    taxonomy = Taxonomy([humor, satire, parody])
+
+    assert taxonomy.dimensions[satire.id] == "emotion"
+    assert taxonomy.dimensions[parody.id] == "format"
+    assert taxonomy.subtree_usage[humor.id] == 10
+    assert taxonomy.subtree_usage[satire.id] == 5
+    assert taxonomy.subtree_usage[parody.id] == 2
+
+
+async def test_closure_matches_tag_closure_table_after_parent_change(db_session):
+    suffix = uuid4().hex[:8]
+    dimension = TagDimension(name=f"test-{suffix}")
+    db_session.add(dimension)
+    await db_session.flush()
+
+    # The closure trigger reads the parent's rows, so parents go in first
+    tags = {}
+    for slug, parent in [("root", None), ("middle", "root"), ("leaf", "middle"), ("other", None)]:
+        tag = Tag(
+            dimension_id=dimension.id,
+            parent_id=tags[parent].id if parent else None,
+            name=f"{slug} {suffix}",
+            slug=f"{slug}-{suffix}",
+        )
+        db_session.add(tag)
+        await db_session.flush()
+        tags[slug] = tag
+
+    # Move a subtree: middle and leaf go under other
+    tags["middle"].parent_id = tags["other"].id
+    await db_session.flush()
+
+    taxonomy = await load_taxonomy(db_session)
+    rows = await db_session.execute(
+        select(TagClosure.ancestor_id, TagClosure.descendant_id, TagClosure.depth)
+    )
+    table = {tuple(row) for row in rows}
+    assert closure_pairs(taxonomy) == table
+    assert taxonomy.ancestors[tags["leaf"].id] == (tags["middle"].id, tags["other"].id)
+    assert tags["leaf"].id not in taxonomy.descendants[tags["root"].id]
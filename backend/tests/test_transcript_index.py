@@ -0,0 +1,70 @@
+"""Timestamp → offset index over transcript text"""
+import pytest
+
+from app.services.transcript_index import SegmentIndex, build_segment_index, parse_timestamp
+
+TRANSCRIPT = "intro\n[0:05] hello\n[0:10] world\n[0:08] late\n[1:00:00] end\n"
+
+
+@pytest.mark.parametrize(
+    ("line", "seconds"),
+    [
+        ("0:07 hi", 7.0),
+        ("12:34 hi", 754.0),
+        ("1:23:45 hi", 5025.0),
+        ("[01:02] hi", 62.0),
+        ("(0:03.250) hi", 3.0),
+        ("  [0:09] indented", 9.0),
+        ("no timestamp", None),
+        ("at 0:07 mid-line", None),
+    ],
+)
+def test_parse_timestamp(line, seconds):
+    assert parse_timestamp(line) == seconds
+
+
+def test_build_keeps_out_of_order_lines_in_the_previous_segment():
+    index = SegmentIndex.build(TRANSCRIPT)
+
+    assert list(index.times) == [5.0, 10.0, 3600.0]
+    assert [TRANSCRIPT[offset:].split("\n")[0] for offset in index.offsets] == [
+        "[0:05] hello",
+        "[0:10] world",
+        "[1:00:00] end",
+    ]
+    assert index.duration == 3600.0
+    assert len(index) == 3
+
+
+def test_excerpt_covers_the_segments_overlapping_the_range():
+    index = SegmentIndex.build(TRANSCRIPT)
+
+    assert index.excerpt(TRANSCRIPT, 6, 9) == "[0:05] hello\n"
+    assert index.excerpt(TRANSCRIPT, 10, 60) == "[0:10] world\n[0:08] late\n"
+    assert index.excerpt(TRANSCRIPT, 0, 5) == "[0:05] hello\n"
+    assert index.excerpt(TRANSCRIPT, 3600, 4000) == "[1:00:00] end\n"
+
+
+def test_untimed_transcript_spans_everything():
+    index = SegmentIndex.build("just\nwords\n")
+
+    assert len(index) == 0
+    assert index.duration == 0.0
+    assert index.span(10, 20) == (0, len("just\nwords\n"))
+
+
+def test_bytes_round_trip():
+    data = build_segment_index(TRANSCRIPT)
+    index = SegmentIndex.from_bytes(data)
+
+    original = SegmentIndex.build(TRANSCRIPT)
+    assert list(index.times) == list(original.times)
+    assert list(index.offsets) == list(original.offsets)
+    assert index.text_length == len(TRANSCRIPT)
+
+
+def test_unknown_version_is_rejected():
+    data = bytearray(build_segment_index(TRANSCRIPT))
+    data[0] = 99
+    with pytest.raises(ValueError, match="version"):
+        SegmentIndex.from_bytes(bytes(data))
@@ -0,0 +1,118 @@
+"""VaultClient cache behaviour against a fake Vault (httpx.MockTransport)"""
+import asyncio
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.services.vault_client import VaultClient
+
+PATH = "secret/postgres/viral_clip_finder"
+
+
+class FakeVault:
+    """KV v2 endpoint whose secret changes on every read; can be slow or down"""
+
+    def __init__(self):
+        self.requests = 0
+        self.version = 0
+        self.lease_duration = 0
+        self.delay = 0.0
+        self.down = False
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.down:
+            raise httpx.ConnectError("Vault is down", request=request)
+        self.version += 1
+        return httpx.Response(
+            200,
+            json={
+                "lease_duration": self.lease_duration,
+                "data": {"data": {"password": f"v{self.version}"}},
+            },
+        )
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def fake_vault() -> FakeVault:
+    return FakeVault()
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    """Cache deadlines follow this clock; the event loop keeps real time"""
+    return FakeClock()
+
+
+@pytest.fixture
+async def vault(monkeypatch, fake_vault, clock):
+    monkeypatch.setattr(settings, "vault_enabled", True)
+    monkeypatch.setattr(settings, "vault_token", "test-token")
+    monkeypatch.setattr(settings, "vault_cache_ttl", 300.0)
+    monkeypatch.setattr(settings, "vault_max_stale", 60.0)
+    client = VaultClient(transport=httpx.MockTransport(fake_vault), clock=clock)
+    yield client
+    await client.close()
+
+
+async def test_cached_until_ttl_expires(vault, fake_vault, clock):
+    assert await vault.get_secret(PATH) == {"password": "v1"}
+    clock.now += 299
+    assert await vault.get_secret(PATH) == {"password": "v1"}
+    assert fake_vault.requests == 1
+
+    clock.now += 2
+    assert await vault.get_secret(PATH) == {"password": "v2"}
+    assert fake_vault.requests == 2
+
+
+async def test_lease_duration_overrides_default_ttl(vault, fake_vault, clock):
+    fake_vault.lease_duration = 30
+    await vault.get_secret(PATH)
+    clock.now += 31
+    await vault.get_secret(PATH)
+    assert fake_vault.requests == 2
+
+
+async def test_concurrent_misses_share_one_fetch(vault, fake_vault):
+    fake_vault.delay = 0.05
+    results = await asyncio.gather(*(vault.get_secret(PATH) for _ in range(10)))
+    assert results == [{"password": "v1"}] * 10
+    assert fake_vault.requests == 1
+
+
+async def test_refreshed_in_background_before_expiry(vault, fake_vault, clock):
+    fake_vault.lease_duration = 100
+    assert await vault.get_secret(PATH) == {"password": "v1"}
+
+    # Refresh is due after 75% (minus up to 10% jitter) of the lease
+    clock.now += 60
+    await vault._refresh_due()
+    assert fake_vault.requests == 1
+    clock.now += 16
+    await vault._refresh_due()
+    assert fake_vault.requests == 2
+    assert await vault.get_secret(PATH) == {"password": "v2"}
+    assert fake_vault.requests == 2
+
+
+async def test_stale_value_served_while_vault_is_down(vault, fake_vault, clock):
+    await vault.get_secret(PATH)
+    fake_vault.down = True
+
+    clock.now += 300 + 59
+    assert await vault.get_secret(PATH) == {"password": "v1"}
+
+    clock.now += 2
+    assert await vault.get_secret(PATH) is None
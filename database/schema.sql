@@ -42,19 +42,58 @@ CREATE TABLE transcripts (
     word_count INTEGER,
     language VARCHAR(10) DEFAULT 'en',
     
+    -- Sorted timestamp -> character offset index, built at ingest
+    -- (float64 times + int64 offsets, see app/services/transcript_index.py)
+    segment_index BYTEA,
+    
     -- Processing status
-    status VARCHAR(20) DEFAULT 'pending', -- pending, processing, completed, failed
+    status VARCHAR(20) DEFAULT 'pending', -- pending, live, processing, completed, failed, skipped
+    priority VARCHAR(20) DEFAULT 'interactive', -- live, interactive, backfill (analysis scheduling class)
     processed_at TIMESTAMP WITH TIME ZONE,
     error_message TEXT,
+    -- Analysis lease: set on claim, renewed while a worker analyzes
+    claimed_at TIMESTAMP WITH TIME ZONE,
     
     -- Source info
     source VARCHAR(50), -- manual, youtube_api, whisper, etc.
     
+    -- Near-duplicate reuse (agent calls saved = windows_reused)
+    windows_analyzed INTEGER,
+    windows_reused INTEGER,
+    near_duplicate_of UUID REFERENCES transcripts(id) ON DELETE SET NULL,
+    -- Low-signal windows not sent to the agent (prefilter_mode = skip)
+    windows_skipped INTEGER,
+    
     created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     
     UNIQUE(video_id)
 );
 
+-- Lines of live transcripts, one row per append, until the stream finishes
+-- and they are assembled into raw_text (appending to raw_text itself would
+-- rewrite the whole TOAST value on every append)
+CREATE TABLE live_transcript_chunks (
+    transcript_id UUID NOT NULL REFERENCES transcripts(id) ON DELETE CASCADE,
+    seq BIGINT GENERATED ALWAYS AS IDENTITY,
+    text TEXT NOT NULL, -- newline-terminated lines
+    
+    PRIMARY KEY (transcript_id, seq)
+);
+
+-- MinHash fingerprints of transcript analysis windows, for near-duplicate
+-- detection (see app/services/minhash.py)
+CREATE TABLE transcript_windows (
+    transcript_id UUID NOT NULL REFERENCES transcripts(id) ON DELETE CASCADE,
+    window_index INTEGER NOT NULL,
+    start_time FLOAT NOT NULL, -- seconds
+    end_time FLOAT NOT NULL,
+    
+    minhash BYTEA NOT NULL, -- little-endian uint64 signature
+    lsh_bands BIGINT[] NOT NULL, -- one hash per LSH band
+    
+    PRIMARY KEY (transcript_id, window_index)
+);
+
 -- Tag dimensions (categories of tags)
 CREATE TABLE tag_dimensions (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -87,6 +126,16 @@ CREATE TABLE tags (
     UNIQUE(dimension_id, name)
 );
 
+-- Transitive closure of tags.parent_id (every ancestor/descendant pair,
+-- including each tag with itself at depth 0), maintained by triggers below
+CREATE TABLE tag_closure (
+    ancestor_id UUID NOT NULL REFERENCES tags(id) ON DELETE CASCADE,
+    descendant_id UUID NOT NULL REFERENCES tags(id) ON DELETE CASCADE,
+    depth INTEGER NOT NULL,
+    
+    PRIMARY KEY (ancestor_id, descendant_id)
+);
+
 -- Moments table (the core entity)
 CREATE TABLE moments (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -151,6 +200,50 @@ CREATE TABLE moment_tags (
     UNIQUE(moment_id, tag_id)
 );
 
+-- Top moments per score column, overall and per creator / tag, maintained by
+-- the triggers below (the 'all' boards shortly after the write, see
+-- moment_leaderboard_queue) so the landing page never sorts the moments table. A
+-- board holds up to moment_leaderboard_capacity() entries; the API serves the
+-- first moment_leaderboard_size(). There is no foreign key to moments: the
+-- triggers remove a moment's entries themselves, then top up boards it leaves
+-- short.
+CREATE TABLE moment_leaderboards (
+    metric VARCHAR(30) NOT NULL, -- moments column: virality_overall, platform_tiktok, ...
+    scope VARCHAR(10) NOT NULL, -- all, creator, tag
+    scope_key TEXT NOT NULL DEFAULT '', -- '' (all), videos.creator or tags.id
+    moment_id UUID NOT NULL,
+    score FLOAT NOT NULL,
+    
+    -- Copied from the moment, so boards are served from this table alone
+    video_id UUID NOT NULL,
+    start_time FLOAT NOT NULL,
+    end_time FLOAT NOT NULL,
+    summary TEXT NOT NULL,
+    
+    PRIMARY KEY (metric, scope, scope_key, moment_id)
+);
+
+-- Highest score trimmed from a board: it holds every moment scoring above
+-- this, and only those may be added. No row = the board is complete.
+CREATE TABLE moment_leaderboard_cutoffs (
+    metric VARCHAR(30) NOT NULL,
+    scope VARCHAR(10) NOT NULL,
+    scope_key TEXT NOT NULL DEFAULT '',
+    cutoff FLOAT NOT NULL,
+    
+    PRIMARY KEY (metric, scope, scope_key)
+);
+
+-- Moments whose 'all' boards are out of date. Every moment write would
+-- otherwise update the same global board rows and cutoffs in its own
+-- transaction, serializing writers; triggers append here instead and
+-- apply_moment_leaderboard_queue() applies the changes in batches.
+CREATE TABLE moment_leaderboard_queue (
+    id BIGSERIAL PRIMARY KEY,
+    moment_id UUID NOT NULL,
+    queued_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
 -- ============================================
 -- ANALYTICS & CORRELATION TABLES
 -- ============================================
@@ -197,17 +290,22 @@ CREATE INDEX idx_videos_created ON videos(created_at DESC);
 -- Transcripts
 CREATE INDEX idx_transcripts_video ON transcripts(video_id);
 CREATE INDEX idx_transcripts_status ON transcripts(status);
+CREATE INDEX idx_transcripts_pending ON transcripts(created_at) WHERE status = 'pending';
+CREATE INDEX idx_transcripts_processing ON transcripts(claimed_at) WHERE status = 'processing';
+CREATE INDEX idx_transcript_windows_bands ON transcript_windows USING GIN(lsh_bands);
 
 -- Tags
 CREATE INDEX idx_tags_dimension ON tags(dimension_id);
 CREATE INDEX idx_tags_slug ON tags(slug);
 CREATE INDEX idx_tags_usage ON tags(usage_count DESC);
+CREATE INDEX idx_tag_closure_descendant ON tag_closure(descendant_id);
 
 -- Moments
 CREATE INDEX idx_moments_video ON moments(video_id);
 CREATE INDEX idx_moments_video_time ON moments(video_id, start_time);
 CREATE INDEX idx_moments_virality ON moments(virality_overall DESC);
 CREATE INDEX idx_moments_analyzed ON moments(analyzed_at);
+CREATE INDEX idx_moments_updated ON moments(updated_at);
 
 -- Full-text search on moments
 CREATE INDEX idx_moments_fts ON moments 
@@ -221,6 +319,11 @@ CREATE INDEX idx_moments_embedding ON moments
 CREATE INDEX idx_moment_tags_moment ON moment_tags(moment_id);
 CREATE INDEX idx_moment_tags_tag ON moment_tags(tag_id);
 
+-- Moment leaderboards
+CREATE INDEX idx_moment_leaderboards_rank
+    ON moment_leaderboards(metric, scope, scope_key, score DESC, moment_id);
+CREATE INDEX idx_moment_leaderboards_moment ON moment_leaderboards(moment_id);
+
 -- Tag correlations
 CREATE INDEX idx_correlations_pattern ON tag_correlations USING GIN(tag_pattern);
 CREATE INDEX idx_correlations_virality ON tag_correlations(avg_virality_score DESC);
@@ -388,6 +491,482 @@ CREATE TRIGGER trigger_update_tag_usage
 AFTER INSERT OR DELETE ON moment_tags
 FOR EACH ROW EXECUTE FUNCTION update_tag_usage();
 
+-- Keep tag_closure in sync with tags.parent_id
+CREATE OR REPLACE FUNCTION update_tag_closure()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO tag_closure (ancestor_id, descendant_id, depth)
+        SELECT ancestor_id, NEW.id, depth + 1
+        FROM tag_closure
+        WHERE descendant_id = NEW.parent_id
+        UNION ALL
+        SELECT NEW.id, NEW.id, 0;
+    ELSIF NEW.parent_id IS DISTINCT FROM OLD.parent_id THEN
+        IF EXISTS (
+            SELECT 1 FROM tag_closure
+            WHERE ancestor_id = NEW.id AND descendant_id = NEW.parent_id
+        ) THEN
+            RAISE EXCEPTION 'tag % cannot be moved under its own descendant', NEW.slug;
+        END IF;
+        
+        -- Detach the subtree from its old ancestors...
+        DELETE FROM tag_closure c
+        USING tag_closure sub, tag_closure anc
+        WHERE sub.ancestor_id = NEW.id
+          AND c.descendant_id = sub.descendant_id
+          AND anc.descendant_id = NEW.id
+          AND anc.ancestor_id <> NEW.id
+          AND c.ancestor_id = anc.ancestor_id;
+        
+        -- ...and attach it below the new parent
+        INSERT INTO tag_closure (ancestor_id, descendant_id, depth)
+        SELECT anc.ancestor_id, sub.descendant_id, anc.depth + sub.depth + 1
+        FROM tag_closure anc, tag_closure sub
+        WHERE anc.descendant_id = NEW.parent_id AND sub.ancestor_id = NEW.id;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trigger_update_tag_closure
+AFTER INSERT OR UPDATE OF parent_id ON tags
+FOR EACH ROW EXECUTE FUNCTION update_tag_closure();
+
+-- Recompute tag_closure from scratch (initial backfill, or after bulk loads
+-- with triggers disabled)
+CREATE OR REPLACE FUNCTION rebuild_tag_closure()
+RETURNS VOID AS $$
+BEGIN
+    DELETE FROM tag_closure;
+    INSERT INTO tag_closure (ancestor_id, descendant_id, depth)
+    WITH RECURSIVE closure AS (
+        SELECT id AS ancestor_id, id AS descendant_id, 0 AS depth FROM tags
+        UNION ALL
+        SELECT closure.ancestor_id, tags.id, closure.depth + 1
+        FROM closure
+        JOIN tags ON tags.parent_id = closure.descendant_id
+    )
+    SELECT ancestor_id, descendant_id, depth FROM closure;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT rebuild_tag_closure();
+
+-- Tell API processes to reload their in-memory taxonomy
+CREATE OR REPLACE FUNCTION notify_tags_changed()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('tags_changed', TG_OP);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trigger_notify_tags_changed
+AFTER INSERT OR DELETE OR UPDATE OF parent_id, slug, name, dimension_id ON tags
+FOR EACH STATEMENT EXECUTE FUNCTION notify_tags_changed();
+
+-- Leaderboard length served by the API. Boards hold twice as many entries,
+-- so deletions rarely have to refill one from the moments table.
+CREATE OR REPLACE FUNCTION moment_leaderboard_size()
+RETURNS INTEGER AS $$ SELECT 100 $$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION moment_leaderboard_capacity()
+RETURNS INTEGER AS $$ SELECT 2 * moment_leaderboard_size() $$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION moment_leaderboard_metrics()
+RETURNS TEXT[] AS $$
+    SELECT ARRAY[
+        'virality_overall',
+        'platform_tiktok',
+        'platform_youtube_shorts',
+        'platform_instagram_reels',
+        'platform_twitter'
+    ]
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION moment_leaderboard_score(m moments, p_metric TEXT)
+RETURNS FLOAT AS $$
+    SELECT CASE p_metric
+        WHEN 'virality_overall' THEN m.virality_overall
+        WHEN 'platform_tiktok' THEN m.platform_tiktok
+        WHEN 'platform_youtube_shorts' THEN m.platform_youtube_shorts
+        WHEN 'platform_instagram_reels' THEN m.platform_instagram_reels
+        WHEN 'platform_twitter' THEN m.platform_twitter
+    END
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Add a moment to one scope's boards where it scores above the cutoff,
+-- trimming boards that grow past capacity
+CREATE OR REPLACE FUNCTION offer_moment_to_leaderboards(m moments, p_scope TEXT, p_key TEXT)
+RETURNS VOID AS $$
+DECLARE
+    v_metric TEXT;
+    v_score FLOAT;
+    v_cutoff FLOAT;
+    v_trimmed FLOAT;
+    v_trimmed_id UUID;
+BEGIN
+    FOREACH v_metric IN ARRAY moment_leaderboard_metrics() LOOP
+        v_score := moment_leaderboard_score(m, v_metric);
+        CONTINUE WHEN v_score IS NULL;
+        
+        SELECT cutoff INTO v_cutoff
+        FROM moment_leaderboard_cutoffs
+        WHERE metric = v_metric AND scope = p_scope AND scope_key = p_key;
+        CONTINUE WHEN v_score <= v_cutoff;
+        
+        INSERT INTO moment_leaderboards
+            (metric, scope, scope_key, moment_id, score, video_id, start_time, end_time, summary)
+        VALUES
+            (v_metric, p_scope, p_key, m.id, v_score, m.video_id, m.start_time, m.end_time, m.summary)
+        ON CONFLICT (metric, scope, scope_key, moment_id) DO UPDATE SET
+            score = EXCLUDED.score,
+            start_time = EXCLUDED.start_time,
+            end_time = EXCLUDED.end_time,
+            summary = EXCLUDED.summary;
+        
+        -- First entry past capacity (an index probe, not a count)
+        SELECT score, moment_id INTO v_trimmed, v_trimmed_id
+        FROM moment_leaderboards
+        WHERE metric = v_metric AND scope = p_scope AND scope_key = p_key
+        ORDER BY score DESC, moment_id
+        OFFSET moment_leaderboard_capacity() LIMIT 1;
+        CONTINUE WHEN NOT FOUND;
+        
+        DELETE FROM moment_leaderboards
+        WHERE metric = v_metric AND scope = p_scope AND scope_key = p_key
+          AND (score < v_trimmed OR (score = v_trimmed AND moment_id >= v_trimmed_id));
+        INSERT INTO moment_leaderboard_cutoffs (metric, scope, scope_key, cutoff)
+        VALUES (v_metric, p_scope, p_key, v_trimmed)
+        ON CONFLICT (metric, scope, scope_key) DO UPDATE SET
+            cutoff = GREATEST(moment_leaderboard_cutoffs.cutoff, EXCLUDED.cutoff);
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Fill a board to capacity from the moments table
+CREATE OR REPLACE FUNCTION refill_moment_leaderboard(p_metric TEXT, p_scope TEXT, p_key TEXT)
+RETURNS VOID AS $$
+BEGIN
+    IF NOT p_metric = ANY(moment_leaderboard_metrics()) THEN
+        RAISE EXCEPTION 'unknown leaderboard metric %', p_metric;
+    END IF;
+    EXECUTE format(
+        'INSERT INTO moment_leaderboards
+             (metric, scope, scope_key, moment_id, score, video_id, start_time, end_time, summary)
+         SELECT $1, $2, $3, m.id, m.%1$I, m.video_id, m.start_time, m.end_time, m.summary
+         FROM moments m %2$s
+         WHERE m.%1$I IS NOT NULL
+         ORDER BY m.%1$I DESC, m.id
+         LIMIT moment_leaderboard_capacity()
+         ON CONFLICT DO NOTHING',
+        p_metric,
+        CASE p_scope
+            WHEN 'creator' THEN 'JOIN videos v ON v.id = m.video_id AND v.creator = $3'
+            WHEN 'tag' THEN 'JOIN moment_tags mt ON mt.moment_id = m.id AND mt.tag_id = $3::uuid'
+            ELSE ''
+        END
+    ) USING p_metric, p_scope, p_key;
+    
+    -- A board filled to capacity may be missing moments tied with its last entry
+    DELETE FROM moment_leaderboard_cutoffs
+    WHERE metric = p_metric AND scope = p_scope AND scope_key = p_key;
+    INSERT INTO moment_leaderboard_cutoffs (metric, scope, scope_key, cutoff)
+    SELECT p_metric, p_scope, p_key, min(score)
+    FROM moment_leaderboards
+    WHERE metric = p_metric AND scope = p_scope AND scope_key = p_key
+    HAVING count(*) >= moment_leaderboard_capacity();
+END;
+$$ LANGUAGE plpgsql;
+
+-- Refill a board left with fewer entries than are served
+CREATE OR REPLACE FUNCTION refill_short_moment_leaderboard(p_metric TEXT, p_scope TEXT, p_key TEXT)
+RETURNS VOID AS $$
+BEGIN
+    IF (
+        SELECT count(*) FROM (
+            SELECT 1 FROM moment_leaderboards
+            WHERE metric = p_metric AND scope = p_scope AND scope_key = p_key
+            LIMIT moment_leaderboard_size()
+        ) AS kept
+    ) < moment_leaderboard_size() THEN
+        PERFORM refill_moment_leaderboard(p_metric, p_scope, p_key);
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Remove a moment from one scope's boards, refilling those left short
+CREATE OR REPLACE FUNCTION remove_moment_from_leaderboards(
+    p_moment_id UUID,
+    p_scope TEXT,
+    p_key TEXT
+)
+RETURNS VOID AS $$
+DECLARE
+    v_metric TEXT;
+BEGIN
+    FOR v_metric IN
+        WITH removed AS (
+            DELETE FROM moment_leaderboards
+            WHERE moment_id = p_moment_id AND scope = p_scope AND scope_key = p_key
+            RETURNING metric
+        )
+        SELECT metric FROM removed ORDER BY metric
+    LOOP
+        PERFORM refill_short_moment_leaderboard(v_metric, p_scope, p_key);
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Lock order: every function below visits boards sorted by (scope, scope_key,
+-- metric) and moments by id, so concurrent writers touching the same boards
+-- take their row locks in the same order instead of deadlocking. The 'all'
+-- boards are left to apply_moment_leaderboard_queue().
+
+-- Remove moments from their creator and tag boards, refilling those left short
+CREATE OR REPLACE FUNCTION remove_moments_from_leaderboards(p_moment_ids UUID[])
+RETURNS VOID AS $$
+DECLARE
+    v_board RECORD;
+BEGIN
+    FOR v_board IN
+        WITH removed AS (
+            DELETE FROM moment_leaderboards
+            WHERE moment_id = ANY(p_moment_ids) AND scope <> 'all'
+            RETURNING metric, scope, scope_key
+        )
+        SELECT DISTINCT scope, scope_key, metric FROM removed
+        ORDER BY scope, scope_key, metric
+    LOOP
+        PERFORM refill_short_moment_leaderboard(v_board.metric, v_board.scope, v_board.scope_key);
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Offer moments to their creator and tag boards
+CREATE OR REPLACE FUNCTION offer_moments_to_leaderboards(p_moment_ids UUID[])
+RETURNS VOID AS $$
+DECLARE
+    v_offer RECORD;
+BEGIN
+    FOR v_offer IN
+        SELECT m AS moment, m.id, 'creator' AS scope, v.creator AS scope_key
+        FROM moments m JOIN videos v ON v.id = m.video_id
+        WHERE m.id = ANY(p_moment_ids) AND v.creator IS NOT NULL
+        UNION ALL
+        -- New moments get their tags afterwards (see update_tag_leaderboards)
+        SELECT m, m.id, 'tag', mt.tag_id::text
+        FROM moments m JOIN moment_tags mt ON mt.moment_id = m.id
+        WHERE m.id = ANY(p_moment_ids)
+        ORDER BY scope, scope_key, id
+    LOOP
+        PERFORM offer_moment_to_leaderboards(v_offer.moment, v_offer.scope, v_offer.scope_key);
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Keep moment_leaderboards in sync with moment writes, once per statement so
+-- a multi-row write visits boards in order
+CREATE OR REPLACE FUNCTION update_moment_leaderboards()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_ids UUID[];
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        v_ids := ARRAY(SELECT id FROM new_moments);
+    ELSIF TG_OP = 'DELETE' THEN
+        v_ids := ARRAY(SELECT id FROM old_moments);
+    ELSE
+        -- Triggers with transition tables can't be UPDATE OF <columns>
+        v_ids := ARRAY(
+            SELECT n.id
+            FROM old_moments o JOIN new_moments n ON n.id = o.id
+            WHERE (o.virality_overall, o.platform_tiktok, o.platform_youtube_shorts,
+                   o.platform_instagram_reels, o.platform_twitter,
+                   o.start_time, o.end_time, o.summary)
+                IS DISTINCT FROM
+                  (n.virality_overall, n.platform_tiktok, n.platform_youtube_shorts,
+                   n.platform_instagram_reels, n.platform_twitter,
+                   n.start_time, n.end_time, n.summary)
+        );
+    END IF;
+    IF cardinality(v_ids) = 0 THEN
+        RETURN NULL;
+    END IF;
+
+    INSERT INTO moment_leaderboard_queue (moment_id) SELECT unnest(v_ids);
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM remove_moments_from_leaderboards(v_ids);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM offer_moments_to_leaderboards(v_ids);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trigger_insert_moment_leaderboards
+AFTER INSERT ON moments
+REFERENCING NEW TABLE AS new_moments
+FOR EACH STATEMENT EXECUTE FUNCTION update_moment_leaderboards();
+
+CREATE TRIGGER trigger_update_moment_leaderboards
+AFTER UPDATE ON moments
+REFERENCING OLD TABLE AS old_moments NEW TABLE AS new_moments
+FOR EACH STATEMENT EXECUTE FUNCTION update_moment_leaderboards();
+
+CREATE TRIGGER trigger_delete_moment_leaderboards
+AFTER DELETE ON moments
+REFERENCING OLD TABLE AS old_moments
+FOR EACH STATEMENT EXECUTE FUNCTION update_moment_leaderboards();
+
+CREATE OR REPLACE FUNCTION update_tag_leaderboards()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_change RECORD;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        FOR v_change IN
+            SELECT m AS moment, mt.tag_id::text AS scope_key
+            FROM new_moment_tags mt JOIN moments m ON m.id = mt.moment_id
+            ORDER BY mt.tag_id::text, m.id
+        LOOP
+            PERFORM offer_moment_to_leaderboards(v_change.moment, 'tag', v_change.scope_key);
+        END LOOP;
+    ELSE
+        FOR v_change IN
+            SELECT moment_id, tag_id::text AS scope_key
+            FROM old_moment_tags
+            ORDER BY tag_id::text, moment_id
+        LOOP
+            PERFORM remove_moment_from_leaderboards(v_change.moment_id, 'tag', v_change.scope_key);
+        END LOOP;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trigger_insert_tag_leaderboards
+AFTER INSERT ON moment_tags
+REFERENCING NEW TABLE AS new_moment_tags
+FOR EACH STATEMENT EXECUTE FUNCTION update_tag_leaderboards();
+
+CREATE TRIGGER trigger_delete_tag_leaderboards
+AFTER DELETE ON moment_tags
+REFERENCING OLD TABLE AS old_moment_tags
+FOR EACH STATEMENT EXECUTE FUNCTION update_tag_leaderboards();
+
+CREATE OR REPLACE FUNCTION update_creator_leaderboards()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_creator TEXT;
+    v_moment moments;
+BEGIN
+    -- Old and new creator's boards in key order
+    FOR v_creator IN
+        SELECT creator FROM unnest(ARRAY[OLD.creator, NEW.creator]) AS creator
+        WHERE creator IS NOT NULL
+        ORDER BY creator
+    LOOP
+        FOR v_moment IN SELECT * FROM moments WHERE video_id = NEW.id ORDER BY id LOOP
+            IF v_creator = NEW.creator THEN
+                PERFORM offer_moment_to_leaderboards(v_moment, 'creator', v_creator);
+            ELSE
+                PERFORM remove_moment_from_leaderboards(v_moment.id, 'creator', v_creator);
+            END IF;
+        END LOOP;
+    END LOOP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trigger_update_creator_leaderboards
+AFTER UPDATE OF creator ON videos
+FOR EACH ROW WHEN (OLD.creator IS DISTINCT FROM NEW.creator)
+EXECUTE FUNCTION update_creator_leaderboards();
+
+-- Apply queued moment changes to the 'all' boards, up to p_limit queue rows
+-- per call in moment id order; returns the rows taken (0 while another call
+-- holds the lock)
+CREATE OR REPLACE FUNCTION apply_moment_leaderboard_queue(p_limit INTEGER DEFAULT 5000)
+RETURNS INTEGER AS $$
+DECLARE
+    v_ids UUID[];
+    v_taken INTEGER;
+    v_moment_id UUID;
+    v_moment moments;
+BEGIN
+    IF NOT pg_try_advisory_xact_lock(hashtext('apply_moment_leaderboard_queue')) THEN
+        RETURN 0;
+    END IF;
+    WITH taken AS (
+        DELETE FROM moment_leaderboard_queue
+        WHERE id IN (SELECT id FROM moment_leaderboard_queue ORDER BY id LIMIT p_limit)
+        RETURNING moment_id
+    )
+    SELECT array_agg(DISTINCT moment_id ORDER BY moment_id), count(*)
+    INTO v_ids, v_taken
+    FROM taken;
+
+    FOREACH v_moment_id IN ARRAY COALESCE(v_ids, '{}') LOOP
+        PERFORM remove_moment_from_leaderboards(v_moment_id, 'all', '');
+        SELECT * INTO v_moment FROM moments WHERE id = v_moment_id;
+        IF FOUND THEN
+            PERFORM offer_moment_to_leaderboards(v_moment, 'all', '');
+        END IF;
+    END LOOP;
+    RETURN v_taken;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Recompute moment_leaderboards from scratch (existing databases, or after
+-- bulk loads with triggers disabled)
+CREATE OR REPLACE FUNCTION rebuild_moment_leaderboards()
+RETURNS VOID AS $$
+DECLARE
+    v_metric TEXT;
+BEGIN
+    DELETE FROM moment_leaderboards;
+    DELETE FROM moment_leaderboard_cutoffs;
+    DELETE FROM moment_leaderboard_queue;
+    FOREACH v_metric IN ARRAY moment_leaderboard_metrics() LOOP
+        EXECUTE format(
+            'INSERT INTO moment_leaderboards
+                 (metric, scope, scope_key, moment_id, score, video_id, start_time, end_time, summary)
+             SELECT $1, scope, scope_key, id, score, video_id, start_time, end_time, summary
+             FROM (
+                 SELECT boards.*, row_number() OVER (
+                     PARTITION BY scope, scope_key ORDER BY score DESC, id
+                 ) AS rank
+                 FROM (
+                     SELECT ''all'' AS scope, '''' AS scope_key, m.id, m.%1$I AS score,
+                            m.video_id, m.start_time, m.end_time, m.summary
+                     FROM moments m
+                     UNION ALL
+                     SELECT ''creator'', v.creator, m.id, m.%1$I,
+                            m.video_id, m.start_time, m.end_time, m.summary
+                     FROM moments m JOIN videos v ON v.id = m.video_id
+                     WHERE v.creator IS NOT NULL
+                     UNION ALL
+                     SELECT ''tag'', mt.tag_id::text, m.id, m.%1$I,
+                            m.video_id, m.start_time, m.end_time, m.summary
+                     FROM moments m JOIN moment_tags mt ON mt.moment_id = m.id
+                 ) AS boards
+                 WHERE score IS NOT NULL
+             ) AS ranked
+             WHERE rank <= moment_leaderboard_capacity()',
+            v_metric
+        ) USING v_metric;
+    END LOOP;
+    INSERT INTO moment_leaderboard_cutoffs (metric, scope, scope_key, cutoff)
+    SELECT metric, scope, scope_key, min(score)
+    FROM moment_leaderboards
+    GROUP BY metric, scope, scope_key
+    HAVING count(*) >= moment_leaderboard_capacity();
+END;
+$$ LANGUAGE plpgsql;
+
 -- ============================================
 -- VIEWS
 -- ============================================